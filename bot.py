@@ -6,29 +6,51 @@ Initializes the Discord bot and loads all cogs
 import discord
 from discord.ext import commands
 import asyncio
+import hashlib
+import json
 import logging
+import math
 import os
 import sys
+import time
 from datetime import datetime
+from typing import Any, Dict
 
 import config
 from database.db_manager import DatabaseManager
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+from utils.message_pipeline import MessagePipeline
+from utils.logging_setup import setup_logging, parse_logger_values
+from utils.log_buffer import LogBuffer
+from utils.log_webhooks import LogWebhooks
+from utils.loop_monitor import LoopLagMonitor
+from utils.metrics import (
+    GATEWAY_EVENTS, LISTENER_SECONDS, DB_SECONDS, DB_ERRORS,
+    instrument_async_methods, instrument_discord_http
 )
+from utils.metrics_server import MetricsServer
+from utils.outbound import OutboundQueue
+from utils.profiling import install_command_timing
+
 logger = logging.getLogger('discord_bot')
 
+def member_cache_flags(policy: str) -> discord.MemberCacheFlags:
+    """Build MemberCacheFlags from MEMBER_CACHE_POLICY"""
+    policy = policy.strip().lower()
+    if policy == 'all':
+        return discord.MemberCacheFlags.all()
+    flags = discord.MemberCacheFlags.none()
+    for name in filter(None, (part.strip() for part in policy.split(','))):
+        if name == 'none':
+            continue
+        if name not in discord.MemberCacheFlags.VALID_FLAGS:
+            raise ValueError(f"Unknown member cache flag: {name}")
+        setattr(flags, name, True)
+    return flags
+
 class DiscordBot(commands.Bot):
-    """Custom bot class with additional functionality"""
+    """Custom bot class with additional functionality (one gateway connection)"""
     
-    def __init__(self):
+    def __init__(self, **options):
         # Define intents
         intents = discord.Intents.default()
         intents.message_content = True
@@ -42,36 +64,188 @@ class DiscordBot(commands.Bot):
             command_prefix=config.PREFIX,
             intents=intents,
             description=config.BOT_DESCRIPTION,
-            help_command=None  # We'll create a custom help command
+            help_command=None,  # We'll create a custom help command
+            member_cache_flags=member_cache_flags(config.MEMBER_CACHE_POLICY),
+            chunk_guilds_at_startup=config.CHUNK_GUILDS_AT_STARTUP,
+            **options
         )
         
+        self.cluster_id = config.CLUSTER_ID
         self.start_time = datetime.utcnow()
+        self.startup_announced = False
         self.db = None
+        self.message_pipeline = MessagePipeline(self)
+        self.loop_monitor = LoopLagMonitor(
+            interval_ms=config.LOOP_MONITOR_INTERVAL_MS,
+            threshold_ms=config.LOOP_LAG_THRESHOLD_MS,
+            report_seconds=config.LOOP_LAG_REPORT_SECONDS
+        )
+        self.metrics_server = None
+        self.outbound = OutboundQueue(
+            workers=config.OUTBOUND_WORKERS,
+            max_pending=config.OUTBOUND_MAX_PENDING
+        )
+        self.log_webhooks = LogWebhooks(self, config.LOG_WEBHOOK_NAME) if config.LOG_WEBHOOKS_ENABLED else None
+        self.log_buffer = LogBuffer(
+            flush_interval=config.LOG_BUFFER_FLUSH_SECONDS,
+            max_pending=config.LOG_BUFFER_MAX_PENDING,
+            webhooks=self.log_webhooks,
+            outbound=self.outbound
+        )
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
         logger.info("Starting bot setup...")
         
+        # Watch for event loop stalls from the start
+        if config.LOOP_MONITOR_ENABLED:
+            self.loop_monitor.start()
+        
         # Initialize database
-        self.db = DatabaseManager(config.DATABASE_PATH)
+        self.db = DatabaseManager(
+            config.DATABASE_PATH,
+            group_commit=config.DB_GROUP_COMMIT,
+            commit_interval_ms=config.DB_COMMIT_INTERVAL_MS,
+            commit_max_statements=config.DB_COMMIT_MAX_STATEMENTS,
+            wal_mode=config.DB_WAL_MODE,
+            read_pool_size=config.DB_READ_POOL_SIZE,
+            # Other processes run the remaining shards and may change settings
+            cache_sync_interval_ms=config.DB_CACHE_SYNC_MS if config.SHARD_IDS else 0
+        )
         await self.db.initialize()
         logger.info("Database initialized")
         
+        # Queued moderation notices and batched log channel sends
+        self.outbound.start()
+        if self.log_webhooks:
+            self.log_webhooks.start()
+        self.log_buffer.start()
+        
+        # Metrics endpoint (also times every DB method and Discord REST call)
+        if config.METRICS_ENABLED:
+            instrument_async_methods(self.db, DB_SECONDS, DB_ERRORS, exclude=('initialize', 'close'))
+            instrument_discord_http(self.http)
+            self.metrics_server = MetricsServer(
+                self, config.METRICS_HOST, config.METRICS_PORT + (self.cluster_id or 0)
+            )
+            await self.metrics_server.start()
+        
+        # Time every command (listeners are timed in _run_event)
+        install_command_timing(self)
+        
         # Load all cogs
         await self.load_cogs()
         
-        # Sync commands with Discord
+        # Sync commands with Discord (skipped when nothing changed); in a
+        # cluster only the first worker syncs
+        if not self.cluster_id:
+            await self.sync_commands()
+        
+        # Report health to the cluster supervisor
+        if self.cluster_id is not None:
+            self.loop.create_task(self.write_health_loop())
+    
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        """Count gateway events by type before dispatching"""
+        if event_name == 'socket_event_type':
+            GATEWAY_EVENTS.inc(event=args[0])
+        super().dispatch(event_name, *args, **kwargs)
+    
+    async def _run_event(self, coro, event_name: str, *args, **kwargs):
+        """Run a listener, recording how long it took"""
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            LISTENER_SECONDS.observe(
+                time.perf_counter() - start,
+                listener=getattr(coro, '__qualname__', event_name)
+            )
+    
+    def owns_guild(self, guild_id: int) -> bool:
+        """Whether this process runs the shard that receives a guild's events"""
+        return True
+    
+    def gateway_shards(self) -> Dict[int, Any]:
+        """Shard ID -> connection (with latency and is_closed()) for each shard this process runs"""
+        return {0: self}
+    
+    def health(self) -> dict:
+        """Snapshot of this process's shards for the cluster supervisor"""
+        return {
+            'cluster_id': self.cluster_id,
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+            'ready': self.is_ready(),
+            'guilds': len(self.guilds),
+            'shards': {
+                shard_id: {
+                    'latency_ms': round(shard.latency * 1000, 1) if math.isfinite(shard.latency) else None,
+                    'closed': shard.is_closed()
+                }
+                for shard_id, shard in self.gateway_shards().items()
+            }
+        }
+    
+    async def write_health_loop(self):
+        """Write a heartbeat file every CLUSTER_HEARTBEAT_SECONDS"""
+        os.makedirs(config.CLUSTER_HEALTH_DIR, exist_ok=True)
+        path = os.path.join(config.CLUSTER_HEALTH_DIR, f'cluster-{self.cluster_id}.json')
+        
+        def write(data):
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f)
+            os.replace(path + '.tmp', path)
+        
+        while not self.is_closed():
+            try:
+                await asyncio.to_thread(write, self.health())
+            except Exception as e:
+                logger.error(f"Failed to write cluster health: {e}")
+            await asyncio.sleep(config.CLUSTER_HEARTBEAT_SECONDS)
+    
+    def command_tree_hash(self) -> str:
+        """Hash of the global command payload that tree.sync() would send"""
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda command: (command.get('type', 1), command['name'])
+        )
+        data = json.dumps({'application_id': self.application_id, 'commands': payload}, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+    
+    async def sync_commands(self):
+        """Sync the command tree unless it matches the last successful sync"""
+        tree_hash = self.command_tree_hash()
+        hash_path = config.COMMAND_SYNC_HASH_PATH
+        
+        if not config.FORCE_COMMAND_SYNC:
+            try:
+                with open(hash_path, 'r') as f:
+                    if f.read().strip() == tree_hash:
+                        logger.info("Command tree unchanged since last sync, skipping sync")
+                        return
+            except OSError:
+                pass
+        
         logger.info("Syncing commands with Discord...")
-        await self.tree.sync()
+        try:
+            await self.tree.sync()
+        except discord.HTTPException as e:
+            logger.error(f"Command sync failed: {e}")
+            return
+        
+        os.makedirs(os.path.dirname(hash_path) or '.', exist_ok=True)
+        with open(hash_path, 'w') as f:
+            f.write(tree_hash)
         logger.info("Commands synced")
     
-    async def load_cogs(self):
-        """Load all cog modules"""
+    async def load_cogs(self, cog_files: list = None):
+        """Load all cog modules (or only `cog_files`)"""
         cogs_dir = 'cogs'
         
         # List of cog files to load
         # Note: Discord limits bots to 100 slash commands total
-        cog_files = [
+        cog_files = cog_files or [
             'admin',  # Admin commands (shutdown, restart)
             'moderation',
             'automod',
@@ -96,12 +270,31 @@ class DiscordBot(commands.Bot):
             # 'moderation_utilities'
         ]
         
-        for cog_file in cog_files:
+        async def load(cog_file):
+            start = time.perf_counter()
             try:
                 await self.load_extension(f'{cogs_dir}.{cog_file}')
-                logger.info(f"Loaded cog: {cog_file}")
             except Exception as e:
                 logger.error(f"Failed to load cog {cog_file}: {e}")
+                return cog_file, None
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Loaded cog: {cog_file} ({elapsed_ms:.1f} ms)")
+            return cog_file, elapsed_ms
+        
+        # Cogs don't depend on each other, so their setup can overlap
+        start = time.perf_counter()
+        results = await asyncio.gather(*(load(cog_file) for cog_file in cog_files))
+        total_ms = (time.perf_counter() - start) * 1000
+        
+        timings = {cog_file: round(elapsed_ms, 1) for cog_file, elapsed_ms in results if elapsed_ms is not None}
+        breakdown = ', '.join(
+            f"{cog_file} {elapsed_ms:.1f} ms"
+            for cog_file, elapsed_ms in sorted(timings.items(), key=lambda item: item[1], reverse=True)
+        )
+        logger.info(
+            f"Loaded {len(timings)}/{len(cog_files)} cogs in {total_ms:.1f} ms: {breakdown}",
+            extra={'cog_timings_ms': timings, 'total_ms': round(total_ms, 1)}
+        )
     
     async def on_ready(self):
         """Called when the bot is ready"""
@@ -115,6 +308,12 @@ class DiscordBot(commands.Bot):
             activity=discord.Game(name="/help")
         )
         
+        # on_ready fires again after a gateway reconnect; announce the start once
+        if self.startup_announced:
+            logger.info("Reconnected; skipping the startup announcement")
+            return
+        self.startup_announced = True
+        
         # Send startup message to bot log channels
         await self.send_bot_log_to_all_guilds(
             title="🟢 Bot Started",
@@ -129,45 +328,51 @@ class DiscordBot(commands.Bot):
     
     async def send_bot_log_to_all_guilds(self, title: str, description: str, color: int, fields: list = None):
         """Send a log message to all guilds with bot logging enabled"""
+        embed = discord.Embed(
+            title=title,
+            description=description,
+            color=color,
+            timestamp=datetime.utcnow()
+        )
+        
+        if fields:
+            for name, value, inline in fields:
+                embed.add_field(name=name, value=value, inline=inline)
+        
+        # One query for every configured channel instead of one per guild
+        try:
+            log_channels = await self.db.get_bot_log_channels()
+        except Exception as e:
+            logger.error(f"Failed to load bot log channels: {e}")
+            return
+        
+        channels = []
         for guild in self.guilds:
-            try:
-                settings = await self.db.get_guild_settings(guild.id)
-                if not settings.bot_log_channel:
-                    continue
-                
-                channel = guild.get_channel(settings.bot_log_channel)
-                if not channel:
-                    continue
-                
-                embed = discord.Embed(
-                    title=title,
-                    description=description,
-                    color=color,
-                    timestamp=datetime.utcnow()
-                )
-                
-                if fields:
-                    for name, value, inline in fields:
-                        embed.add_field(name=name, value=value, inline=inline)
-                
-                await channel.send(embed=embed)
-            except Exception as e:
-                logger.error(f"Failed to send bot log to guild {guild.id}: {e}")
+            channel_id = log_channels.get(guild.id)
+            channel = guild.get_channel(channel_id) if channel_id else None
+            if channel:
+                channels.append(channel)
+        
+        semaphore = asyncio.Semaphore(config.BOT_LOG_BROADCAST_CONCURRENCY)
+        
+        async def send(channel):
+            async with semaphore:
+                try:
+                    await channel.send(embed=embed)
+                except Exception as e:
+                    logger.error(f"Failed to send bot log to guild {channel.guild.id}: {e}")
+        
+        await asyncio.gather(*(send(channel) for channel in channels))
     
     async def on_message(self, message):
-        """Central message handler - processes all message events"""
-        if message.author.bot:
+        """Central message handler - runs the message pipeline, then prefix commands"""
+        ctx = await self.message_pipeline.process(message)
+        if ctx is None or ctx.deleted:
             return
         
-        # Debug logging
-        logger.info(f"Message received: '{message.content}' from {message.author} in {message.guild}")
-        
-        # Check if it's a command
-        if message.content.startswith(config.PREFIX):
-            logger.info(f"Command detected with prefix '{config.PREFIX}': {message.content}")
-        
         # Process commands at the end (this handles prefix commands)
-        await self.process_commands(message)
+        if ctx.command_trigger:
+            await self.process_commands(message)
     
     async def on_guild_join(self, guild: discord.Guild):
         """Called when the bot joins a new guild"""
@@ -285,13 +490,60 @@ class DiscordBot(commands.Bot):
                 ]
             )
         
+        # Send notices and log embeds still waiting
+        await self.outbound.stop()
+        await self.log_buffer.stop()
+        if self.log_webhooks:
+            await self.log_webhooks.close()
+        
+        self.loop_monitor.stop()
+        
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        
         if self.db:
-            await self.db.close()
+            try:
+                await self.db.close()
+            except Exception as e:
+                logger.error(f"Queued database writes were lost on shutdown: {e}")
         
         await super().close()
 
+class ShardedDiscordBot(DiscordBot, commands.AutoShardedBot):
+    """DiscordBot running SHARD_COUNT shards, or only SHARD_IDS of them in a cluster worker"""
+    
+    def __init__(self):
+        super().__init__(shard_count=config.SHARD_COUNT, shard_ids=config.SHARD_IDS)
+    
+    def owns_guild(self, guild_id: int) -> bool:
+        if self.shard_ids is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+    
+    def gateway_shards(self) -> Dict[int, Any]:
+        return dict(self.shards)
+
+def create_bot() -> DiscordBot:
+    """Sharded when SHARD_COUNT or SHARD_IDS is set, otherwise a single connection"""
+    if config.SHARD_COUNT or config.SHARD_IDS:
+        return ShardedDiscordBot()
+    return DiscordBot()
+
 async def main():
     """Main function to run the bot"""
+    # Set up logging (file writes happen on a background thread); only when
+    # run as the bot, so importing this module leaves logging alone
+    setup_logging(
+        level=config.LOG_LEVEL,
+        log_file=config.LOG_FILE,
+        json_format=config.LOG_JSON,
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        rotate_when=config.LOG_ROTATE_WHEN,
+        sample_rates=parse_logger_values(config.LOG_SAMPLE_RATES),
+        rate_limits=parse_logger_values(config.LOG_RATE_LIMITS)
+    )
+    
     # Validate configuration
     try:
         config.validate_config()
@@ -300,7 +552,7 @@ async def main():
         return
     
     # Create and run bot
-    bot = DiscordBot()
+    bot = create_bot()
     
     try:
         await bot.start(config.DISCORD_TOKEN)
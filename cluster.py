@@ -0,0 +1,231 @@
+"""
+Cluster supervisor
+Splits the bot's shards across several bot.py worker processes, restarts
+workers that exit or stop reporting, and logs the cluster's combined health
+"""
+
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import config
+from database.db_manager import DatabaseManager
+from utils.logging_setup import setup_logging, parse_logger_values
+
+logger = logging.getLogger('discord_bot.cluster')
+
+GATEWAY_URL = 'https://discord.com/api/v10/gateway/bot'
+STARTUP_GRACE_SECONDS = 120  # Time a worker gets to connect before heartbeats are required
+RESTART_DELAY_SECONDS = 5
+
+
+async def fetch_recommended_shards() -> int:
+    """Ask Discord how many shards the bot should use"""
+    headers = {'Authorization': f'Bot {config.DISCORD_TOKEN}'}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers=headers) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data['shards']
+
+
+def split_shards(shard_count: int, workers: int) -> List[List[int]]:
+    """Split shard IDs into contiguous, evenly sized ranges (one per worker)"""
+    workers = max(1, min(workers, shard_count))
+    base, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for worker in range(workers):
+        size = base + (1 if worker < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class Worker:
+    """One bot.py process and the shards it runs"""
+
+    def __init__(self, cluster_id: int, shard_ids: List[int], shard_count: int, wal_mode: bool = False):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.wal_mode = wal_mode
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+
+    @property
+    def health_path(self) -> str:
+        return os.path.join(config.CLUSTER_HEALTH_DIR, f'cluster-{self.cluster_id}.json')
+
+    def environment(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env['SHARD_COUNT'] = str(self.shard_count)
+        env['SHARD_IDS'] = ','.join(str(shard_id) for shard_id in self.shard_ids)
+        env['CLUSTER_ID'] = str(self.cluster_id)
+        if self.wal_mode:
+            env['DB_WAL_MODE'] = 'true'
+        # One log file per worker so rotation doesn't race between processes
+        if config.LOG_FILE:
+            root, ext = os.path.splitext(config.LOG_FILE)
+            env['LOG_FILE'] = f'{root}-cluster{self.cluster_id}{ext}'
+        return env
+
+    async def start(self):
+        if os.path.exists(self.health_path):
+            os.remove(self.health_path)
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, 'bot.py', env=self.environment()
+        )
+        self.started_at = time.time()
+        logger.info(
+            f"Started worker {self.cluster_id} (pid {self.process.pid}) "
+            f"for shards {self.shard_ids[0]}-{self.shard_ids[-1]}"
+        )
+
+    async def stop(self):
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=30)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+    def read_health(self) -> Optional[dict]:
+        try:
+            with open(self.health_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class ClusterSupervisor:
+    """Launches the workers and keeps them running"""
+
+    def __init__(self, shard_count: int, workers: int):
+        shard_ranges = split_shards(shard_count, workers)
+        # Several processes writing one SQLite file need WAL, or every write
+        # blocks every other worker's reads
+        self.wal_mode = config.DB_WAL_MODE or len(shard_ranges) > 1
+        if self.wal_mode and not config.DB_WAL_MODE:
+            logger.warning("DB_WAL_MODE is off; enabling it for the workers")
+        self.workers = [
+            Worker(cluster_id, shard_ids, shard_count, self.wal_mode)
+            for cluster_id, shard_ids in enumerate(shard_ranges)
+        ]
+        self.shard_count = shard_count
+        self.interval = config.CLUSTER_HEARTBEAT_SECONDS
+
+    async def prepare_database(self):
+        """Create the schema and run migrations once, before any worker opens the database"""
+        db = DatabaseManager(config.DATABASE_PATH, wal_mode=self.wal_mode)
+        await db.initialize()
+        await db.close()
+
+    async def run(self):
+        os.makedirs(config.CLUSTER_HEALTH_DIR, exist_ok=True)
+        await self.prepare_database()
+        for worker in self.workers:
+            await worker.start()
+
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.check_workers()
+                self.report()
+        finally:
+            await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+    async def check_workers(self):
+        """Restart workers that exited or whose heartbeat went stale"""
+        now = time.time()
+        for worker in self.workers:
+            if worker.process.returncode is not None:
+                logger.warning(f"Worker {worker.cluster_id} exited with code {worker.process.returncode}")
+            elif now - worker.started_at > STARTUP_GRACE_SECONDS:
+                health = worker.read_health()
+                if health and now - health['timestamp'] <= self.interval * 3:
+                    continue
+                logger.warning(f"Worker {worker.cluster_id} stopped reporting health, restarting it")
+                await worker.stop()
+            else:
+                continue
+
+            worker.restarts += 1
+            await asyncio.sleep(RESTART_DELAY_SECONDS)
+            await worker.start()
+
+    def report(self) -> dict:
+        """Log and persist the combined health of all workers"""
+        summary = {
+            'timestamp': time.time(),
+            'shard_count': self.shard_count,
+            'workers': {},
+            'guilds': 0,
+            'shards_up': 0,
+        }
+        latencies = []
+        for worker in self.workers:
+            health = worker.read_health() or {}
+            shards = health.get('shards', {})
+            up = [shard for shard in shards.values() if not shard['closed']]
+            latencies.extend(shard['latency_ms'] for shard in up if shard['latency_ms'] is not None)
+            summary['guilds'] += health.get('guilds', 0)
+            summary['shards_up'] += len(up)
+            summary['workers'][worker.cluster_id] = {
+                'pid': worker.process.pid if worker.process else None,
+                'ready': health.get('ready', False),
+                'guilds': health.get('guilds', 0),
+                'shards_up': len(up),
+                'restarts': worker.restarts,
+            }
+        summary['max_latency_ms'] = max(latencies) if latencies else None
+
+        logger.info(
+            f"Cluster health: {summary['shards_up']}/{self.shard_count} shards up, "
+            f"{summary['guilds']} guilds, max latency {summary['max_latency_ms']} ms",
+            extra={'cluster': summary}
+        )
+        with open(os.path.join(config.CLUSTER_HEALTH_DIR, 'cluster.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+async def main():
+    """Start the cluster"""
+    # Same format, sampling and rotation as the workers; each worker writes its
+    # own -clusterN file, so the supervisor keeps LOG_FILE
+    setup_logging(
+        level=config.LOG_LEVEL,
+        log_file=config.LOG_FILE,
+        json_format=config.LOG_JSON,
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        rotate_when=config.LOG_ROTATE_WHEN,
+        sample_rates=parse_logger_values(config.LOG_SAMPLE_RATES),
+        rate_limits=parse_logger_values(config.LOG_RATE_LIMITS)
+    )
+
+    try:
+        config.validate_config()
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        return
+
+    shard_count = config.SHARD_COUNT or await fetch_recommended_shards()
+    supervisor = ClusterSupervisor(shard_count, config.CLUSTER_WORKERS)
+    logger.info(f"Running {shard_count} shards across {len(supervisor.workers)} workers")
+    await supervisor.run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Cluster stopped")
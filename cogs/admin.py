@@ -6,8 +6,12 @@ Contains administrative commands for bot management
 import discord
 from discord.ext import commands
 import asyncio
+import io
 import sys
 import os
+import threading
+
+from utils.profiling import SamplingProfiler, timing_report
 
 
 class Admin(commands.Cog):
@@ -60,8 +64,82 @@ class Admin(commands.Cog):
         # Restart the bot
         os.execv(sys.executable, ['python'] + sys.argv)
     
+    @commands.command(name='looplag', aliases=['lag'])
+    @commands.is_owner()
+    async def looplag(self, ctx):
+        """
+        Shows event loop lag percentiles and the last blocking stack
+        Only the bot owner can use this command
+        """
+        monitor = self.bot.loop_monitor
+        stats = monitor.stats()
+        
+        embed = discord.Embed(
+            title="⏱️ Event Loop Lag",
+            description=f"Over the last {stats['samples']} samples",
+            color=discord.Color.green() if stats['p99'] < monitor.threshold * 1000 else discord.Color.orange()
+        )
+        embed.add_field(name="p50", value=f"{stats['p50']:.1f} ms", inline=True)
+        embed.add_field(name="p90", value=f"{stats['p90']:.1f} ms", inline=True)
+        embed.add_field(name="p99", value=f"{stats['p99']:.1f} ms", inline=True)
+        embed.add_field(name="Max", value=f"{stats['max']:.1f} ms", inline=True)
+        embed.add_field(name="Stalls Captured", value=str(stats['stalls']), inline=True)
+        
+        if monitor.stalls:
+            stall = monitor.stalls[-1]
+            # Innermost frames are the interesting ones
+            stack = stall['stack'][-900:]
+            embed.add_field(
+                name=f"Last Stall ({stall['stalled_ms']:.0f} ms, <t:{int(stall['time'])}:R>)",
+                value=f"```\n{stack}\n```",
+                inline=False
+            )
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='profile')
+    @commands.is_owner()
+    async def profile(self, ctx, seconds: int = 10):
+        """
+        Samples the event loop for N seconds (max 120) and uploads the hottest functions
+        Only the bot owner can use this command
+        """
+        seconds = max(1, min(seconds, 120))
+        await ctx.send(f"⏱️ Profiling the event loop for {seconds}s...")
+        
+        profiler = SamplingProfiler(threading.get_ident())
+        await profiler.run(seconds)
+        
+        report = profiler.report()
+        await ctx.send(
+            f"📊 Profile finished ({profiler.samples} samples)",
+            file=discord.File(io.BytesIO(report.encode()), filename=f"profile-{seconds}s.txt")
+        )
+    
+    @commands.command(name='timings')
+    @commands.is_owner()
+    async def timings(self, ctx):
+        """
+        Shows the listeners and commands with the most total wall time since startup
+        Only the bot owner can use this command
+        """
+        report = timing_report(limit=8)
+        
+        embed = discord.Embed(title="⏱️ Listener & Command Timings", color=discord.Color.blurple())
+        for title, rows in (("Listeners", report['listeners']), ("Commands", report['commands'])):
+            value = "\n".join(
+                f"`{name}` {calls}× · {total:.2f}s total · {mean * 1000:.1f} ms avg"
+                for name, calls, total, mean in rows
+            )
+            embed.add_field(name=title, value=value[:1024] or "No data yet", inline=False)
+        
+        await ctx.send(embed=embed)
+    
     @shutdown.error
     @restart.error
+    @looplag.error
+    @profile.error
+    @timings.error
     async def admin_error(self, ctx, error):
         """Error handler for admin commands"""
         if isinstance(error, commands.NotOwner):
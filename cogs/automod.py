@@ -6,12 +6,15 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime, timedelta
-from collections import defaultdict
 from typing import Optional
-import re
 
 from utils.embeds import success_embed, warning_embed
+from utils.blacklist import BlacklistMatcher
+from utils.bulk_delete import delete_message_refs
 from utils.checks import is_moderator
+from utils.message_pipeline import MessageContext
+from utils.outbound import Priority
+from utils.spam_tracker import SpamTracker
 import config
 
 class AutoMod(commands.Cog):
@@ -19,93 +22,85 @@ class AutoMod(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.message_cache = defaultdict(list)  # user_id: [(timestamp, message_id), ...]
-        self.invite_pattern = re.compile(r'discord(?:\.gg|app\.com/invite)/[a-zA-Z0-9]+')
+        # (guild_id, user_id): recent MessageRefs across every channel of the guild
+        self.spam_tracker = SpamTracker(
+            config.AutoMod.SPAM_TIME_WINDOW,
+            config.AutoMod.SPAM_MESSAGE_COUNT,
+            config.SPAM_TRACKER_MAX_KEYS
+        )
+        self.blacklist_matchers = {}  # guild_id: (blacklist version, BlacklistMatcher)
     
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Check messages for auto-mod violations"""
-        # Ignore bots and DMs
-        if message.author.bot or not message.guild:
-            return
-        
+    async def cog_load(self):
+        """Register the auto-mod stage with the message pipeline"""
+        self.bot.message_pipeline.register(
+            'automod', self.process_message, priority=10,
+            enabled=lambda settings, av_settings: settings.automod_enabled
+        )
+    
+    async def cog_unload(self):
+        """Remove the auto-mod stage from the message pipeline"""
+        self.bot.message_pipeline.unregister('automod')
+    
+    async def process_message(self, ctx: MessageContext) -> bool:
+        """Check messages for auto-mod violations; returns True if the message was removed"""
         # Ignore moderators
-        if message.author.guild_permissions.manage_messages:
-            return
+        if ctx.is_moderator:
+            return False
         
-        # Get guild settings
-        settings = await self.bot.db.get_guild_settings(message.guild.id)
-        
-        if not settings.automod_enabled:
-            return
+        message = ctx.message
+        settings = ctx.guild_settings
         
         # Check spam
         if settings.spam_detection:
             if await self._check_spam(message):
-                return
+                return True
         
         # Check blacklist
         if settings.blacklist_enabled:
-            if await self._check_blacklist(message):
-                return
+            if await self._check_blacklist(ctx):
+                return True
         
         # Check caps
-        if await self._check_caps(message):
-            return
+        if await self._check_caps(ctx):
+            return True
         
         # Check invite links
-        if await self._check_invites(message):
-            return
+        if await self._check_invites(ctx):
+            return True
         
         # Check mass mentions
-        if await self._check_mass_mentions(message):
-            return
+        if await self._check_mass_mentions(ctx):
+            return True
         
         # Check @everyone/@here pings
-        if await self._check_everyone_pings(message):
-            return
+        return await self._check_everyone_pings(ctx)
     
     async def _check_spam(self, message: discord.Message) -> bool:
-        """Check for spam (multiple messages in short time)"""
-        user_id = message.author.id
-        now = datetime.utcnow()
-        
-        # Add current message to cache
-        self.message_cache[user_id].append((now, message.id))
-        
-        # Remove old messages (older than time window)
-        cutoff = now - timedelta(seconds=config.AutoMod.SPAM_TIME_WINDOW)
-        self.message_cache[user_id] = [
-            (ts, mid) for ts, mid in self.message_cache[user_id]
-            if ts > cutoff
-        ]
-        
-        # Check if spam threshold exceeded
-        if len(self.message_cache[user_id]) >= config.AutoMod.SPAM_MESSAGE_COUNT:
+        """Check for spam (multiple messages in short time, in any of the guild's channels)"""
+        # Returns the user's recent messages once the spam threshold is reached
+        refs = self.spam_tracker.record(message.guild.id, message.author.id, message.id, message.channel.id)
+        
+        if refs:
             try:
-                # Delete messages
-                for _, msg_id in self.message_cache[user_id]:
-                    try:
-                        msg = await message.channel.fetch_message(msg_id)
-                        await msg.delete()
-                    except:
-                        pass
+                # Delete messages, one bulk delete per channel
+                await self.bot.outbound.enforce(delete_message_refs(
+                    message.guild,
+                    refs,
+                    reason="Auto-mod: Spam detected"
+                ))
                 
                 # Timeout user for 5 minutes
-                await message.author.timeout(
+                await self.bot.outbound.enforce(message.author.timeout(
                     timedelta(minutes=5),
                     reason="Auto-mod: Spam detected"
-                )
+                ))
                 
                 # Send warning
                 embed = warning_embed(
                     "Spam Detected",
                     f"{message.author.mention} has been timed out for 5 minutes for spam."
                 )
-                await message.channel.send(embed=embed, delete_after=10)
-                
-                # Clear cache
-                self.message_cache[user_id].clear()
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=10), route=('send', message.channel.id))
                 
                 return True
             except:
@@ -113,62 +108,64 @@ class AutoMod(commands.Cog):
         
         return False
     
-    async def _check_blacklist(self, message: discord.Message) -> bool:
-        """Check for blacklisted words"""
-        blacklist = await self.bot.db.get_blacklist(message.guild.id)
-        
-        if not blacklist:
-            return False
+    async def _get_blacklist_matcher(self, guild_id: int) -> BlacklistMatcher:
+        """Get the guild's compiled blacklist, rebuilt only after the blacklist changed"""
+        version = self.bot.db.blacklist_versions.get(guild_id, 0)
+        cached = self.blacklist_matchers.get(guild_id)
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        words = await self.bot.db.get_blacklist(guild_id)
+        matcher = BlacklistMatcher(words, whole_words=config.AutoMod.BLACKLIST_WHOLE_WORDS)
+        self.blacklist_matchers[guild_id] = (version, matcher)
+        return matcher
+    
+    async def _check_blacklist(self, ctx: MessageContext) -> bool:
+        """Check for blacklisted words (look-alike characters folded first)"""
+        message = ctx.message
+        matcher = await self._get_blacklist_matcher(message.guild.id)
+        word = matcher.find(ctx.normalized_content)
         
-        content_lower = message.content.lower()
-        
-        for word in blacklist:
-            if word in content_lower:
-                try:
-                    await message.delete()
-                    
-                    # Warn user
-                    await self.bot.db.add_warning(
-                        message.author.id,
-                        message.guild.id,
-                        self.bot.user.id,
-                        f"Auto-mod: Used blacklisted word '{word}'"
-                    )
-                    
-                    embed = warning_embed(
-                        "Blacklisted Word",
-                        f"{message.author.mention}, your message contained a blacklisted word and has been deleted."
-                    )
-                    await message.channel.send(embed=embed, delete_after=5)
-                    
-                    return True
-                except:
-                    pass
+        if word:
+            try:
+                await self.bot.outbound.enforce(message.delete())
+                
+                # Warn user
+                await self.bot.db.add_warning(
+                    message.author.id,
+                    message.guild.id,
+                    self.bot.user.id,
+                    f"Auto-mod: Used blacklisted word '{word}'"
+                )
+                
+                embed = warning_embed(
+                    "Blacklisted Word",
+                    f"{message.author.mention}, your message contained a blacklisted word and has been deleted."
+                )
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=5), route=('send', message.channel.id))
+                
+                return True
+            except:
+                pass
         
         return False
     
-    async def _check_caps(self, message: discord.Message) -> bool:
+    async def _check_caps(self, ctx: MessageContext) -> bool:
         """Check for excessive caps"""
-        if len(message.content) < 10:
+        message = ctx.message
+        analysis = ctx.analysis
+        if analysis.length < 10 or analysis.letters == 0:
             return False
         
-        caps_count = sum(1 for c in message.content if c.isupper())
-        total_letters = sum(1 for c in message.content if c.isalpha())
-        
-        if total_letters == 0:
-            return False
-        
-        caps_ratio = caps_count / total_letters
-        
-        if caps_ratio > config.AutoMod.CAPS_THRESHOLD:
+        if analysis.caps_ratio > config.AutoMod.CAPS_THRESHOLD:
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
                 
                 embed = warning_embed(
                     "Excessive Caps",
                     f"{message.author.mention}, please don't use excessive caps."
                 )
-                await message.channel.send(embed=embed, delete_after=5)
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=5), route=('send', message.channel.id))
                 
                 return True
             except:
@@ -176,17 +173,18 @@ class AutoMod(commands.Cog):
         
         return False
     
-    async def _check_invites(self, message: discord.Message) -> bool:
-        """Check for Discord invite links"""
-        if self.invite_pattern.search(message.content):
+    async def _check_invites(self, ctx: MessageContext) -> bool:
+        """Check for Discord invite links, including spaced-out or look-alike ones"""
+        message = ctx.message
+        if ctx.analysis.invite_codes:
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
                 
                 embed = warning_embed(
                     "Invite Link Blocked",
                     f"{message.author.mention}, posting invite links is not allowed."
                 )
-                await message.channel.send(embed=embed, delete_after=5)
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=5), route=('send', message.channel.id))
                 
                 return True
             except:
@@ -194,19 +192,19 @@ class AutoMod(commands.Cog):
         
         return False
     
-    async def _check_mass_mentions(self, message: discord.Message) -> bool:
+    async def _check_mass_mentions(self, ctx: MessageContext) -> bool:
         """Check for mass mentions"""
-        mention_count = len(message.mentions) + len(message.role_mentions)
+        message = ctx.message
         
-        if mention_count > config.AutoMod.MAX_MENTIONS:
+        if ctx.mention_count > config.AutoMod.MAX_MENTIONS:
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
                 
                 embed = warning_embed(
                     "Mass Mentions",
                     f"{message.author.mention}, please don't mention too many users/roles at once."
                 )
-                await message.channel.send(embed=embed, delete_after=5)
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=5), route=('send', message.channel.id))
                 
                 return True
             except:
@@ -214,13 +212,12 @@ class AutoMod(commands.Cog):
         
         return False
     
-    async def _check_everyone_pings(self, message: discord.Message) -> bool:
+    async def _check_everyone_pings(self, ctx: MessageContext) -> bool:
         """Check for @everyone/@here pings from non-authorized users"""
-        # Get guild settings to check if everyone ping protection is enabled
-        settings = await self.bot.db.get_guild_settings(message.guild.id)
+        message = ctx.message
         
-        # Check if the feature is enabled
-        if not getattr(settings, 'everyone_ping_protection', True):
+        # Check if the feature is enabled (settings the pipeline already loaded)
+        if not ctx.guild_settings.everyone_ping_protection:
             return False
         
         # Check if message contains @everyone or @here mentions
@@ -238,7 +235,7 @@ class AutoMod(commands.Cog):
                 return False
             
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
                 
                 # Add a warning to the user
                 await self.bot.db.add_warning(
@@ -252,7 +249,7 @@ class AutoMod(commands.Cog):
                     "Everyone Ping Blocked",
                     f"{message.author.mention}, you don't have permission to ping @everyone or @here."
                 )
-                await message.channel.send(embed=embed, delete_after=10)
+                self.bot.outbound.submit(Priority.NOTICE, message.channel.send(embed=embed, delete_after=10), route=('send', message.channel.id))
                 
                 # Log the action to mod log if configured
                 if settings.mod_log_channel:
@@ -269,10 +266,7 @@ class AutoMod(commands.Cog):
                         log_embed.add_field(name="User Roles", value=", ".join([role.name for role in message.author.roles[1:]]) or "None", inline=True)
                         log_embed.add_field(name="Message Content", value=message.content[:1000] if message.content else "No content", inline=False)
                         
-                        try:
-                            await log_channel.send(embed=log_embed)
-                        except:
-                            pass
+                        self.bot.log_buffer.add(log_channel, log_embed)
                 
                 return True
             except Exception as e:
@@ -289,10 +283,7 @@ class AutoMod(commands.Cog):
                         log_embed.add_field(name="Channel", value=message.channel.mention, inline=True)
                         log_embed.add_field(name="Error", value=str(e)[:500], inline=True)
                         
-                        try:
-                            await log_channel.send(embed=log_embed)
-                        except:
-                            pass
+                        self.bot.log_buffer.add(log_channel, log_embed)
         
         return False
     
@@ -351,7 +342,7 @@ class AutoMod(commands.Cog):
     @app_commands.command(name="blacklist", description="Manage blacklisted words")
     @app_commands.describe(
         action="Add or remove word",
-        word="Word to add/remove"
+        word="Word to add/remove (* matches the rest of a word, e.g. spam*)"
     )
     @is_moderator()
     async def blacklist(
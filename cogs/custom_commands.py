@@ -9,6 +9,7 @@ from typing import Optional
 from utils.embeds import success_embed, info_embed, error_embed
 from utils.checks import is_moderator
 from utils.helpers import replace_variables
+from utils.message_pipeline import MessageContext
 import config
 
 class CustomCommands(commands.Cog):
@@ -17,18 +18,22 @@ class CustomCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Check for custom commands"""
-        if message.author.bot or not message.guild:
-            return
-        
-        # Check if message starts with prefix
-        if not message.content.startswith(config.PREFIX):
-            return
+    async def cog_load(self):
+        """Register the custom command stage with the message pipeline"""
+        self.bot.message_pipeline.register('custom_commands', self.process_message, priority=30)
+    
+    async def cog_unload(self):
+        """Remove the custom command stage from the message pipeline"""
+        self.bot.message_pipeline.unregister('custom_commands')
+    
+    async def process_message(self, ctx: MessageContext) -> bool:
+        """Check for custom commands (message pipeline stage)"""
+        # Only messages starting with the prefix
+        trigger = ctx.command_trigger
+        if not trigger:
+            return False
         
-        # Extract command trigger
-        trigger = message.content[len(config.PREFIX):].split()[0].lower()
+        message = ctx.message
         
         # Check if custom command exists
         custom_cmd = await self.bot.db.get_custom_command(message.guild.id, trigger)
@@ -43,6 +48,8 @@ class CustomCommands(commands.Cog):
             )
             
             await message.channel.send(response)
+        
+        return False
     
     @app_commands.command(name="customcmd-add", description="Create a custom command")
     @app_commands.describe(
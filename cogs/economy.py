@@ -9,6 +9,7 @@ import random
 from typing import Optional
 
 from utils.embeds import economy_embed, leaderboard_embed, success_embed, error_embed
+from utils.message_pipeline import MessageContext
 import config
 
 class Economy(commands.Cog):
@@ -17,35 +18,35 @@ class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Award XP for messages"""
-        # Ignore bots and DMs
-        if message.author.bot or not message.guild:
-            return
-        
-        user_data = await self.bot.db.get_or_create_user(
-            message.author.id,
-            message.guild.id
-        )
-        
-        now = datetime.utcnow()
-        
-        # Check cooldown
-        if user_data.last_message:
-            time_since = now - user_data.last_message
-            if time_since.total_seconds() < config.Leveling.XP_COOLDOWN:
-                return
+    async def cog_load(self):
+        """Register the XP stage with the message pipeline"""
+        self.bot.message_pipeline.register('leveling', self.process_message, priority=40)
+    
+    async def cog_unload(self):
+        """Remove the XP stage from the message pipeline"""
+        self.bot.message_pipeline.unregister('leveling')
+    
+    async def process_message(self, ctx: MessageContext) -> bool:
+        """Award XP for messages (message pipeline stage)"""
+        message = ctx.message
         
-        # Award XP
+        # Award XP (atomic increment, skipped while the user is on cooldown)
         xp_gain = random.randint(
             config.Leveling.XP_PER_MESSAGE_MIN,
             config.Leveling.XP_PER_MESSAGE_MAX
         )
         
+        user_data = await self.bot.db.add_xp(
+            message.author.id,
+            message.guild.id,
+            xp_gain,
+            config.Leveling.XP_COOLDOWN
+        )
+        if not user_data:
+            return False
+        
         old_level = user_data.level
-        user_data.xp += xp_gain
-        user_data.last_message = now
+        old_xp = user_data.xp
         
         # Calculate new level
         new_level = config.Leveling.calculate_level(user_data.xp)
@@ -55,10 +56,15 @@ class Economy(commands.Cog):
             new_level = 1000
             user_data.xp = config.Leveling.calculate_xp_for_level(1000)
         
-        # Check for level up
         if new_level > old_level:
             user_data.level = new_level
-            
+        
+        # Only level changes and the XP cap need a second write
+        if user_data.level != old_level or user_data.xp != old_xp:
+            await self.bot.db.set_level(message.author.id, message.guild.id, user_data.level, user_data.xp)
+        
+        # Check for level up
+        if new_level > old_level:
             # Send level up message
             embed = discord.Embed(
                 title=f"{config.Emojis.LEVEL_UP} Level Up!",
@@ -76,10 +82,7 @@ class Economy(commands.Cog):
             
             await message.channel.send(embed=embed, delete_after=10)
         
-        await self.bot.db.update_user(user_data)
-        
-        # Process commands (required for prefix commands to work)
-        await self.bot.process_commands(message)
+        return False
     
     @app_commands.command(name="level", description="Check your or someone's level")
     @app_commands.describe(user="User to check level (optional)")
@@ -134,50 +137,37 @@ class Economy(commands.Cog):
     @app_commands.command(name="daily", description="Claim your daily reward")
     async def daily(self, interaction: discord.Interaction):
         """Claim daily reward"""
-        user_data = await self.bot.db.get_or_create_user(
+        # Give reward (atomic, so racing claims can't both succeed)
+        balance = await self.bot.db.claim_daily(
             interaction.user.id,
-            interaction.guild.id
+            interaction.guild.id,
+            config.Economy.DAILY_REWARD
         )
         
-        now = datetime.utcnow()
-        
-        # Check if daily is available
-        if user_data.last_daily:
-            time_since = now - user_data.last_daily
-            if time_since < timedelta(days=1):
-                time_left = timedelta(days=1) - time_since
-                hours = int(time_left.total_seconds() // 3600)
-                minutes = int((time_left.total_seconds() % 3600) // 60)
-                
-                await interaction.response.send_message(
-                    f"⏳ You can claim your daily reward in {hours}h {minutes}m",
-                    ephemeral=True
-                )
-                return
-        
-        # Give reward
-        user_data.balance += config.Economy.DAILY_REWARD
-        user_data.last_daily = now
-        await self.bot.db.update_user(user_data)
+        if balance is None:
+            user_data = await self.bot.db.get_user(interaction.user.id, interaction.guild.id)
+            time_left = timedelta(days=1) - (datetime.utcnow() - user_data.last_daily)
+            hours = int(time_left.total_seconds() // 3600)
+            minutes = int((time_left.total_seconds() % 3600) // 60)
+            
+            await interaction.response.send_message(
+                f"⏳ You can claim your daily reward in {hours}h {minutes}m",
+                ephemeral=True
+            )
+            return
         
         embed = success_embed(
             "Daily Reward Claimed",
-            f"You received **${config.Economy.DAILY_REWARD:,}**!\n\nNew balance: **${user_data.balance:,}**"
+            f"You received **${config.Economy.DAILY_REWARD:,}**!\n\nNew balance: **${balance:,}**"
         )
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="work", description="Work to earn money")
     async def work(self, interaction: discord.Interaction):
         """Work to earn money"""
-        user_data = await self.bot.db.get_or_create_user(
-            interaction.user.id,
-            interaction.guild.id
-        )
-        
         # Random earnings
         earnings = random.randint(config.Economy.WORK_MIN, config.Economy.WORK_MAX)
-        user_data.balance += earnings
-        await self.bot.db.update_user(user_data)
+        balance = await self.bot.db.add_balance(interaction.user.id, interaction.guild.id, earnings)
         
         jobs = [
             "worked as a developer",
@@ -194,22 +184,16 @@ class Economy(commands.Cog):
         
         embed = success_embed(
             "Work Complete",
-            f"You {job} and earned **${earnings:,}**!\n\nNew balance: **${user_data.balance:,}**"
+            f"You {job} and earned **${earnings:,}**!\n\nNew balance: **${balance:,}**"
         )
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="beg", description="Beg for money")
     async def beg(self, interaction: discord.Interaction):
         """Beg for money"""
-        user_data = await self.bot.db.get_or_create_user(
-            interaction.user.id,
-            interaction.guild.id
-        )
-        
         # Random earnings (smaller than work)
         earnings = random.randint(config.Economy.BEG_MIN, config.Economy.BEG_MAX)
-        user_data.balance += earnings
-        await self.bot.db.update_user(user_data)
+        balance = await self.bot.db.add_balance(interaction.user.id, interaction.guild.id, earnings)
         
         responses = [
             f"Someone gave you **${earnings:,}**!",
@@ -220,7 +204,7 @@ class Economy(commands.Cog):
         
         embed = success_embed(
             "Begging Success",
-            f"{random.choice(responses)}\n\nNew balance: **${user_data.balance:,}**"
+            f"{random.choice(responses)}\n\nNew balance: **${balance:,}**"
         )
         await interaction.response.send_message(embed=embed)
     
@@ -246,17 +230,10 @@ class Economy(commands.Cog):
             )
             return
         
-        robber_data = await self.bot.db.get_or_create_user(
-            interaction.user.id,
-            interaction.guild.id
-        )
-        target_data = await self.bot.db.get_or_create_user(
-            user.id,
-            interaction.guild.id
-        )
+        target_data = await self.bot.db.get_user(user.id, interaction.guild.id)
         
         # Check if target has money
-        if target_data.balance < 100:
+        if not target_data or target_data.balance < 100:
             await interaction.response.send_message(
                 f"❌ {user.mention} doesn't have enough money to rob!",
                 ephemeral=True
@@ -271,26 +248,29 @@ class Economy(commands.Cog):
                 config.Economy.ROB_MAX_PERCENT
             ))
             
-            robber_data.balance += amount
-            target_data.balance -= amount
-            
-            await self.bot.db.update_user(robber_data)
-            await self.bot.db.update_user(target_data)
+            result = await self.bot.db.transfer(interaction.guild.id, user.id, interaction.user.id, amount)
+            if not result:
+                # Target spent the money between the check and the robbery
+                await interaction.response.send_message(
+                    f"❌ {user.mention} doesn't have enough money to rob!",
+                    ephemeral=True
+                )
+                return
             
+            _, robber_balance = result
             embed = success_embed(
                 "Robbery Successful",
-                f"You robbed **${amount:,}** from {user.mention}!\n\nYour balance: **${robber_data.balance:,}**"
+                f"You robbed **${amount:,}** from {user.mention}!\n\nYour balance: **${robber_balance:,}**"
             )
             await interaction.response.send_message(embed=embed)
         else:
             # Failure - lose money
             fine = random.randint(50, 200)
-            robber_data.balance = max(0, robber_data.balance - fine)
-            await self.bot.db.update_user(robber_data)
+            robber_balance = await self.bot.db.add_balance(interaction.user.id, interaction.guild.id, -fine)
             
             embed = error_embed(
                 "Robbery Failed",
-                f"You got caught and paid a fine of **${fine:,}**!\n\nYour balance: **${robber_data.balance:,}**"
+                f"You got caught and paid a fine of **${fine:,}**!\n\nYour balance: **${robber_balance:,}**"
             )
             await interaction.response.send_message(embed=embed)
     
@@ -327,33 +307,22 @@ class Economy(commands.Cog):
             )
             return
         
-        payer_data = await self.bot.db.get_or_create_user(
-            interaction.user.id,
-            interaction.guild.id
-        )
+        # Transfer money (atomic, only if the payer can cover it)
+        result = await self.bot.db.transfer(interaction.guild.id, interaction.user.id, user.id, amount)
         
-        if payer_data.balance < amount:
+        if not result:
+            payer_data = await self.bot.db.get_user(interaction.user.id, interaction.guild.id)
+            balance = payer_data.balance if payer_data else 0
             await interaction.response.send_message(
-                f"❌ You don't have enough money! Your balance: **${payer_data.balance:,}**",
+                f"❌ You don't have enough money! Your balance: **${balance:,}**",
                 ephemeral=True
             )
             return
         
-        receiver_data = await self.bot.db.get_or_create_user(
-            user.id,
-            interaction.guild.id
-        )
-        
-        # Transfer money
-        payer_data.balance -= amount
-        receiver_data.balance += amount
-        
-        await self.bot.db.update_user(payer_data)
-        await self.bot.db.update_user(receiver_data)
-        
+        payer_balance, _ = result
         embed = success_embed(
             "Payment Sent",
-            f"You paid **${amount:,}** to {user.mention}!\n\nYour balance: **${payer_data.balance:,}**"
+            f"You paid **${amount:,}** to {user.mention}!\n\nYour balance: **${payer_balance:,}**"
         )
         await interaction.response.send_message(embed=embed)
     
@@ -422,16 +391,11 @@ class Economy(commands.Cog):
             )
             return
         
-        # Get or create user
-        user_data = await self.bot.db.get_or_create_user(user.id, interaction.guild.id)
-        
         # Calculate XP for the new level
         new_xp = config.Leveling.calculate_xp_for_level(level)
         
-        # Update user data
-        user_data.level = level
-        user_data.xp = new_xp
-        await self.bot.db.update_user(user_data)
+        # Update user data (creates the user if needed)
+        await self.bot.db.set_level(user.id, interaction.guild.id, level, new_xp)
         
         embed = success_embed(
             "Level Set",
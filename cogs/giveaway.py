@@ -11,6 +11,7 @@ import random
 import logging
 
 from utils.embeds import success_embed, info_embed, error_embed
+from utils.helpers import get_members_by_id
 import config
 
 logger = logging.getLogger('discord_bot.giveaway')
@@ -102,14 +103,10 @@ class Giveaway(commands.Cog):
         await giveaway_msg.add_reaction("🎉")
         
         # Store in database
-        await self.bot.db.connection.execute(
-            """INSERT INTO giveaways 
-               (message_id, channel_id, guild_id, prize, winners, end_time, host_id, active, requirements, min_level)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (giveaway_msg.id, target_channel.id, interaction.guild.id, 
-             prize, winners, end_time, interaction.user.id, True, requirements, min_level)
+        await self.bot.db.add_giveaway(
+            giveaway_msg.id, target_channel.id, interaction.guild.id,
+            prize, winners, end_time, interaction.user.id, requirements, min_level
         )
-        await self.bot.db.connection.commit()
         
         # Confirm
         await interaction.followup.send(
@@ -307,7 +304,9 @@ class Giveaway(commands.Cog):
                 ended_giveaways = await cursor.fetchall()
             
             for giveaway in ended_giveaways:
-                await self._end_giveaway(giveaway)
+                # Only the process running the guild's shard ends its giveaways
+                if self.bot.owns_guild(giveaway[3]):
+                    await self._end_giveaway(giveaway)
         
         except Exception as e:
             logger.error(f"Error checking giveaways: {e}")
@@ -330,11 +329,7 @@ class Giveaway(commands.Cog):
             except:
                 logger.error(f"Message {giveaway[1]} not found for giveaway")
                 # Mark as inactive
-                await self.bot.db.connection.execute(
-                    "UPDATE giveaways SET active = ? WHERE message_id = ?",
-                    (False, giveaway[1])
-                )
-                await self.bot.db.connection.commit()
+                await self.bot.db.end_giveaway(giveaway[1])
                 return
             
             # Get participants
@@ -350,11 +345,7 @@ class Giveaway(commands.Cog):
                 await message.edit(embed=embed)
                 
                 # Mark as inactive
-                await self.bot.db.connection.execute(
-                    "UPDATE giveaways SET active = ? WHERE message_id = ?",
-                    (False, giveaway[1])
-                )
-                await self.bot.db.connection.commit()
+                await self.bot.db.end_giveaway(giveaway[1])
                 return
             
             # Get users who reacted (exclude bots)
@@ -364,14 +355,12 @@ class Giveaway(commands.Cog):
             valid_users = []
             if giveaway[9]:  # min_level column
                 guild = channel.guild
-                for user in all_users:
-                    try:
-                        member = guild.get_member(user.id) or await guild.fetch_member(user.id)
-                        user_data = await self.bot.db.get_user(member.id, guild.id)
-                        if user_data.level >= giveaway[9]:
-                            valid_users.append(member)
-                    except:
-                        continue
+                # Entrants who left the server are dropped; uncached members are requested in batches
+                members = await get_members_by_id(guild, [user.id for user in all_users])
+                for member in members:
+                    user_data = await self.bot.db.get_user(member.id, guild.id)
+                    if user_data and user_data.level >= giveaway[9]:
+                        valid_users.append(member)
             else:
                 valid_users = all_users
             
@@ -409,11 +398,7 @@ class Giveaway(commands.Cog):
                 logger.info(f"Giveaway ended: {giveaway[4]} - Winners: {[str(w) for w in winners]}")
             
             # Mark as inactive
-            await self.bot.db.connection.execute(
-                "UPDATE giveaways SET active = ? WHERE message_id = ?",
-                (False, giveaway[1])
-            )
-            await self.bot.db.connection.commit()
+            await self.bot.db.end_giveaway(giveaway[1])
         
         except Exception as e:
             logger.error(f"Error ending giveaway: {e}")
@@ -430,37 +415,4 @@ class Giveaway(commands.Cog):
             raise ValueError("Invalid duration format")
 
 async def setup(bot):
-    # Create giveaways table
-    await bot.db.connection.execute("""
-        CREATE TABLE IF NOT EXISTS giveaways (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            message_id INTEGER NOT NULL,
-            channel_id INTEGER NOT NULL,
-            guild_id INTEGER NOT NULL,
-            prize TEXT NOT NULL,
-            winners INTEGER DEFAULT 1,
-            end_time TIMESTAMP NOT NULL,
-            host_id INTEGER NOT NULL,
-            active BOOLEAN DEFAULT 1,
-            requirements TEXT,
-            min_level INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    await bot.db.connection.commit()
-    
-    # Add requirements column if it doesn't exist (migration)
-    try:
-        await bot.db.connection.execute("ALTER TABLE giveaways ADD COLUMN requirements TEXT")
-        await bot.db.connection.commit()
-    except:
-        pass
-    
-    # Add min_level column if it doesn't exist (migration)
-    try:
-        await bot.db.connection.execute("ALTER TABLE giveaways ADD COLUMN min_level INTEGER")
-        await bot.db.connection.commit()
-    except:
-        pass
-    
     await bot.add_cog(Giveaway(bot))
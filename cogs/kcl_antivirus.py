@@ -17,6 +17,10 @@ from urllib.parse import urlparse
 
 from utils.embeds import success_embed, warning_embed, error_embed
 from utils.checks import is_moderator
+from utils.content_analysis import analyze_message
+from utils.metrics import http_trace_config
+from utils.outbound import Priority
+from utils.helpers import get_all_members
 import config
 
 logger = logging.getLogger('discord_bot.kcl_antivirus')
@@ -34,17 +38,12 @@ class KCLAntivirus(commands.Cog):
         self.scan_cooldowns = defaultdict(dict)  # guild_id: {user_id: timestamp}
         self.server_scan_cooldowns = {}  # guild_id: timestamp
         
-        # URL regex pattern
-        self.url_pattern = re.compile(
-            r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        )
-        
         # Start background tasks
         self.cleanup_tracking.start()
     
     async def cog_load(self):
         """Initialize HTTP session when cog loads"""
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(trace_configs=[http_trace_config()])
         logger.info("KCLAntivirus system initialized")
     
     async def cog_unload(self):
@@ -105,7 +104,7 @@ class KCLAntivirus(commands.Cog):
             await self._scan_attachments(message)
         
         # Scan URLs in message content
-        urls = self.url_pattern.findall(message.content)
+        urls = analyze_message(message).urls
         if urls:
             await self._scan_urls(message, urls)
     
@@ -304,11 +303,11 @@ class KCLAntivirus(commands.Cog):
         """Handle detected threats"""
         try:
             # Delete the message
-            await message.delete()
+            await self.bot.outbound.enforce(message.delete())
             
             # Timeout the user
             timeout_duration = timedelta(days=config.KCLAntivirus.VIRUS_TIMEOUT_DAYS)
-            await message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected")
+            await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected"))
             
             # Add warning
             await self.bot.db.add_warning(
@@ -319,7 +318,7 @@ class KCLAntivirus(commands.Cog):
             )
             
             # DM the user
-            await self._dm_user_threat(message.author, item_name, threat_level, malicious, suspicious)
+            self.bot.outbound.submit(Priority.DM, self._dm_user_threat(message.author, item_name, threat_level, malicious, suspicious), route=('dm', message.author.id))
             
             # Log to mod channel
             await self._log_threat_detection(message, item_name, threat_level, malicious, suspicious)
@@ -356,10 +355,7 @@ class KCLAntivirus(commands.Cog):
                 embed.add_field(name="Channel", value=message.channel.mention, inline=True)
                 embed.add_field(name="File Size", value=f"{attachment.size / (1024*1024):.1f} MB", inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _dm_user_threat(self, user: discord.Member, item_name: str, threat_level: str, malicious: int, suspicious: int):
         """Send DM to user about threat detection"""
@@ -409,10 +405,7 @@ class KCLAntivirus(commands.Cog):
         if message.content:
             embed.add_field(name="Message Content", value=message.content[:1000], inline=False)
         
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Failed to log threat detection: {e}")
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _check_raid_activity(self, guild: discord.Guild) -> bool:
         """Check for raid activity patterns"""
@@ -491,8 +484,8 @@ async def setup(bot):
         kicked_count = 0
         protected_count = 0
         
-        # Kick non-protected members
-        for member in guild.members:
+        # Kick non-protected members (the member cache may be partial)
+        for member in await get_all_members(guild):
             if member.bot:
                 continue
             
@@ -559,7 +552,7 @@ async def setup(bot):
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Users Kicked", value=str(kicked_count), inline=True)
         embed.add_field(name="Protected Users", value=str(protected_count), inline=True)
-        embed.add_field(name="Total Members", value=str(len(guild.members)), inline=True)
+        embed.add_field(name="Total Members", value=str(guild.member_count), inline=True)
         
         try:
             await log_channel.send("@everyone", embed=embed)
@@ -18,6 +18,10 @@ from urllib.parse import urlparse
 
 from utils.embeds import success_embed, warning_embed, error_embed
 from utils.checks import is_moderator
+from utils.content_analysis import analyze_message
+from utils.metrics import http_trace_config
+from utils.outbound import Priority
+from utils.helpers import get_all_members
 import config
 
 logger = logging.getLogger('discord_bot.kcl_antivirus')
@@ -94,11 +98,6 @@ class KCLAntivirusAdvanced(commands.Cog):
         self.threat_cache = {}  # Cache scan results
         self.lockdown_history = defaultdict(list)
         
-        # Advanced patterns
-        self.url_pattern = re.compile(
-            r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        )
-        
         # Suspicious patterns for enhanced detection
         self.suspicious_patterns = [
             re.compile(r'discord\.gg/[a-zA-Z0-9]+'),  # Discord invites
@@ -107,6 +106,8 @@ class KCLAntivirusAdvanced(commands.Cog):
             re.compile(r'[a-zA-Z0-9]+\.tk'),          # Suspicious TLD
             re.compile(r'[a-zA-Z0-9]+\.ml'),          # Suspicious TLD
         ]
+        # All of the above in one pass; group N is suspicious_patterns[N - 1]
+        self.suspicious_pattern = re.compile('|'.join(f'({pattern.pattern})' for pattern in self.suspicious_patterns))
         
         # Start background tasks
         self.cleanup_tracking.start()
@@ -114,7 +115,7 @@ class KCLAntivirusAdvanced(commands.Cog):
     
     async def cog_load(self):
         """Initialize HTTP session and advanced features when cog loads"""
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(trace_configs=[http_trace_config()])
         logger.info("KCLAntivirus Advanced system initialized")
     
     async def cog_unload(self):
@@ -193,10 +194,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                     embed.add_field(name="Messages (1h)", value=str(len(recent_messages)), inline=True)
                     embed.add_field(name="Recommendation", value="Monitor for coordinated activity", inline=True)
                     
-                    try:
-                        await log_channel.send(embed=embed)
-                    except:
-                        pass
+                    self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -218,14 +216,15 @@ class KCLAntivirusAdvanced(commands.Cog):
         self.message_activity[message.guild.id].append((now, message.author.id))
         
         # Advanced threat detection
-        threat_score = await self._calculate_threat_score(message)
+        analysis = analyze_message(message)
+        threat_score = await self._calculate_threat_score(message, analysis)
         
         # Check for raid patterns first
         if await self._check_raid_activity(message.guild):
             return
         
         # Enhanced content analysis
-        if await self._check_suspicious_patterns(message):
+        if await self._check_suspicious_patterns(message, analysis):
             return
         
         # Scan attachments with advanced analysis
@@ -233,9 +232,8 @@ class KCLAntivirusAdvanced(commands.Cog):
             await self._scan_attachments_advanced(message)
         
         # Scan URLs with enhanced detection
-        urls = self.url_pattern.findall(message.content)
-        if urls:
-            await self._scan_urls_advanced(message, urls)
+        if analysis.urls:
+            await self._scan_urls_advanced(message, analysis.urls)
         
         # Log high threat score messages
         if threat_score > 0.7:
@@ -270,8 +268,9 @@ class KCLAntivirusAdvanced(commands.Cog):
         # Check for raid patterns
         await self._check_raid_activity(member.guild)
     
-    async def _calculate_threat_score(self, message):
+    async def _calculate_threat_score(self, message, analysis=None):
         """Calculate threat score based on multiple factors"""
+        analysis = analysis or analyze_message(message)
         score = 0.0
         
         # Account age factor
@@ -281,36 +280,27 @@ class KCLAntivirusAdvanced(commands.Cog):
         elif account_age < 30:
             score += 0.1
         
-        # Message content analysis
-        content = message.content.lower()
-        
-        # Suspicious keywords
-        suspicious_words = ['free', 'nitro', 'gift', 'hack', 'cheat', 'generator', 'discord.gg']
-        for word in suspicious_words:
-            if word in content:
-                score += 0.1
+        # Suspicious keywords (and 'discord.gg' invites), once each
+        score += len(analysis.keyword_hits) * 0.1
         
         # URL analysis
-        urls = self.url_pattern.findall(message.content)
-        if urls:
-            score += len(urls) * 0.2
+        if analysis.urls:
+            score += len(analysis.urls) * 0.2
         
-        # Caps ratio
-        if len(content) > 10:
-            caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
-            if caps_ratio > 0.5:
-                score += 0.2
+        # Caps ratio (upper case share of the letters in the normalized text)
+        if analysis.length > 10 and analysis.caps_ratio > 0.5:
+            score += 0.2
         
         return min(score, 1.0)  # Cap at 1.0
     
-    async def _check_suspicious_patterns(self, message):
+    async def _check_suspicious_patterns(self, message, analysis=None):
         """Check for suspicious patterns in message content"""
-        content = message.content
+        analysis = analysis or analyze_message(message)
         
-        for pattern in self.suspicious_patterns:
-            if pattern.search(content):
-                await self._handle_suspicious_pattern(message, pattern.pattern)
-                return True
+        match = self.suspicious_pattern.search(analysis.normalized)
+        if match:
+            await self._handle_suspicious_pattern(message, self.suspicious_patterns[match.lastindex - 1].pattern)
+            return True
         
         return False
     
@@ -335,10 +325,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                 embed.add_field(name="Message", value=message.content[:500], inline=False)
                 embed.add_field(name="Action", value="Flagged for review", inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _is_protected_user(self, user):
         """Enhanced protection check with role hierarchy"""
@@ -406,11 +393,12 @@ class KCLAntivirusAdvanced(commands.Cog):
         for url in urls:
             try:
                 # Enhanced URL analysis
+                parsed = urlparse(url)
                 url_info = {
                     'url': url,
-                    'domain': urlparse(url).netloc,
-                    'scheme': urlparse(url).scheme,
-                    'path': urlparse(url).path
+                    'domain': parsed.netloc,
+                    'scheme': parsed.scheme,
+                    'path': parsed.path
                 }
                 
                 # Check against known malicious domains
@@ -632,7 +620,9 @@ class KCLAntivirusAdvanced(commands.Cog):
     async def _handle_threat_advanced(self, message, item_name, threat_level, malicious, suspicious, details=""):
         """Advanced threat handling with comprehensive response"""
         try:
-            # Log the threat first
+            # Delete the message first, then record the threat
+            await self.bot.outbound.enforce(message.delete())
+            
             log_id = await self.bot.db.add_antivirus_scan_log(
                 message.guild.id,
                 message.author.id,
@@ -644,9 +634,6 @@ class KCLAntivirusAdvanced(commands.Cog):
                 f"Message deleted, user timed out for {config.KCLAntivirus.VIRUS_TIMEOUT_DAYS} day(s)"
             )
             
-            # Delete the message
-            await message.delete()
-            
             # Determine timeout duration based on threat level
             if threat_level == "MALICIOUS":
                 timeout_days = config.KCLAntivirus.VIRUS_TIMEOUT_DAYS
@@ -657,7 +644,7 @@ class KCLAntivirusAdvanced(commands.Cog):
             
             # Timeout the user
             timeout_duration = timedelta(days=timeout_days)
-            await message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected")
+            await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected"))
             
             # Add warning with detailed information
             await self.bot.db.add_warning(
@@ -668,7 +655,7 @@ class KCLAntivirusAdvanced(commands.Cog):
             )
             
             # Send advanced DM to user
-            await self._dm_user_threat_advanced(message.author, item_name, threat_level, malicious, suspicious, details, timeout_days)
+            self.bot.outbound.submit(Priority.DM, self._dm_user_threat_advanced(message.author, item_name, threat_level, malicious, suspicious, details, timeout_days), route=('dm', message.author.id))
             
             # Advanced logging to mod channel
             await self._log_threat_detection_advanced(message, item_name, threat_level, malicious, suspicious, details, log_id)
@@ -679,7 +666,7 @@ class KCLAntivirusAdvanced(commands.Cog):
             logger.error(f"Error in advanced threat handling: {e}")
             # Fallback: at least try to delete the message
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
             except:
                 pass
     
@@ -712,10 +699,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                 embed.add_field(name="Content Type", value=file_info.get('content_type', 'Unknown'), inline=True)
                 embed.add_field(name="Action", value="File allowed (too large to scan)", inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _dm_user_threat_advanced(self, user, item_name, threat_level, malicious, suspicious, details, timeout_days):
         """Send advanced DM to user about threat detection"""
@@ -798,10 +782,7 @@ class KCLAntivirusAdvanced(commands.Cog):
         
         embed.set_footer(text=f"User Account Created: {message.author.created_at.strftime('%Y-%m-%d')}")
         
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Failed to log advanced threat detection: {e}")
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _log_clean_scan(self, message, item_name, item_type, stats):
         """Log clean scans for statistics"""
@@ -841,10 +822,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                 embed.add_field(name="Message", value=message.content[:500], inline=False)
                 embed.add_field(name="Action", value="Flagged for review (no action taken)", inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _log_new_account_join(self, member, join_data):
         """Log new account joins for monitoring"""
@@ -862,10 +840,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                 embed.add_field(name="Account Age", value=f"{join_data['account_age']} days", inline=True)
                 embed.add_field(name="Created", value=member.created_at.strftime('%Y-%m-%d %H:%M'), inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _log_scan_error(self, message, item_name, error):
         """Log scanning errors"""
@@ -885,10 +860,7 @@ class KCLAntivirusAdvanced(commands.Cog):
                 embed.add_field(name="Item", value=item_name, inline=True)
                 embed.add_field(name="Error", value=error[:500], inline=False)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _check_raid_activity(self, guild):
         """Advanced raid activity detection with pattern analysis"""
@@ -1021,10 +993,7 @@ class KCLAntivirusAdvanced(commands.Cog):
         embed.add_field(name="Status", value="Monitoring", inline=True)
         embed.add_field(name="Action", value="No immediate action required", inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _get_auto_lockdown_setting(self, guild_id):
         """Get auto-lockdown setting for guild"""
@@ -1044,8 +1013,9 @@ class KCLAntivirusAdvanced(commands.Cog):
         # Get protected roles for detailed analysis
         protected_roles = await self.bot.db.get_antivirus_protected_roles(guild.id)
         
-        # Progress tracking
-        total_members = len([m for m in guild.members if not m.bot])
+        # Progress tracking (the member cache may be partial)
+        all_members = await get_all_members(guild)
+        total_members = len([m for m in all_members if not m.bot])
         processed = 0
         
         # Send progress updates if interaction provided
@@ -1061,7 +1031,7 @@ class KCLAntivirusAdvanced(commands.Cog):
         batch_size = 10
         members_to_kick = []
         
-        for member in guild.members:
+        for member in all_members:
             if member.bot:
                 continue
             
@@ -1217,7 +1187,7 @@ class KCLAntivirusAdvanced(commands.Cog):
         
         # Current server status
         embed.add_field(name="🔒 Server Status", value="SECURED - Threat neutralized", inline=False)
-        embed.add_field(name="📈 Remaining Members", value=str(len(guild.members)), inline=True)
+        embed.add_field(name="📈 Remaining Members", value=str(guild.member_count), inline=True)
         
         embed.set_footer(text="All affected users received explanatory DMs where possible")
         
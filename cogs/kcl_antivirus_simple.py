@@ -17,6 +17,10 @@ from urllib.parse import urlparse
 
 from utils.embeds import success_embed, warning_embed, error_embed
 from utils.checks import is_moderator
+from utils.metrics import http_trace_config
+from utils.outbound import Priority
+from utils.helpers import get_all_members
+from utils.message_pipeline import MessageContext
 import config
 
 logger = logging.getLogger('discord_bot.kcl_antivirus')
@@ -44,7 +48,11 @@ class KCLAntivirusSimple(commands.Cog):
     
     async def cog_load(self):
         """Initialize HTTP session when cog loads"""
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(trace_configs=[http_trace_config()])
+        self.bot.message_pipeline.register(
+            'antivirus', self.process_message, priority=20,
+            enabled=lambda settings, av_settings: av_settings.enabled
+        )
         logger.info("KCLAntivirus system initialized")
     
     async def cog_unload(self):
@@ -52,6 +60,7 @@ class KCLAntivirusSimple(commands.Cog):
         if self.session:
             await self.session.close()
         self.cleanup_tracking.cancel()
+        self.bot.message_pipeline.unregister('antivirus')
         logger.info("KCLAntivirus system shutdown")
     
     @tasks.loop(minutes=30)
@@ -77,20 +86,13 @@ class KCLAntivirusSimple(commands.Cog):
             if not self.message_activity[guild_id]:
                 del self.message_activity[guild_id]
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Monitor messages for files and links"""
-        if message.author.bot or not message.guild:
-            return
-        
-        # Check if antivirus is enabled
-        settings = await self.bot.db.get_antivirus_settings(message.guild.id)
-        if not settings.enabled:
-            return
-        
+    async def process_message(self, ctx: MessageContext) -> bool:
+        """Monitor messages for files and links (message pipeline stage)"""
         # Skip if user is protected
-        if await self._is_protected_user(message.author):
-            return
+        if ctx.antivirus_protected:
+            return False
+        
+        message = ctx.message
         
         # Track message activity for raid detection
         now = datetime.utcnow()
@@ -98,16 +100,24 @@ class KCLAntivirusSimple(commands.Cog):
         
         # Check for raid patterns
         if await self._check_raid_activity(message.guild):
-            return
+            return False
         
-        # Scan attachments
-        if message.attachments:
-            await self._scan_attachments(message)
+        # Scan attachments, then URLs, stopping once one of them removed the message
+        if message.attachments and await self._scan_attachments(message):
+            return True
         
-        # Scan URLs in message content
-        urls = self.url_pattern.findall(message.content)
-        if urls:
-            await self._scan_urls(message, urls)
+        if ctx.urls and await self._scan_urls(message, ctx.urls):
+            return True
+        
+        # Phishing domains outside a link, or hidden with look-alike letters,
+        # invisible characters or spacing (phishing links were removed above)
+        if message.content:
+            domain = self._find_hidden_phishing_domain(ctx.normalized_content)
+            if domain:
+                await self._handle_phishing_url(message, domain)
+                return True
+        
+        return False
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -148,8 +158,8 @@ class KCLAntivirusSimple(commands.Cog):
         
         return any(role_id in user_role_ids for role_id in protected_roles)
     
-    async def _scan_attachments(self, message):
-        """Scan message attachments for viruses"""
+    async def _scan_attachments(self, message) -> bool:
+        """Scan message attachments for viruses; returns True once the message was removed"""
         for attachment in message.attachments:
             try:
                 # Check file size
@@ -163,7 +173,7 @@ class KCLAntivirusSimple(commands.Cog):
                 # Check for dangerous extensions (always block)
                 if f'.{file_ext}' in config.KCLAntivirus.DANGEROUS_EXTENSIONS:
                     await self._handle_dangerous_file(message, attachment)
-                    continue
+                    return True
                 
                 # Skip safe extensions
                 if f'.{file_ext}' in config.KCLAntivirus.SAFE_EXTENSIONS:
@@ -174,19 +184,22 @@ class KCLAntivirusSimple(commands.Cog):
                     # Always scan suspicious files with VirusTotal
                     scan_result = await self._virustotal_scan_file(attachment)
                     if scan_result:
-                        await self._handle_scan_result(message, scan_result, attachment.filename)
+                        if await self._handle_scan_result(message, scan_result, attachment.filename):
+                            return True
                     else:
                         # If VirusTotal fails, flag as suspicious anyway
                         await self._handle_suspicious_file(message, attachment)
+                        return True
                     continue
                 
                 # Scan all other files with VirusTotal
                 scan_result = await self._virustotal_scan_file(attachment)
-                if scan_result:
-                    await self._handle_scan_result(message, scan_result, attachment.filename)
+                if scan_result and await self._handle_scan_result(message, scan_result, attachment.filename):
+                    return True
                     
             except Exception as e:
                 logger.error(f"Error scanning attachment {attachment.filename}: {e}")
+        return False
     
     async def _handle_suspicious_file(self, message, attachment):
         """Handle files with suspicious extensions"""
@@ -198,34 +211,75 @@ class KCLAntivirusSimple(commands.Cog):
             1
         )
     
-    async def _scan_urls(self, message, urls):
-        """Scan URLs for malicious content"""
+    async def _scan_urls(self, message, urls) -> bool:
+        """Scan URLs for malicious content; returns True once the message was removed"""
         for url in urls:
             try:
                 # First check against phishing domain blacklist
                 if self._is_phishing_domain(url):
                     await self._handle_phishing_url(message, url)
-                    continue
+                    return True
                 
                 # Check for suspicious URL patterns (URL shorteners, IP loggers, etc.)
                 if self._is_suspicious_url(url):
                     await self._handle_suspicious_url(message, url)
-                    continue
+                    return True
                 
                 # Then scan with VirusTotal
                 scan_result = await self._virustotal_scan_url(url)
-                if scan_result:
-                    await self._handle_scan_result(message, scan_result, url)
+                if scan_result and await self._handle_scan_result(message, scan_result, url):
+                    return True
             except Exception as e:
                 logger.error(f"Error scanning URL {url}: {e}")
+        return False
     
     def _is_phishing_domain(self, url):
         """Check if URL contains a known phishing domain"""
-        url_lower = url.lower()
+        return self._find_phishing_domain(url) is not None
+    
+    def _find_phishing_domain(self, text):
+        """Return the first known phishing domain found in text, if any"""
+        text_lower = text.lower()
         for phishing_domain in config.KCLAntivirus.PHISHING_DOMAINS:
-            if phishing_domain in url_lower:
+            if phishing_domain in text_lower:
+                return phishing_domain
+        return None
+    
+    def _find_hidden_phishing_domain(self, text):
+        """Return a known phishing domain written into (normalized) text, spaced out or not
+        
+        Whitespace is dropped so "d i s c o r d n i t r o . g i f t" matches,
+        but a match has to start and end at a word edge or punctuation, so the
+        end of one word and the start of the next can't make up a domain
+        """
+        words = text.lower().split()
+        compact = ''.join(words)
+        # Offsets in compact where a word starts or ends
+        word_edges = {0}
+        position = 0
+        for word in words:
+            position += len(word)
+            word_edges.add(position)
+        
+        def is_label(index):
+            return 0 <= index < len(compact) and (compact[index].isalnum() or compact[index] == '-')
+        
+        def is_end(index):
+            if index in word_edges:
                 return True
-        return False
+            if compact[index] == '.':
+                # A full stop ends the domain unless another label follows in the same word
+                return index + 1 in word_edges or not is_label(index + 1)
+            return not is_label(index)
+        
+        for phishing_domain in config.KCLAntivirus.PHISHING_DOMAINS:
+            start = compact.find(phishing_domain)
+            while start != -1:
+                end = start + len(phishing_domain)
+                if (start in word_edges or not is_label(start - 1)) and is_end(end):
+                    return phishing_domain
+                start = compact.find(phishing_domain, start + 1)
+        return None
     
     def _is_suspicious_url(self, url):
         """Check if URL contains suspicious patterns (URL shorteners, IP loggers, etc.)"""
@@ -239,11 +293,11 @@ class KCLAntivirusSimple(commands.Cog):
         """Handle suspicious URL (URL shorteners, IP loggers, etc.)"""
         try:
             # Delete the message
-            await message.delete()
+            await self.bot.outbound.enforce(message.delete())
             
             # Timeout the user
             timeout_duration = timedelta(days=config.KCLAntivirus.VIRUS_TIMEOUT_DAYS)
-            await message.author.timeout(timeout_duration, reason=f"KCLAntivirus: Posted suspicious URL ({url})")
+            await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus: Posted suspicious URL ({url})"))
             
             # Add warning
             await self.bot.db.add_warning(
@@ -267,7 +321,7 @@ class KCLAntivirusSimple(commands.Cog):
             )
             
             # DM the user
-            await self._dm_user_suspicious_url(message.author, url)
+            self.bot.outbound.submit(Priority.DM, self._dm_user_suspicious_url(message.author, url), route=('dm', message.author.id))
             
             # Log to mod channel
             await self._log_suspicious_url_detection(message, url)
@@ -324,20 +378,17 @@ class KCLAntivirusSimple(commands.Cog):
         if message.content:
             embed.add_field(name="Message Content", value=message.content[:1000], inline=False)
         
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Failed to log suspicious URL detection: {e}")
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _handle_phishing_url(self, message, url):
         """Handle detected phishing URL"""
         try:
             # Delete the message
-            await message.delete()
+            await self.bot.outbound.enforce(message.delete())
             
             # Timeout the user
             timeout_duration = timedelta(days=config.KCLAntivirus.VIRUS_TIMEOUT_DAYS)
-            await message.author.timeout(timeout_duration, reason=f"KCLAntivirus: Posted phishing URL ({url})")
+            await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus: Posted phishing URL ({url})"))
             
             # Add warning
             await self.bot.db.add_warning(
@@ -361,7 +412,7 @@ class KCLAntivirusSimple(commands.Cog):
             )
             
             # DM the user
-            await self._dm_user_phishing(message.author, url)
+            self.bot.outbound.submit(Priority.DM, self._dm_user_phishing(message.author, url), route=('dm', message.author.id))
             
             # Log to mod channel
             await self._log_phishing_detection(message, url)
@@ -418,10 +469,7 @@ class KCLAntivirusSimple(commands.Cog):
         if message.content:
             embed.add_field(name="Message Content", value=message.content[:1000], inline=False)
         
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Failed to log phishing detection: {e}")
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _virustotal_scan_file(self, attachment):
         """Scan file using VirusTotal API"""
@@ -524,8 +572,8 @@ class KCLAntivirusSimple(commands.Cog):
             logger.error(f"VirusTotal analysis retrieval error: {e}")
             return None
     
-    async def _handle_scan_result(self, message, scan_result, item_name):
-        """Handle virus scan results"""
+    async def _handle_scan_result(self, message, scan_result, item_name) -> bool:
+        """Handle virus scan results; returns True if the item was a threat and the message removed"""
         stats = scan_result.get('stats', {})
         malicious = stats.get('malicious', 0)
         suspicious = stats.get('suspicious', 0)
@@ -537,16 +585,18 @@ class KCLAntivirusSimple(commands.Cog):
         if is_malicious or is_suspicious:
             threat_level = "MALICIOUS" if is_malicious else "SUSPICIOUS"
             await self._handle_threat(message, item_name, threat_level, malicious, suspicious)
+            return True
+        return False
     
     async def _handle_threat(self, message, item_name, threat_level, malicious, suspicious):
         """Handle detected threats"""
         try:
             # Delete the message
-            await message.delete()
+            await self.bot.outbound.enforce(message.delete())
             
             # Timeout the user
             timeout_duration = timedelta(days=config.KCLAntivirus.VIRUS_TIMEOUT_DAYS)
-            await message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected")
+            await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus: {threat_level} content detected"))
             
             # Add warning
             await self.bot.db.add_warning(
@@ -570,7 +620,7 @@ class KCLAntivirusSimple(commands.Cog):
             )
             
             # DM the user
-            await self._dm_user_threat(message.author, item_name, threat_level, malicious, suspicious)
+            self.bot.outbound.submit(Priority.DM, self._dm_user_threat(message.author, item_name, threat_level, malicious, suspicious), route=('dm', message.author.id))
             
             # Log to mod channel
             await self._log_threat_detection(message, item_name, threat_level, malicious, suspicious)
@@ -590,7 +640,7 @@ class KCLAntivirusSimple(commands.Cog):
             
             # Delete the message
             try:
-                await message.delete()
+                await self.bot.outbound.enforce(message.delete())
                 logger.info(f"Deleted message {message.id} containing threat: {item_name}")
             except discord.NotFound:
                 logger.warning(f"Message {message.id} already deleted")
@@ -600,7 +650,7 @@ class KCLAntivirusSimple(commands.Cog):
             # Timeout the user
             try:
                 timeout_duration = timedelta(days=config.KCLAntivirus.VIRUS_TIMEOUT_DAYS)
-                await message.author.timeout(timeout_duration, reason=f"KCLAntivirus Server Scan: {threat_level} content detected ({item_name})")
+                await self.bot.outbound.enforce(message.author.timeout(timeout_duration, reason=f"KCLAntivirus Server Scan: {threat_level} content detected ({item_name})"))
                 logger.info(f"Timed out user {message.author} for {config.KCLAntivirus.VIRUS_TIMEOUT_DAYS} day(s)")
             except Exception as e:
                 logger.error(f"Failed to timeout user {message.author}: {e}")
@@ -618,7 +668,7 @@ class KCLAntivirusSimple(commands.Cog):
             
             # DM the user
             try:
-                await self._dm_user_threat(message.author, item_name, threat_level, 1, 0)
+                self.bot.outbound.submit(Priority.DM, self._dm_user_threat(message.author, item_name, threat_level, 1, 0), route=('dm', message.author.id))
             except Exception as e:
                 logger.error(f"Failed to DM user: {e}")
             
@@ -652,10 +702,7 @@ class KCLAntivirusSimple(commands.Cog):
                 embed.add_field(name="Channel", value=message.channel.mention, inline=True)
                 embed.add_field(name="File Size", value=f"{attachment.size / (1024*1024):.1f} MB", inline=True)
                 
-                try:
-                    await log_channel.send(embed=embed)
-                except:
-                    pass
+                self.bot.log_buffer.add(log_channel, embed)
     
     async def _dm_user_threat(self, user, item_name, threat_level, malicious, suspicious):
         """Send DM to user about threat detection"""
@@ -705,10 +752,7 @@ class KCLAntivirusSimple(commands.Cog):
         if message.content:
             embed.add_field(name="Message Content", value=message.content[:1000], inline=False)
         
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            logger.error(f"Failed to log threat detection: {e}")
+        self.bot.log_buffer.add(log_channel, embed)
     
     async def _check_raid_activity(self, guild):
         """Check for raid activity patterns"""
@@ -785,8 +829,8 @@ class KCLAntivirusSimple(commands.Cog):
         banned_count = 0
         protected_count = 0
         
-        # Ban non-protected members
-        for member in guild.members:
+        # Ban non-protected members (the member cache may be partial)
+        for member in await get_all_members(guild):
             if member.bot:
                 continue
             
@@ -875,7 +919,7 @@ class KCLAntivirusSimple(commands.Cog):
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.add_field(name="Users Banned", value=str(banned_count), inline=True)
         embed.add_field(name="Protected Users", value=str(protected_count), inline=True)
-        embed.add_field(name="Total Members", value=str(len(guild.members)), inline=True)
+        embed.add_field(name="Total Members", value=str(guild.member_count), inline=True)
         embed.add_field(name="Ban Duration", value="5 days (recommended 10+ days)", inline=True)
         
         try:
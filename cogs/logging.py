@@ -175,10 +175,7 @@ class Logging(commands.Cog):
         embed.add_field(name="User", value=interaction.user.mention, inline=True)
         embed.add_field(name="Channel", value=interaction.channel.mention, inline=True)
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error):
@@ -204,10 +201,7 @@ class Logging(commands.Cog):
         embed.add_field(name="User", value=ctx.author.mention, inline=True)
         embed.add_field(name="Channel", value=ctx.channel.mention, inline=True)
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -232,10 +226,7 @@ class Logging(commands.Cog):
         embed.add_field(name="Account Created", value=f"<t:{int(member.created_at.timestamp())}:R>", inline=True)
         embed.set_footer(text=f"Total Members: {member.guild.member_count}")
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -260,10 +251,7 @@ class Logging(commands.Cog):
         embed.add_field(name="Joined", value=f"<t:{int(member.joined_at.timestamp())}:R>" if member.joined_at else "Unknown", inline=True)
         embed.set_footer(text=f"Total Members: {member.guild.member_count}")
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
@@ -301,10 +289,7 @@ class Logging(commands.Cog):
             embed.add_field(name="Moderator", value=moderator.mention, inline=True)
         embed.add_field(name="Reason", value=reason, inline=False)
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
@@ -339,10 +324,7 @@ class Logging(commands.Cog):
         if moderator:
             embed.add_field(name="Moderator", value=moderator.mention, inline=True)
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -375,10 +357,7 @@ class Logging(commands.Cog):
         
         embed.set_footer(text=f"Message ID: {message.id}")
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
@@ -406,10 +385,7 @@ class Logging(commands.Cog):
         embed.add_field(name="Jump to Message", value=f"[Click here]({after.jump_url})", inline=False)
         embed.set_footer(text=f"Message ID: {before.id}")
         
-        try:
-            await channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
@@ -446,10 +422,7 @@ class Logging(commands.Cog):
         if creator:
             embed.add_field(name="Created by", value=creator.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
@@ -486,10 +459,7 @@ class Logging(commands.Cog):
         if deleter:
             embed.add_field(name="Deleted by", value=deleter.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: discord.Role):
@@ -524,10 +494,7 @@ class Logging(commands.Cog):
         if creator:
             embed.add_field(name="Created by", value=creator.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: discord.Role):
@@ -561,10 +528,7 @@ class Logging(commands.Cog):
         if deleter:
             embed.add_field(name="Deleted by", value=deleter.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
@@ -611,10 +575,7 @@ class Logging(commands.Cog):
         if updater:
             embed.add_field(name="Updated by", value=updater.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
     
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -674,10 +635,7 @@ class Logging(commands.Cog):
         if moderator:
             embed.add_field(name="Changed by", value=moderator.mention, inline=True)
         
-        try:
-            await log_channel.send(embed=embed)
-        except:
-            pass
+        self.bot.log_buffer.add(log_channel, embed)
 
 async def setup(bot):
     await bot.add_cog(Logging(bot))
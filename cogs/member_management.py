@@ -9,6 +9,7 @@ from datetime import datetime
 
 from utils.embeds import success_embed, error_embed, info_embed
 from utils.checks import is_moderator
+from utils.helpers import get_all_members
 import config
 
 class MemberManagement(commands.Cog):
@@ -17,6 +18,19 @@ class MemberManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
+    async def _all_members(self, interaction: discord.Interaction):
+        """Full member list; defers the response while Discord sends an uncached list"""
+        if not interaction.guild.chunked:
+            await interaction.response.defer()
+        return await get_all_members(interaction.guild)
+    
+    async def _send(self, interaction: discord.Interaction, embed: discord.Embed):
+        """Respond, or follow up if the response was deferred"""
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed)
+        else:
+            await interaction.response.send_message(embed=embed)
+    
     @app_commands.command(name="whois", description="Get detailed user information")
     @app_commands.describe(user="User to check")
     async def whois(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
@@ -37,39 +51,44 @@ class MemberManagement(commands.Cog):
     @app_commands.command(name="members", description="List all server members")
     async def members(self, interaction: discord.Interaction):
         """List members"""
-        members = [m.mention for m in interaction.guild.members[:50]]
+        all_members = await self._all_members(interaction)
+        members = [m.mention for m in all_members[:50]]
         embed = discord.Embed(title="Server Members", description="\n".join(members), color=config.Colors.INFO)
         embed.set_footer(text=f"Total: {interaction.guild.member_count}")
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="bots", description="List all bots")
     async def bots(self, interaction: discord.Interaction):
         """List bots"""
-        bots = [m.mention for m in interaction.guild.members if m.bot]
+        all_members = await self._all_members(interaction)
+        bots = [m.mention for m in all_members if m.bot]
         embed = discord.Embed(title="Server Bots", description="\n".join(bots) if bots else "No bots", color=config.Colors.INFO)
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="humans", description="List all human members")
     async def humans(self, interaction: discord.Interaction):
         """List humans"""
-        humans = [m.mention for m in interaction.guild.members if not m.bot][:50]
+        all_members = await self._all_members(interaction)
+        humans = [m.mention for m in all_members if not m.bot][:50]
         embed = discord.Embed(title="Human Members", description="\n".join(humans), color=config.Colors.INFO)
-        embed.set_footer(text=f"Total: {len([m for m in interaction.guild.members if not m.bot])}")
-        await interaction.response.send_message(embed=embed)
+        embed.set_footer(text=f"Total: {len([m for m in all_members if not m.bot])}")
+        await self._send(interaction, embed)
     
     @app_commands.command(name="mods", description="List all moderators")
     async def mods(self, interaction: discord.Interaction):
         """List moderators"""
-        mods = [m.mention for m in interaction.guild.members if m.guild_permissions.manage_messages]
+        all_members = await self._all_members(interaction)
+        mods = [m.mention for m in all_members if m.guild_permissions.manage_messages]
         embed = discord.Embed(title="Moderators", description="\n".join(mods) if mods else "No mods", color=config.Colors.INFO)
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="admins", description="List all administrators")
     async def admins(self, interaction: discord.Interaction):
         """List admins"""
-        admins = [m.mention for m in interaction.guild.members if m.guild_permissions.administrator]
+        all_members = await self._all_members(interaction)
+        admins = [m.mention for m in all_members if m.guild_permissions.administrator]
         embed = discord.Embed(title="Administrators", description="\n".join(admins) if admins else "No admins", color=config.Colors.INFO)
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="boosters", description="List all server boosters")
     async def boosters(self, interaction: discord.Interaction):
@@ -81,34 +100,37 @@ class MemberManagement(commands.Cog):
     @app_commands.command(name="oldest", description="Show oldest members")
     async def oldest(self, interaction: discord.Interaction):
         """Oldest members"""
-        members = sorted(interaction.guild.members, key=lambda m: m.joined_at)[:10]
+        all_members = await self._all_members(interaction)
+        members = sorted(all_members, key=lambda m: m.joined_at)[:10]
         embed = discord.Embed(title="Oldest Members", color=config.Colors.INFO)
         for i, m in enumerate(members, 1):
             embed.add_field(name=f"{i}. {m.name}", value=f"Joined <t:{int(m.joined_at.timestamp())}:R>", inline=False)
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="newest", description="Show newest members")
     async def newest(self, interaction: discord.Interaction):
         """Newest members"""
-        members = sorted(interaction.guild.members, key=lambda m: m.joined_at, reverse=True)[:10]
+        all_members = await self._all_members(interaction)
+        members = sorted(all_members, key=lambda m: m.joined_at, reverse=True)[:10]
         embed = discord.Embed(title="Newest Members", color=config.Colors.INFO)
         for i, m in enumerate(members, 1):
             embed.add_field(name=f"{i}. {m.name}", value=f"Joined <t:{int(m.joined_at.timestamp())}:R>", inline=False)
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="joinposition", description="Check join position")
     @app_commands.describe(user="User to check")
     async def joinposition(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
         """Join position"""
         user = user or interaction.user
-        members = sorted(interaction.guild.members, key=lambda m: m.joined_at)
+        all_members = await self._all_members(interaction)
+        members = sorted(all_members, key=lambda m: m.joined_at)
         position = members.index(user) + 1
         embed = discord.Embed(
             title="Join Position",
             description=f"{user.mention} was the **#{position}** member to join",
             color=config.Colors.INFO
         )
-        await interaction.response.send_message(embed=embed)
+        await self._send(interaction, embed)
     
     @app_commands.command(name="permissions", description="Check user permissions")
     @app_commands.describe(user="User to check")
@@ -814,7 +814,7 @@ class Moderation(commands.Cog):
             if settings.mod_log_channel:
                 channel = guild.get_channel(settings.mod_log_channel)
                 if channel:
-                    await channel.send(embed=embed)
+                    self.bot.log_buffer.add(channel, embed)
         except:
             pass  # Silently fail if logging fails
 
@@ -8,6 +8,7 @@ from typing import Optional
 
 from utils.embeds import success_embed, error_embed
 from utils.checks import is_moderator
+from utils.helpers import get_all_members
 import config
 
 class RoleManagement(commands.Cog):
@@ -107,7 +108,7 @@ class RoleManagement(commands.Cog):
         """Role all members"""
         await interaction.response.defer()
         count = 0
-        for member in interaction.guild.members:
+        for member in await get_all_members(interaction.guild):
             if not member.bot and role not in member.roles:
                 try:
                     await member.add_roles(role)
@@ -124,7 +125,7 @@ class RoleManagement(commands.Cog):
         """Remove role from all"""
         await interaction.response.defer()
         count = 0
-        for member in interaction.guild.members:
+        for member in await get_all_members(interaction.guild):
             if role in member.roles:
                 try:
                     await member.remove_roles(role)
@@ -141,7 +142,7 @@ class RoleManagement(commands.Cog):
         """Role humans"""
         await interaction.response.defer()
         count = 0
-        for member in interaction.guild.members:
+        for member in await get_all_members(interaction.guild):
             if not member.bot and role not in member.roles:
                 try:
                     await member.add_roles(role)
@@ -158,7 +159,7 @@ class RoleManagement(commands.Cog):
         """Role bots"""
         await interaction.response.defer()
         count = 0
-        for member in interaction.guild.members:
+        for member in await get_all_members(interaction.guild):
             if member.bot and role not in member.roles:
                 try:
                     await member.add_roles(role)
@@ -10,6 +10,7 @@ from typing import Optional
 
 from utils.embeds import user_info_embed, server_info_embed, info_embed, success_embed
 from utils.helpers import parse_time
+from utils.message_pipeline import MessageContext
 import config
 
 class Utility(commands.Cog):
@@ -19,6 +20,14 @@ class Utility(commands.Cog):
         self.bot = bot
         self.afk_users = {}  # user_id: reason
     
+    async def cog_load(self):
+        """Register the AFK stage with the message pipeline (runs in DMs too)"""
+        self.bot.message_pipeline.register('afk', self.process_message, priority=50, guild_only=False)
+    
+    async def cog_unload(self):
+        """Remove the AFK stage from the message pipeline"""
+        self.bot.message_pipeline.unregister('afk')
+    
     @commands.hybrid_command(name="userinfo", description="Get information about a user")
     @app_commands.describe(user="User to get info about (optional)")
     async def userinfo(
@@ -181,11 +190,11 @@ class Utility(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
     
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Check for AFK users"""
-        if message.author.bot:
-            return
+    async def process_message(self, ctx: MessageContext) -> bool:
+        """Check for AFK users (message pipeline stage)"""
+        message = ctx.message
+        if not self.afk_users:
+            return False
         
         # Check if user is AFK and remove status
         if message.author.id in self.afk_users:
@@ -211,6 +220,8 @@ class Utility(commands.Cog):
                     f"{mention.name} is AFK: {afk_data['reason']} ({format_time(int(time_afk.total_seconds()))} ago)",
                     delete_after=5
                 )
+        
+        return False
     
     @commands.hybrid_command(name="ping", description="Check bot latency")
     async def ping(self, ctx: commands.Context):
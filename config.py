@@ -19,6 +19,100 @@ VIRUSTOTAL_API_KEY = os.getenv('VIRUSTOTAL_API_KEY')
 # Database Configuration
 DATABASE_PATH = os.getenv('DATABASE_PATH', './data/bot.db')
 
+# Group commit batches writes into one transaction per interval (fewer fsyncs,
+# but up to one interval of writes can be lost on a hard crash)
+DB_GROUP_COMMIT = os.getenv('DB_GROUP_COMMIT', 'false').lower() == 'true'
+DB_COMMIT_INTERVAL_MS = int(os.getenv('DB_COMMIT_INTERVAL_MS', '250'))
+DB_COMMIT_MAX_STATEMENTS = int(os.getenv('DB_COMMIT_MAX_STATEMENTS', '500'))
+
+# WAL mode keeps one writer connection and serves leaderboard/log reads from
+# a pool of read-only connections so they don't queue behind writes. With group
+# commit the pool only sees committed writes, so lookups that follow a write
+# (mod log cases, expired mutes, bot log channels) use the writer
+DB_WAL_MODE = os.getenv('DB_WAL_MODE', 'false').lower() == 'true'
+DB_READ_POOL_SIZE = int(os.getenv('DB_READ_POOL_SIZE', '3'))
+
+# Settings, blacklists and protected roles are cached per process. A process
+# running only some shards (SHARD_IDS, as cluster workers do) checks this often
+# for changes other processes made, so they take up to this long to apply
+DB_CACHE_SYNC_MS = int(os.getenv('DB_CACHE_SYNC_MS', '1000'))
+
+# Member cache: 'all' keeps every member, or a comma list of 'joined' (members
+# seen joining or sending events) and 'voice' (members in voice), or 'none'.
+# Without startup chunking, commands that need the full list request it on demand
+MEMBER_CACHE_POLICY = os.getenv('MEMBER_CACHE_POLICY', 'all')
+CHUNK_GUILDS_AT_STARTUP = os.getenv('CHUNK_GUILDS_AT_STARTUP', 'true').lower() == 'true'
+
+# Sharding: SHARD_COUNT=0 lets discord.py use Discord's recommended count.
+# SHARD_IDS limits this process to some shards; cluster.py sets SHARD_IDS and
+# CLUSTER_ID for each worker process it launches, runs migrations before the
+# first one starts and turns on DB_WAL_MODE when there are several
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
+CLUSTER_ID = int(os.getenv('CLUSTER_ID')) if os.getenv('CLUSTER_ID') else None
+CLUSTER_WORKERS = int(os.getenv('CLUSTER_WORKERS', '2'))
+CLUSTER_HEALTH_DIR = os.getenv('CLUSTER_HEALTH_DIR', './data/cluster')
+CLUSTER_HEARTBEAT_SECONDS = int(os.getenv('CLUSTER_HEARTBEAT_SECONDS', '15'))
+
+# Event loop lag monitor: samples loop lag every LOOP_MONITOR_INTERVAL_MS and
+# logs the blocking stack when the loop stalls longer than LOOP_LAG_THRESHOLD_MS
+LOOP_MONITOR_ENABLED = os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() == 'true'
+LOOP_MONITOR_INTERVAL_MS = int(os.getenv('LOOP_MONITOR_INTERVAL_MS', '100'))
+LOOP_LAG_THRESHOLD_MS = int(os.getenv('LOOP_LAG_THRESHOLD_MS', '250'))
+LOOP_LAG_REPORT_SECONDS = int(os.getenv('LOOP_LAG_REPORT_SECONDS', '300'))
+
+# Metrics: optional local HTTP server with /metrics (Prometheus), /health and
+# /ready; each cluster worker listens on METRICS_PORT + its CLUSTER_ID
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+
+# Outbound actions: deletes and timeouts run immediately; channel warnings and
+# DMs are queued (at most OUTBOUND_MAX_PENDING) and sent by OUTBOUND_WORKERS
+# workers, lowest priority first to be dropped when the queue is full
+OUTBOUND_WORKERS = int(os.getenv('OUTBOUND_WORKERS', '4'))
+OUTBOUND_MAX_PENDING = int(os.getenv('OUTBOUND_MAX_PENDING', '500'))
+
+# Log channel embeds are queued per channel and sent up to 10 per message every
+# LOG_BUFFER_FLUSH_SECONDS (sooner once a channel has 10); past
+# LOG_BUFFER_MAX_PENDING queued embeds per channel the oldest are dropped
+LOG_BUFFER_FLUSH_SECONDS = float(os.getenv('LOG_BUFFER_FLUSH_SECONDS', '2'))
+LOG_BUFFER_MAX_PENDING = int(os.getenv('LOG_BUFFER_MAX_PENDING', '100'))
+
+# Log channel batches are posted through a webhook the bot creates in each log
+# channel (ids/tokens are kept in the database); channels where the bot lacks
+# Manage Webhooks get normal sends. Off by default: enabling it creates a
+# webhook in every configured log channel
+LOG_WEBHOOKS_ENABLED = os.getenv('LOG_WEBHOOKS_ENABLED', 'false').lower() == 'true'
+LOG_WEBHOOK_NAME = os.getenv('LOG_WEBHOOK_NAME', 'KCL Logs')
+
+# Bot log broadcasts (startup, shutdown, guild join/leave) send to at most this
+# many guilds' log channels at once
+BOT_LOG_BROADCAST_CONCURRENCY = int(os.getenv('BOT_LOG_BROADCAST_CONCURRENCY', '10'))
+
+# Auto-mod spam detection tracks at most this many (guild, user) pairs; the
+# least recently active pair is dropped first
+SPAM_TRACKER_MAX_KEYS = int(os.getenv('SPAM_TRACKER_MAX_KEYS', '50000'))
+
+# Slash command sync is skipped when the command tree hash matches the last
+# successful sync; set FORCE_COMMAND_SYNC=true to sync anyway
+COMMAND_SYNC_HASH_PATH = os.getenv('COMMAND_SYNC_HASH_PATH', './data/command_tree.hash')
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', 'false').lower() == 'true'
+
+# Logging Configuration
+# Records are written by a background thread; the file rotates by size, or by
+# time when LOG_ROTATE_WHEN is set (e.g. 'midnight')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FILE = os.getenv('LOG_FILE', 'bot.log')
+LOG_JSON = os.getenv('LOG_JSON', 'false').lower() == 'true'  # JSON lines instead of plain text
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', '')
+# Per-logger sampling ('logger=fraction,...') and rate limits ('logger=records_per_second,...')
+# for high-volume events; WARNING and above are never dropped
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+LOG_RATE_LIMITS = os.getenv('LOG_RATE_LIMITS', 'discord_bot.pipeline=20')
+
 # External APIs
 # BLOXFRUITS_API_URL = os.getenv('BLOXFRUITS_API_URL', 'https://api.blox-fruits.com/stock')  # Removed - Blox Fruits functionality disabled
 
@@ -81,6 +175,10 @@ class AutoMod:
     SPAM_TIME_WINDOW = 3  # seconds
     CAPS_THRESHOLD = 0.7  # 70% caps
     MAX_MENTIONS = 5
+    # Plain blacklist entries match anywhere in a message; set True to match
+    # whole words only ('ass' no longer matches 'class'). Entries with '*'
+    # are always whole-word wildcard patterns
+    BLACKLIST_WHOLE_WORDS = False
 
 # KCLAntivirus Settings
 class KCLAntivirus:
@@ -217,6 +315,9 @@ class KCLAntivirus:
         'rb.gy',
         'short.io',
     ]
+    
+    # Words that raise a message's threat score (matched anywhere, any case)
+    SUSPICIOUS_KEYWORDS = ['free', 'nitro', 'gift', 'hack', 'cheat', 'generator']
 
 # Validation
 def validate_config():
@@ -224,6 +325,9 @@ def validate_config():
     if not DISCORD_TOKEN:
         raise ValueError("DISCORD_TOKEN is not set in environment variables")
     
+    if SHARD_IDS and not SHARD_COUNT:
+        raise ValueError("SHARD_COUNT must be set when SHARD_IDS is set")
+    
     # Create data directory if it doesn't exist
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     
@@ -3,29 +3,211 @@ Database manager for SQLite operations
 Handles all database interactions asynchronously
 """
 import aiosqlite
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from .models import User, Warning, ModLog, CustomCommand, YouTubeSub, BloxFruitsAlert, GuildSettings, Mute, AntivirusSettings
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+from .migrations import run_migrations
+from .models import User, Warning, ModLog, CustomCommand, YouTubeSub, BloxFruitsAlert, GuildSettings, Mute, AntivirusSettings, LogWebhook
 
 logger = logging.getLogger('discord_bot.database')
 
+BUSY_TIMEOUT_MS = 5000
+
 class DatabaseManager:
     """Manages database connections and operations"""
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, group_commit: bool = False,
+                 commit_interval_ms: int = 250, commit_max_statements: int = 500,
+                 wal_mode: bool = False, read_pool_size: int = 0,
+                 cache_sync_interval_ms: int = 0):
         self.db_path = db_path
         self.connection: Optional[aiosqlite.Connection] = None
+        
+        # WAL mode lets a pool of read-only connections run SELECTs
+        # while the single writer connection is busy
+        self.wal_mode = wal_mode
+        self.read_pool_size = read_pool_size if wal_mode else 0
+        self._read_connections: List[aiosqlite.Connection] = []
+        self._read_pool: Optional[asyncio.Queue] = None
+        
+        # Group-commit (write-behind) mode: writes share one transaction that
+        # is committed every commit_interval_ms or every commit_max_statements
+        self.group_commit = group_commit
+        self.commit_interval = commit_interval_ms / 1000
+        self.commit_max_statements = commit_max_statements
+        self._pending_writes = 0
+        self._commit_lock = asyncio.Lock()  # also held by multi-statement transactions
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Read-through settings caches (guild_id -> settings), invalidated on update
+        self._guild_settings_cache: Dict[int, GuildSettings] = {}
+        self._antivirus_settings_cache: Dict[int, AntivirusSettings] = {}
+        self._protected_roles_cache: Dict[int, List[int]] = {}
+        self.settings_cache_hits = 0
+        self.settings_cache_misses = 0
+        self.settings_version = 0  # Bumped on every settings update
+        self.blacklist_versions: Dict[int, int] = {}  # Guild ID -> bumped on every blacklist change
+        
+        # Other processes sharing the database (cluster workers) record their
+        # settings changes in settings_versions; with an interval set, this
+        # process polls it and drops the changed guilds from its caches
+        self.cache_sync_interval = cache_sync_interval_ms / 1000
+        self._synced_settings_version = 0
+        self._cache_sync_task: Optional[asyncio.Task] = None
     
     async def initialize(self):
         """Initialize database connection and create tables"""
         self.connection = await aiosqlite.connect(self.db_path)
         self.connection.row_factory = aiosqlite.Row
+        # Wait for another process's write lock instead of failing with
+        # "database is locked" (cluster workers share the file)
+        await self.connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        if self.wal_mode:
+            await self.connection.execute("PRAGMA journal_mode=WAL")
+            await self._apply_pragmas(self.connection)
         await self._create_tables()
-        logger.info(f"Database initialized at {self.db_path}")
+        schema_version = await run_migrations(self.connection)
+        
+        if self.read_pool_size:
+            await self._open_read_pool()
+        
+        if self.cache_sync_interval:
+            await self._sync_settings_caches()
+            self._cache_sync_task = asyncio.create_task(self._cache_sync_loop())
+        
+        if self.group_commit:
+            self._flush_task = asyncio.create_task(self._group_commit_loop())
+            logger.info(
+                f"Group commit enabled (every {int(self.commit_interval * 1000)}ms "
+                f"or {self.commit_max_statements} statements)"
+            )
+        
+        logger.info(f"Database initialized at {self.db_path} (schema version {schema_version})")
+    
+    async def _apply_pragmas(self, connection: aiosqlite.Connection):
+        """Apply performance PRAGMAs used in WAL mode"""
+        await connection.execute("PRAGMA synchronous=NORMAL")
+        await connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        await connection.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        await connection.execute("PRAGMA cache_size=-16000")  # ~16 MB
+    
+    async def _open_read_pool(self):
+        """Open the read-only connections used by SELECT-only methods"""
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        self._read_pool = asyncio.Queue()
+        for _ in range(self.read_pool_size):
+            connection = await aiosqlite.connect(uri, uri=True)
+            connection.row_factory = aiosqlite.Row
+            await self._apply_pragmas(connection)
+            self._read_connections.append(connection)
+            self._read_pool.put_nowait(connection)
+        logger.info(f"WAL mode enabled with {self.read_pool_size} read connections")
+    
+    @asynccontextmanager
+    async def _read_connection(self, fresh: bool = False):
+        """Borrow a read-only connection, or the writer if there is no pool
+        
+        The pool only sees committed data. With `fresh`, reads that must see a
+        write made just before them use the writer while group-committed
+        writes are still queued.
+        """
+        if not self._read_pool or (fresh and self._pending_writes):
+            yield self.connection
+            return
+        
+        connection = await self._read_pool.get()
+        try:
+            yield connection
+        finally:
+            self._read_pool.put_nowait(connection)
+    
+    async def _execute_returning(self, sql: str, parameters: tuple) -> Optional[aiosqlite.Row]:
+        """Run an INSERT/UPDATE ... RETURNING and fetch its row
+        
+        The statement is still in progress between execute and fetch, and SQLite
+        refuses to commit while it is, so commits wait on the commit lock.
+        """
+        async with self._commit_lock:
+            async with self.connection.cursor() as cursor:
+                await cursor.execute(sql, parameters)
+                return await cursor.fetchone()
+    
+    async def _commit(self):
+        """Commit a write, or queue it for the next group commit"""
+        if not self.group_commit:
+            async with self._commit_lock:
+                await self.connection.commit()
+            return
+        
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_max_statements:
+            await self.flush()
+    
+    async def flush(self, raise_errors: bool = False):
+        """Commit all queued writes in one transaction
+        
+        A failed commit keeps the writes queued, so the next flush retries them.
+        """
+        async with self._commit_lock:
+            if not self._pending_writes or not self.connection:
+                return
+            try:
+                await self.connection.commit()
+            except Exception as e:
+                logger.error(f"Group commit of {self._pending_writes} statements failed: {e}")
+                if raise_errors:
+                    raise
+                return
+            self._pending_writes = 0
+    
+    async def _group_commit_loop(self):
+        """Flush queued writes on a fixed interval"""
+        while True:
+            await asyncio.sleep(self.commit_interval)
+            await self.flush()
+    
+    async def _cache_sync_loop(self):
+        """Pick up other processes' settings changes on a fixed interval"""
+        while True:
+            await asyncio.sleep(self.cache_sync_interval)
+            try:
+                await self._sync_settings_caches()
+            except Exception as e:
+                logger.error(f"Settings cache sync failed: {e}")
+    
+    async def _sync_settings_caches(self):
+        """Drop cached settings, blacklists and protected roles of guilds changed since the last sync"""
+        async with self._read_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT guild_id, version FROM settings_versions WHERE version > ?
+                """, (self._synced_settings_version,))
+                rows = await cursor.fetchall()
+        
+        for row in rows:
+            guild_id = row['guild_id']
+            self._guild_settings_cache.pop(guild_id, None)
+            self._antivirus_settings_cache.pop(guild_id, None)
+            self._protected_roles_cache.pop(guild_id, None)
+            self.blacklist_versions[guild_id] = self.blacklist_versions.get(guild_id, 0) + 1
+            self._synced_settings_version = max(self._synced_settings_version, row['version'])
+        if rows:
+            self.settings_version += 1
+    
+    async def _record_settings_change(self, cursor: aiosqlite.Cursor, guild_id: int):
+        """Bump the guild's row in settings_versions, in the same transaction as the change"""
+        await cursor.execute("""
+            INSERT INTO settings_versions (guild_id, version)
+            VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM settings_versions))
+            ON CONFLICT (guild_id) DO UPDATE SET version = excluded.version
+        """, (guild_id,))
     
     async def _create_tables(self):
-        """Create all necessary database tables"""
+        """Create all necessary database tables (later changes live in migrations.py)"""
         async with self.connection.cursor() as cursor:
             # Users table
             await cursor.execute("""
@@ -112,34 +294,11 @@ class DatabaseManager:
                     automod_enabled BOOLEAN DEFAULT 1,
                     spam_detection BOOLEAN DEFAULT 1,
                     blacklist_enabled BOOLEAN DEFAULT 1,
-                    invite_link TEXT
+                    invite_link TEXT,
+                    everyone_ping_protection BOOLEAN DEFAULT 1
                 )
             """)
             
-            # Add invite_link column if it doesn't exist (migration)
-            try:
-                await cursor.execute("""
-                    ALTER TABLE guild_settings ADD COLUMN invite_link TEXT
-                """)
-            except:
-                pass  # Column already exists
-            
-            # Add bot_log_channel column if it doesn't exist (migration)
-            try:
-                await cursor.execute("""
-                    ALTER TABLE guild_settings ADD COLUMN bot_log_channel INTEGER
-                """)
-            except:
-                pass  # Column already exists
-            
-            # Add everyone_ping_protection column if it doesn't exist (migration)
-            try:
-                await cursor.execute("""
-                    ALTER TABLE guild_settings ADD COLUMN everyone_ping_protection BOOLEAN DEFAULT 1
-                """)
-            except:
-                pass  # Column already exists
-            
             # Blacklist table
             await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS blacklist (
@@ -236,9 +395,45 @@ class DatabaseManager:
                 )
             """)
             
+            # Giveaways table
+            await cursor.execute("""
+                CREATE TABLE IF NOT EXISTS giveaways (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message_id INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    prize TEXT NOT NULL,
+                    winners INTEGER DEFAULT 1,
+                    end_time TIMESTAMP NOT NULL,
+                    host_id INTEGER NOT NULL,
+                    active BOOLEAN DEFAULT 1,
+                    requirements TEXT,
+                    min_level INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             await self.connection.commit()
     
+    async def get_schema_version(self) -> int:
+        """Get the current schema migration version"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("SELECT MAX(version) FROM schema_version")
+            row = await cursor.fetchone()
+            return row[0] or 0
+    
     # User operations
+    @staticmethod
+    def _row_to_user(row) -> User:
+        """Build a User from a users row"""
+        data = dict(row)
+        # Convert timestamp strings back to datetime objects
+        if data.get('last_daily'):
+            data['last_daily'] = datetime.fromisoformat(data['last_daily'])
+        if data.get('last_message'):
+            data['last_message'] = datetime.fromisoformat(data['last_message'])
+        return User(**data)
+    
     async def get_user(self, user_id: int, guild_id: int) -> Optional[User]:
         """Get user data"""
         async with self.connection.cursor() as cursor:
@@ -248,13 +443,7 @@ class DatabaseManager:
             )
             row = await cursor.fetchone()
             if row:
-                data = dict(row)
-                # Convert timestamp strings back to datetime objects
-                if data.get('last_daily'):
-                    data['last_daily'] = datetime.fromisoformat(data['last_daily'])
-                if data.get('last_message'):
-                    data['last_message'] = datetime.fromisoformat(data['last_message'])
-                return User(**data)
+                return self._row_to_user(row)
             return None
     
     async def create_user(self, user_id: int, guild_id: int) -> User:
@@ -264,7 +453,7 @@ class DatabaseManager:
                 "INSERT INTO users (user_id, guild_id) VALUES (?, ?)",
                 (user_id, guild_id)
             )
-            await self.connection.commit()
+            await self._commit()
             return User(user_id=user_id, guild_id=guild_id)
     
     async def update_user(self, user: User):
@@ -276,14 +465,117 @@ class DatabaseManager:
                 WHERE user_id = ? AND guild_id = ?
             """, (user.xp, user.level, user.balance, user.last_daily, 
                   user.last_message, user.user_id, user.guild_id))
-            await self.connection.commit()
+            await self._commit()
     
     async def get_or_create_user(self, user_id: int, guild_id: int) -> User:
-        """Get user or create if doesn't exist"""
-        user = await self.get_user(user_id, guild_id)
-        if not user:
-            user = await self.create_user(user_id, guild_id)
-        return user
+        """Get user or create if doesn't exist (single UPSERT)"""
+        row = await self._execute_returning("""
+            INSERT INTO users (user_id, guild_id) VALUES (?, ?)
+            ON CONFLICT (user_id, guild_id) DO UPDATE SET user_id = excluded.user_id
+            RETURNING *
+        """, (user_id, guild_id))
+        await self._commit()
+        return self._row_to_user(row)
+    
+    async def add_xp(self, user_id: int, guild_id: int, amount: int,
+                     cooldown_seconds: int = 0) -> Optional[User]:
+        """Atomically add XP unless the user is still on message cooldown
+        
+        Returns the updated user, or None if the cooldown has not passed yet.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=cooldown_seconds)
+        row = await self._execute_returning("""
+            INSERT INTO users (user_id, guild_id, xp, last_message) VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, guild_id) DO UPDATE SET
+                xp = xp + excluded.xp,
+                last_message = excluded.last_message
+            WHERE last_message IS NULL OR last_message <= ?
+            RETURNING *
+        """, (user_id, guild_id, amount, now, cutoff))
+        await self._commit()
+        return self._row_to_user(row) if row else None
+    
+    async def set_level(self, user_id: int, guild_id: int, level: int, xp: int):
+        """Set a user's level and XP without touching the rest of the row"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("""
+                INSERT INTO users (user_id, guild_id, xp, level) VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, guild_id) DO UPDATE SET
+                    xp = excluded.xp,
+                    level = excluded.level
+            """, (user_id, guild_id, xp, level))
+        await self._commit()
+    
+    async def add_balance(self, user_id: int, guild_id: int, amount: int) -> int:
+        """Atomically add (or with a negative amount, remove) money, never below 0
+        
+        Returns the new balance.
+        """
+        row = await self._execute_returning("""
+            INSERT INTO users (user_id, guild_id, balance) VALUES (?, ?, MAX(0, ?))
+            ON CONFLICT (user_id, guild_id) DO UPDATE SET balance = MAX(0, balance + ?)
+            RETURNING balance
+        """, (user_id, guild_id, amount, amount))
+        await self._commit()
+        return row['balance']
+    
+    async def claim_daily(self, user_id: int, guild_id: int, amount: int,
+                          cooldown: timedelta = timedelta(days=1)) -> Optional[int]:
+        """Atomically pay the daily reward if it is available
+        
+        Returns the new balance, or None if the daily was already claimed.
+        """
+        now = datetime.utcnow()
+        row = await self._execute_returning("""
+            INSERT INTO users (user_id, guild_id, balance, last_daily) VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, guild_id) DO UPDATE SET
+                balance = balance + excluded.balance,
+                last_daily = excluded.last_daily
+            WHERE last_daily IS NULL OR last_daily <= ?
+            RETURNING balance
+        """, (user_id, guild_id, amount, now, now - cooldown))
+        await self._commit()
+        return row['balance'] if row else None
+    
+    async def transfer(self, guild_id: int, from_user_id: int, to_user_id: int,
+                       amount: int) -> Optional[Tuple[int, int]]:
+        """Move money between two users in one transaction
+        
+        The sender is only debited if their balance covers the amount.
+        Returns (sender_balance, receiver_balance), or None if funds were insufficient.
+        """
+        # Hold the commit lock so no other commit can land between debit and credit
+        async with self._commit_lock:
+            async with self.connection.cursor() as cursor:
+                await cursor.execute("SAVEPOINT transfer")
+                try:
+                    await cursor.execute("""
+                        UPDATE users SET balance = balance - ?
+                        WHERE user_id = ? AND guild_id = ? AND balance >= ?
+                        RETURNING balance
+                    """, (amount, from_user_id, guild_id, amount))
+                    sender = await cursor.fetchone()
+                    
+                    receiver = None
+                    if sender:
+                        await cursor.execute("""
+                            INSERT INTO users (user_id, guild_id, balance) VALUES (?, ?, ?)
+                            ON CONFLICT (user_id, guild_id) DO UPDATE SET balance = balance + excluded.balance
+                            RETURNING balance
+                        """, (to_user_id, guild_id, amount))
+                        receiver = await cursor.fetchone()
+                    
+                    await cursor.execute("RELEASE SAVEPOINT transfer")
+                except Exception:
+                    await cursor.execute("ROLLBACK TO SAVEPOINT transfer")
+                    await cursor.execute("RELEASE SAVEPOINT transfer")
+                    raise
+        
+        if not sender:
+            return None
+        await self._commit()
+        return sender['balance'], receiver['balance']
     
     # Warning operations
     async def add_warning(self, user_id: int, guild_id: int, moderator_id: int, reason: str) -> int:
@@ -293,7 +585,7 @@ class DatabaseManager:
                 INSERT INTO warnings (user_id, guild_id, moderator_id, reason)
                 VALUES (?, ?, ?, ?)
             """, (user_id, guild_id, moderator_id, reason))
-            await self.connection.commit()
+            await self._commit()
             return cursor.lastrowid
     
     async def get_warnings(self, user_id: int, guild_id: int) -> List[Warning]:
@@ -311,7 +603,7 @@ class DatabaseManager:
         """Remove a specific warning"""
         async with self.connection.cursor() as cursor:
             await cursor.execute("DELETE FROM warnings WHERE id = ?", (warning_id,))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount > 0
     
     async def clear_warnings(self, user_id: int, guild_id: int):
@@ -320,7 +612,7 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM warnings WHERE user_id = ? AND guild_id = ?
             """, (user_id, guild_id))
-            await self.connection.commit()
+            await self._commit()
     
     # Moderation log operations
     async def add_mod_log(self, guild_id: int, action_type: str, user_id: int, 
@@ -331,28 +623,31 @@ class DatabaseManager:
                 INSERT INTO mod_logs (guild_id, action_type, user_id, moderator_id, reason)
                 VALUES (?, ?, ?, ?, ?)
             """, (guild_id, action_type, user_id, moderator_id, reason))
-            await self.connection.commit()
+            await self._commit()
             return cursor.lastrowid
     
     async def get_mod_logs(self, user_id: int, guild_id: int) -> List[ModLog]:
         """Get moderation logs for a user"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM mod_logs 
-                WHERE user_id = ? AND guild_id = ?
-                ORDER BY timestamp DESC
-            """, (user_id, guild_id))
-            rows = await cursor.fetchall()
-            return [ModLog(**dict(row)) for row in rows]
+        async with self._read_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT * FROM mod_logs 
+                    WHERE user_id = ? AND guild_id = ?
+                    ORDER BY timestamp DESC
+                """, (user_id, guild_id))
+                rows = await cursor.fetchall()
+                return [ModLog(**dict(row)) for row in rows]
     
     async def get_mod_log_by_case(self, case_id: int) -> Optional[ModLog]:
         """Get a specific moderation log by case ID"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("SELECT * FROM mod_logs WHERE case_id = ?", (case_id,))
-            row = await cursor.fetchone()
-            if row:
-                return ModLog(**dict(row))
-            return None
+        # Usually looked up right after add_mod_log created the case
+        async with self._read_connection(fresh=True) as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT * FROM mod_logs WHERE case_id = ?", (case_id,))
+                row = await cursor.fetchone()
+                if row:
+                    return ModLog(**dict(row))
+                return None
     
     # Custom command operations
     async def add_custom_command(self, guild_id: int, trigger: str, response: str, created_by: int):
@@ -362,7 +657,7 @@ class DatabaseManager:
                 INSERT OR REPLACE INTO custom_commands (guild_id, trigger, response, created_by)
                 VALUES (?, ?, ?, ?)
             """, (guild_id, trigger.lower(), response, created_by))
-            await self.connection.commit()
+            await self._commit()
     
     async def remove_custom_command(self, guild_id: int, trigger: str) -> bool:
         """Remove a custom command"""
@@ -370,7 +665,7 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM custom_commands WHERE guild_id = ? AND trigger = ?
             """, (guild_id, trigger.lower()))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount > 0
     
     async def get_custom_command(self, guild_id: int, trigger: str) -> Optional[CustomCommand]:
@@ -395,20 +690,42 @@ class DatabaseManager:
     
     # Guild settings operations
     async def get_guild_settings(self, guild_id: int) -> GuildSettings:
-        """Get guild settings"""
+        """Get guild settings (served from the settings cache when possible)"""
+        cached = self._guild_settings_cache.get(guild_id)
+        if cached is not None:
+            self.settings_cache_hits += 1
+            return replace(cached)
+        
+        self.settings_cache_misses += 1
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT * FROM guild_settings WHERE guild_id = ?
             """, (guild_id,))
             row = await cursor.fetchone()
             if row:
-                return GuildSettings(**dict(row))
-            # Create default settings
-            await cursor.execute("""
-                INSERT INTO guild_settings (guild_id) VALUES (?)
-            """, (guild_id,))
-            await self.connection.commit()
-            return GuildSettings(guild_id=guild_id)
+                settings = GuildSettings(**dict(row))
+            else:
+                # Create default settings
+                await cursor.execute("""
+                    INSERT OR IGNORE INTO guild_settings (guild_id) VALUES (?)
+                """, (guild_id,))
+                await self._commit()
+                settings = GuildSettings(guild_id=guild_id)
+        
+        self._guild_settings_cache[guild_id] = settings
+        return replace(settings)
+    
+    async def get_bot_log_channels(self) -> Dict[int, int]:
+        """Map of guild ID to bot log channel for every guild that has one"""
+        # Fresh so a log channel set just before a broadcast is included
+        async with self._read_connection(fresh=True) as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT guild_id, bot_log_channel FROM guild_settings
+                    WHERE bot_log_channel IS NOT NULL
+                """)
+                rows = await cursor.fetchall()
+                return {row['guild_id']: row['bot_log_channel'] for row in rows}
     
     async def update_guild_settings(self, settings: GuildSettings):
         """Update guild settings"""
@@ -430,7 +747,10 @@ class DatabaseManager:
                   settings.spam_detection, settings.blacklist_enabled,
                   settings.everyone_ping_protection,
                   settings.invite_link, settings.guild_id))
-            await self.connection.commit()
+            await self._record_settings_change(cursor, settings.guild_id)
+            await self._commit()
+        self._guild_settings_cache.pop(settings.guild_id, None)
+        self.settings_version += 1
     
     # Blacklist operations
     async def add_blacklist_word(self, guild_id: int, word: str):
@@ -439,7 +759,9 @@ class DatabaseManager:
             await cursor.execute("""
                 INSERT OR IGNORE INTO blacklist (guild_id, word) VALUES (?, ?)
             """, (guild_id, word.lower()))
-            await self.connection.commit()
+            await self._record_settings_change(cursor, guild_id)
+            await self._commit()
+        self.blacklist_versions[guild_id] = self.blacklist_versions.get(guild_id, 0) + 1
     
     async def remove_blacklist_word(self, guild_id: int, word: str) -> bool:
         """Remove word from blacklist"""
@@ -447,8 +769,13 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM blacklist WHERE guild_id = ? AND word = ?
             """, (guild_id, word.lower()))
-            await self.connection.commit()
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+            if removed:
+                await self._record_settings_change(cursor, guild_id)
+            await self._commit()
+        if removed:
+            self.blacklist_versions[guild_id] = self.blacklist_versions.get(guild_id, 0) + 1
+        return removed
     
     async def get_blacklist(self, guild_id: int) -> List[str]:
         """Get all blacklisted words"""
@@ -467,7 +794,7 @@ class DatabaseManager:
                 INSERT OR REPLACE INTO mutes (user_id, guild_id, unmute_at, reason)
                 VALUES (?, ?, ?, ?)
             """, (user_id, guild_id, unmute_at, reason))
-            await self.connection.commit()
+            await self._commit()
     
     async def remove_mute(self, user_id: int, guild_id: int):
         """Remove a mute"""
@@ -475,10 +802,12 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM mutes WHERE user_id = ? AND guild_id = ?
             """, (user_id, guild_id))
-            await self.connection.commit()
+            await self._commit()
     
     async def get_expired_mutes(self) -> List[Mute]:
         """Get all expired mutes"""
+        # Stays on the writer: the pool could still list mutes removed in the
+        # current group-commit batch
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT * FROM mutes WHERE unmute_at <= datetime('now')
@@ -489,23 +818,25 @@ class DatabaseManager:
     # Leaderboard operations
     async def get_top_users_by_balance(self, guild_id: int, limit: int = 10) -> List[User]:
         """Get top users by balance"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM users WHERE guild_id = ?
-                ORDER BY balance DESC LIMIT ?
-            """, (guild_id, limit))
-            rows = await cursor.fetchall()
-            return [User(**dict(row)) for row in rows]
+        async with self._read_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT * FROM users WHERE guild_id = ?
+                    ORDER BY balance DESC LIMIT ?
+                """, (guild_id, limit))
+                rows = await cursor.fetchall()
+                return [User(**dict(row)) for row in rows]
     
     async def get_top_users_by_level(self, guild_id: int, limit: int = 10) -> List[User]:
         """Get top users by level"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM users WHERE guild_id = ?
-                ORDER BY level DESC, xp DESC LIMIT ?
-            """, (guild_id, limit))
-            rows = await cursor.fetchall()
-            return [User(**dict(row)) for row in rows]
+        async with self._read_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT * FROM users WHERE guild_id = ?
+                    ORDER BY level DESC, xp DESC LIMIT ?
+                """, (guild_id, limit))
+                rows = await cursor.fetchall()
+                return [User(**dict(row)) for row in rows]
     
     # YouTube subscription operations
     async def add_youtube_sub(self, guild_id: int, channel_id: str, notification_channel: int):
@@ -515,7 +846,7 @@ class DatabaseManager:
                 INSERT OR REPLACE INTO youtube_subs (guild_id, channel_id, notification_channel)
                 VALUES (?, ?, ?)
             """, (guild_id, channel_id, notification_channel))
-            await self.connection.commit()
+            await self._commit()
     
     async def remove_youtube_sub(self, guild_id: int, channel_id: str) -> bool:
         """Remove YouTube subscription"""
@@ -523,7 +854,7 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM youtube_subs WHERE guild_id = ? AND channel_id = ?
             """, (guild_id, channel_id))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount > 0
     
     async def get_youtube_subs(self, guild_id: int) -> List[YouTubeSub]:
@@ -549,7 +880,7 @@ class DatabaseManager:
                 UPDATE youtube_subs SET last_video_id = ?
                 WHERE guild_id = ? AND channel_id = ?
             """, (video_id, guild_id, channel_id))
-            await self.connection.commit()
+            await self._commit()
     
     # Custom media operations
     async def add_custom_media(self, name: str, filename: str = None, filepath: str = None, 
@@ -560,7 +891,7 @@ class DatabaseManager:
                 INSERT INTO custom_media (name, filename, filepath, url, guild_id, uploaded_by)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (name, filename, filepath, url, guild_id, uploaded_by))
-            await self.connection.commit()
+            await self._commit()
             return cursor.lastrowid
     
     async def get_custom_media(self, name: str, guild_id: str = None):
@@ -597,7 +928,7 @@ class DatabaseManager:
         """Delete custom media item"""
         async with self.connection.cursor() as cursor:
             await cursor.execute("DELETE FROM custom_media WHERE id = ?", (media_id,))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount > 0
     
     # Play queue operations
@@ -609,7 +940,7 @@ class DatabaseManager:
                 INSERT INTO play_queue (guild_id, media_id, media_name, media_path, media_url, requested_by)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (guild_id, media_id, media_name, media_path, media_url, requested_by))
-            await self.connection.commit()
+            await self._commit()
             return cursor.lastrowid
     
     async def get_pending_play_requests(self):
@@ -628,7 +959,7 @@ class DatabaseManager:
             await cursor.execute("""
                 UPDATE play_queue SET status = ? WHERE id = ?
             """, (status, request_id))
-            await self.connection.commit()
+            await self._commit()
     
     async def cleanup_old_play_requests(self, hours: int = 24):
         """Clean up old play requests"""
@@ -637,7 +968,7 @@ class DatabaseManager:
                 DELETE FROM play_queue 
                 WHERE created_at < datetime('now', '-{} hours')
             """.format(hours))
-            await self.connection.commit()
+            await self._commit()
     
     # Everyone ping whitelist operations
     async def add_everyone_ping_whitelist(self, guild_id: int, role_id: int) -> bool:
@@ -647,7 +978,7 @@ class DatabaseManager:
                 await cursor.execute("""
                     INSERT INTO everyone_ping_whitelist (guild_id, role_id) VALUES (?, ?)
                 """, (guild_id, role_id))
-                await self.connection.commit()
+                await self._commit()
                 return True
             except:
                 return False  # Role already exists
@@ -658,7 +989,7 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM everyone_ping_whitelist WHERE guild_id = ? AND role_id = ?
             """, (guild_id, role_id))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount > 0
     
     async def get_everyone_ping_whitelist(self, guild_id: int) -> List[int]:
@@ -676,25 +1007,35 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM everyone_ping_whitelist WHERE guild_id = ?
             """, (guild_id,))
-            await self.connection.commit()
+            await self._commit()
             return cursor.rowcount
     
     # KCLAntivirus operations
     async def get_antivirus_settings(self, guild_id: int) -> AntivirusSettings:
-        """Get antivirus settings for a guild"""
+        """Get antivirus settings for a guild (served from the settings cache when possible)"""
+        cached = self._antivirus_settings_cache.get(guild_id)
+        if cached is not None:
+            self.settings_cache_hits += 1
+            return replace(cached)
+        
+        self.settings_cache_misses += 1
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT * FROM antivirus_settings WHERE guild_id = ?
             """, (guild_id,))
             row = await cursor.fetchone()
             if row:
-                return AntivirusSettings(**dict(row))
-            # Create default settings
-            await cursor.execute("""
-                INSERT INTO antivirus_settings (guild_id) VALUES (?)
-            """, (guild_id,))
-            await self.connection.commit()
-            return AntivirusSettings(guild_id=guild_id)
+                settings = AntivirusSettings(**dict(row))
+            else:
+                # Create default settings
+                await cursor.execute("""
+                    INSERT OR IGNORE INTO antivirus_settings (guild_id) VALUES (?)
+                """, (guild_id,))
+                await self._commit()
+                settings = AntivirusSettings(guild_id=guild_id)
+        
+        self._antivirus_settings_cache[guild_id] = settings
+        return replace(settings)
     
     async def update_antivirus_settings(self, settings: AntivirusSettings):
         """Update antivirus settings"""
@@ -707,7 +1048,19 @@ class DatabaseManager:
             """, (settings.enabled, settings.auto_lockdown, settings.mod_log_channel,
                   settings.scan_attachments, settings.scan_urls, settings.quarantine_channel,
                   settings.guild_id))
-            await self.connection.commit()
+            await self._record_settings_change(cursor, settings.guild_id)
+            await self._commit()
+        self._antivirus_settings_cache.pop(settings.guild_id, None)
+        self.settings_version += 1
+    
+    def get_settings_cache_stats(self) -> Dict[str, int]:
+        """Get hit/miss counts and size of the settings cache"""
+        return {
+            'hits': self.settings_cache_hits,
+            'misses': self.settings_cache_misses,
+            'guild_settings': len(self._guild_settings_cache),
+            'antivirus_settings': len(self._antivirus_settings_cache)
+        }
     
     async def add_antivirus_protected_role(self, guild_id: int, role_id: int) -> bool:
         """Add role to antivirus protection"""
@@ -716,7 +1069,9 @@ class DatabaseManager:
                 await cursor.execute("""
                     INSERT INTO antivirus_protected_roles (guild_id, role_id) VALUES (?, ?)
                 """, (guild_id, role_id))
-                await self.connection.commit()
+                await self._record_settings_change(cursor, guild_id)
+                await self._commit()
+                self._protected_roles_cache.pop(guild_id, None)
                 return True
             except:
                 return False  # Role already exists
@@ -727,17 +1082,27 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM antivirus_protected_roles WHERE guild_id = ? AND role_id = ?
             """, (guild_id, role_id))
-            await self.connection.commit()
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+            if removed:
+                await self._record_settings_change(cursor, guild_id)
+            await self._commit()
+            self._protected_roles_cache.pop(guild_id, None)
+            return removed
     
     async def get_antivirus_protected_roles(self, guild_id: int) -> List[int]:
-        """Get all protected role IDs for antivirus"""
+        """Get all protected role IDs for antivirus (cached, invalidated on change)"""
+        cached = self._protected_roles_cache.get(guild_id)
+        if cached is not None:
+            return list(cached)
+        
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT role_id FROM antivirus_protected_roles WHERE guild_id = ?
             """, (guild_id,))
             rows = await cursor.fetchall()
-            return [row['role_id'] for row in rows]
+            roles = [row['role_id'] for row in rows]
+        self._protected_roles_cache[guild_id] = roles
+        return list(roles)
     
     async def clear_antivirus_protected_roles(self, guild_id: int) -> int:
         """Clear all roles from antivirus protection"""
@@ -745,8 +1110,12 @@ class DatabaseManager:
             await cursor.execute("""
                 DELETE FROM antivirus_protected_roles WHERE guild_id = ?
             """, (guild_id,))
-            await self.connection.commit()
-            return cursor.rowcount
+            removed = cursor.rowcount
+            if removed:
+                await self._record_settings_change(cursor, guild_id)
+            await self._commit()
+            self._protected_roles_cache.pop(guild_id, None)
+            return removed
     
     async def add_antivirus_scan_log(self, guild_id: int, user_id: int, item_name: str, 
                                    item_type: str, threat_level: str, malicious_count: int = 0,
@@ -758,23 +1127,100 @@ class DatabaseManager:
                 (guild_id, user_id, item_name, item_type, threat_level, malicious_count, suspicious_count, action_taken)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (guild_id, user_id, item_name, item_type, threat_level, malicious_count, suspicious_count, action_taken))
-            await self.connection.commit()
+            await self._commit()
             return cursor.lastrowid
     
     async def get_antivirus_scan_logs(self, guild_id: int, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent antivirus scan logs"""
+        async with self._read_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    SELECT * FROM antivirus_scan_logs 
+                    WHERE guild_id = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                """, (guild_id, limit))
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+    
+    # Giveaway operations
+    async def add_giveaway(self, message_id: int, channel_id: int, guild_id: int, prize: str,
+                           winners: int, end_time: datetime, host_id: int,
+                           requirements: Optional[str] = None, min_level: Optional[int] = None):
+        """Store a new active giveaway"""
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
-                SELECT * FROM antivirus_scan_logs 
-                WHERE guild_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (guild_id, limit))
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+                INSERT INTO giveaways
+                (message_id, channel_id, guild_id, prize, winners, end_time, host_id, active, requirements, min_level)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (message_id, channel_id, guild_id, prize, winners, end_time, host_id, True, requirements, min_level))
+            await self._commit()
+    
+    async def end_giveaway(self, message_id: int):
+        """Mark a giveaway as ended"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("""
+                UPDATE giveaways SET active = ? WHERE message_id = ?
+            """, (False, message_id))
+            await self._commit()
+    
+    # Log webhook operations
+    async def get_log_webhook(self, channel_id: int) -> Optional[LogWebhook]:
+        """Get the stored log webhook for a channel"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("""
+                SELECT * FROM log_webhooks WHERE channel_id = ?
+            """, (channel_id,))
+            row = await cursor.fetchone()
+            return LogWebhook(**dict(row)) if row else None
+    
+    async def set_log_webhook(self, channel_id: int, guild_id: int, webhook_id: int, webhook_token: str):
+        """Store (or replace) the log webhook for a channel"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("""
+                INSERT OR REPLACE INTO log_webhooks (channel_id, guild_id, webhook_id, webhook_token)
+                VALUES (?, ?, ?, ?)
+            """, (channel_id, guild_id, webhook_id, webhook_token))
+            await self._commit()
+    
+    async def remove_log_webhook(self, channel_id: int) -> bool:
+        """Forget the log webhook for a channel"""
+        async with self.connection.cursor() as cursor:
+            await cursor.execute("""
+                DELETE FROM log_webhooks WHERE channel_id = ?
+            """, (channel_id,))
+            await self._commit()
+            return cursor.rowcount > 0
     
     async def close(self):
         """Close database connection"""
+        if self._cache_sync_task:
+            self._cache_sync_task.cancel()
+            try:
+                await self._cache_sync_task
+            except asyncio.CancelledError:
+                pass
+            self._cache_sync_task = None
+        
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        stats = self.get_settings_cache_stats()
+        logger.info(f"Settings cache: {stats['hits']} hits, {stats['misses']} misses")
+        
+        for connection in self._read_connections:
+            await connection.close()
+        self._read_connections = []
+        self._read_pool = None
+        
         if self.connection:
-            await self.connection.close()
-            logger.info("Database connection closed")
+            try:
+                await self.flush(raise_errors=True)
+            finally:
+                await self.connection.close()
+                logger.info("Database connection closed")
@@ -0,0 +1,133 @@
+"""
+Versioned schema migrations
+Each migration runs once, in order, from DatabaseManager.initialize()
+"""
+import aiosqlite
+import logging
+
+logger = logging.getLogger('discord_bot.database')
+
+
+async def _add_column_if_missing(cursor: aiosqlite.Cursor, table: str, column: str, definition: str):
+    """Add a column to a table unless it already exists"""
+    await cursor.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if column not in columns:
+        await cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+async def _add_hot_path_indexes(cursor: aiosqlite.Cursor):
+    """Index the per-user, per-guild and time-ordered lookups"""
+    # get_warnings / clear_warnings
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_warnings_guild_user
+        ON warnings (guild_id, user_id, timestamp)
+    """)
+
+    # get_mod_logs
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mod_logs_guild_user
+        ON mod_logs (guild_id, user_id, timestamp)
+    """)
+
+    # Giveaway check loop (active giveaways past their end time)
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_giveaways_active_end
+        ON giveaways (active, end_time)
+    """)
+
+    # get_antivirus_scan_logs
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_scan_logs_guild_time
+        ON antivirus_scan_logs (guild_id, timestamp)
+    """)
+
+    # Leaderboards
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_guild_balance
+        ON users (guild_id, balance DESC)
+    """)
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_guild_level
+        ON users (guild_id, level DESC, xp DESC)
+    """)
+
+
+async def _add_legacy_columns(cursor: aiosqlite.Cursor):
+    """Add columns that older databases were created without"""
+    await _add_column_if_missing(cursor, 'guild_settings', 'invite_link', 'TEXT')
+    await _add_column_if_missing(cursor, 'guild_settings', 'bot_log_channel', 'INTEGER')
+    await _add_column_if_missing(cursor, 'guild_settings', 'everyone_ping_protection', 'BOOLEAN DEFAULT 1')
+    await _add_column_if_missing(cursor, 'giveaways', 'requirements', 'TEXT')
+    await _add_column_if_missing(cursor, 'giveaways', 'min_level', 'INTEGER')
+
+
+async def _add_log_webhooks(cursor: aiosqlite.Cursor):
+    """Store the webhook the bot posts through in each log channel"""
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS log_webhooks (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            webhook_id INTEGER NOT NULL,
+            webhook_token TEXT NOT NULL
+        )
+    """)
+
+
+async def _add_settings_versions(cursor: aiosqlite.Cursor):
+    """Record which guild's settings changed last, for other processes' caches"""
+    await cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings_versions (
+            guild_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    await cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_settings_versions_version
+        ON settings_versions (version)
+    """)
+
+
+# (version, description, step) - append new migrations at the end, never reorder
+MIGRATIONS = [
+    (1, "Add hot-path indexes", _add_hot_path_indexes),
+    (2, "Add legacy guild_settings and giveaways columns", _add_legacy_columns),
+    (3, "Add log_webhooks table", _add_log_webhooks),
+    (4, "Add settings_versions table", _add_settings_versions),
+]
+
+
+async def run_migrations(connection: aiosqlite.Connection) -> int:
+    """Apply pending migrations and return the resulting schema version"""
+    async with connection.cursor() as cursor:
+        await cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await cursor.execute("SELECT MAX(version) FROM schema_version")
+        row = await cursor.fetchone()
+        current_version = row[0] or 0
+
+        for version, description, step in MIGRATIONS:
+            if version <= current_version:
+                continue
+
+            try:
+                await step(cursor)
+                await cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                await connection.commit()
+            except Exception as e:
+                await connection.rollback()
+                logger.error(f"Migration {version} ({description}) failed: {e}")
+                raise
+
+            current_version = version
+            logger.info(f"Applied migration {version}: {description}")
+
+    return current_version
@@ -95,3 +95,11 @@ class Mute:
     guild_id: int
     unmute_at: datetime
     reason: Optional[str] = None
+
+@dataclass
+class LogWebhook:
+    """Webhook the bot posts log embeds through"""
+    channel_id: int
+    guild_id: int
+    webhook_id: int
+    webhook_token: str
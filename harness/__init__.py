@@ -0,0 +1,5 @@
+"""
+Offline replay harness
+Runs the bot's cogs against recorded or synthetic gateway events with a fake
+Discord REST API, for tests and benchmarks
+"""
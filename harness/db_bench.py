@@ -0,0 +1,543 @@
+"""
+DatabaseManager micro-benchmarks
+Seeds a temp database with production-like volume, times every public
+DatabaseManager method and compares two runs
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import config
+from database.db_manager import DatabaseManager
+from utils.loop_monitor import percentile
+
+logger = logging.getLogger('discord_bot.bench')
+
+GUILD_BASE = 1_000_000
+USER_BASE = 10_000_000
+MODERATOR_ID = 42
+NOT_BENCHMARKED = {'initialize', 'close'}
+
+
+@dataclass
+class SeedSpec:
+    """Row counts of the seeded database"""
+    guilds: int = 100
+    users: int = 100_000
+    mod_logs: int = 1_000_000
+    scan_logs: int = 1_000_000
+    warnings: int = 100_000
+    custom_commands: int = 20  # Per guild
+    blacklist_words: int = 50  # Per guild
+    mutes: int = 5_000
+    custom_media: int = 1_000
+
+
+def _timestamp(rng: random.Random, now: datetime) -> str:
+    """A time in the last year, in SQLite's CURRENT_TIMESTAMP format"""
+    return (now - timedelta(seconds=rng.randrange(365 * 86400))).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def seed_database(path: str, spec: SeedSpec, seed: int = 0):
+    """Bulk-insert the spec's rows into an initialized database (one transaction)"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA synchronous=OFF")
+
+    def user(index: int):
+        return USER_BASE + index, GUILD_BASE + index % spec.guilds
+
+    def random_user():
+        return user(rng.randrange(spec.users))
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO users (user_id, guild_id, xp, level, balance, last_message) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user(i) + (rng.randrange(50_000), rng.randint(1, 60), rng.randrange(100_000), _timestamp(rng, now))
+                for i in range(spec.users)
+            )
+        )
+        connection.executemany(
+            "INSERT INTO guild_settings (guild_id, mod_log_channel) VALUES (?, ?)",
+            ((GUILD_BASE + g, GUILD_BASE + g + 1) for g in range(spec.guilds))
+        )
+        connection.executemany(
+            "INSERT INTO antivirus_settings (guild_id) VALUES (?)",
+            ((GUILD_BASE + g,) for g in range(spec.guilds))
+        )
+        actions = ['warn', 'mute', 'kick', 'ban', 'timeout', 'unban']
+        connection.executemany(
+            "INSERT INTO mod_logs (guild_id, action_type, user_id, moderator_id, reason, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (guild_id, rng.choice(actions), user_id, MODERATOR_ID, 'Benchmark seed', _timestamp(rng, now))
+                for user_id, guild_id in (random_user() for _ in range(spec.mod_logs))
+            )
+        )
+        levels = ['safe', 'safe', 'safe', 'suspicious', 'malicious']
+        connection.executemany(
+            "INSERT INTO antivirus_scan_logs (guild_id, user_id, item_name, item_type, threat_level, "
+            "malicious_count, suspicious_count, action_taken, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (guild_id, user_id, f'https://example{rng.randrange(1000)}.com', rng.choice(['url', 'file']),
+                 rng.choice(levels), rng.randrange(3), rng.randrange(3), None, _timestamp(rng, now))
+                for user_id, guild_id in (random_user() for _ in range(spec.scan_logs))
+            )
+        )
+        connection.executemany(
+            "INSERT INTO warnings (user_id, guild_id, moderator_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (random_user() + (MODERATOR_ID, 'Benchmark seed', _timestamp(rng, now)) for _ in range(spec.warnings))
+        )
+        connection.executemany(
+            "INSERT INTO custom_commands (guild_id, trigger, response, created_by) VALUES (?, ?, ?, ?)",
+            (
+                (GUILD_BASE + g, f'cmd{c}', f'Response {c}', MODERATOR_ID)
+                for g in range(spec.guilds) for c in range(spec.custom_commands)
+            )
+        )
+        connection.executemany(
+            "INSERT INTO blacklist (guild_id, word) VALUES (?, ?)",
+            ((GUILD_BASE + g, f'badword{w}') for g in range(spec.guilds) for w in range(spec.blacklist_words))
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO mutes (user_id, guild_id, unmute_at, reason) VALUES (?, ?, ?, ?)",
+            (
+                random_user() + (now + timedelta(minutes=rng.randint(-60, 600)), 'Benchmark seed')
+                for _ in range(spec.mutes)
+            )
+        )
+        connection.executemany(
+            "INSERT INTO custom_media (name, filename, guild_id, uploaded_by) VALUES (?, ?, ?, ?)",
+            (
+                (f'media{m}', f'media{m}.mp3', str(GUILD_BASE + m % spec.guilds), str(MODERATOR_ID))
+                for m in range(spec.custom_media)
+            )
+        )
+    connection.close()
+
+
+class Bench:
+    """State shared by the benchmark cases: the database, seeded IDs and an RNG"""
+
+    def __init__(self, db: DatabaseManager, spec: SeedSpec, seed: int = 0):
+        self.db = db
+        self.spec = spec
+        self.rng = random.Random(seed)
+        self._next_id = USER_BASE * 10
+
+    def guild(self) -> int:
+        return GUILD_BASE + self.rng.randrange(self.spec.guilds)
+
+    def user(self):
+        """(user_id, guild_id) of a seeded user"""
+        index = self.rng.randrange(self.spec.users)
+        return USER_BASE + index, GUILD_BASE + index % self.spec.guilds
+
+    def user_pair(self):
+        """(guild_id, user_id, other_user_id) of two seeded users in the same guild"""
+        user_id, guild_id = self.user()
+        other = user_id + self.spec.guilds
+        if other >= USER_BASE + self.spec.users:
+            other = user_id - self.spec.guilds
+        return guild_id, user_id, other
+
+    def new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+
+@dataclass
+class BenchCase:
+    """One timed method; setup runs untimed and its result is passed to every call"""
+    method: str
+    run: Callable[[Bench, Any, int], Awaitable[Any]]
+    setup: Optional[Callable[[Bench, int], Awaitable[Any]]] = None
+
+
+async def _users(bench: Bench, n: int):
+    return [await bench.db.get_user(*bench.user()) for _ in range(min(n, 500))]
+
+
+async def _warning_ids(bench: Bench, n: int):
+    return [await bench.db.add_warning(*bench.user(), MODERATOR_ID, 'Setup') for _ in range(n)]
+
+
+async def _custom_commands(bench: Bench, n: int):
+    guild_id = bench.guild()
+    for i in range(n):
+        await bench.db.add_custom_command(guild_id, f'setup{i}', 'Setup', MODERATOR_ID)
+    return guild_id
+
+
+async def _blacklist(bench: Bench, n: int):
+    guild_id = bench.guild()
+    for i in range(n):
+        await bench.db.add_blacklist_word(guild_id, f'setupword{i}')
+    return guild_id
+
+
+async def _youtube_subs(bench: Bench, n: int):
+    guild_id = bench.guild()
+    for i in range(n):
+        await bench.db.add_youtube_sub(guild_id, f'UCsetup{i}', guild_id + 1)
+    return guild_id
+
+
+async def _media_ids(bench: Bench, n: int):
+    return [await bench.db.add_custom_media(f'setup{i}', guild_id=str(bench.guild())) for i in range(n)]
+
+
+async def _play_requests(bench: Bench, n: int):
+    return [await bench.db.add_play_request(str(bench.guild()), f'song{i}') for i in range(n)]
+
+
+async def _whitelist(bench: Bench, n: int):
+    guild_id = bench.guild()
+    for i in range(n):
+        await bench.db.add_everyone_ping_whitelist(guild_id, USER_BASE + i)
+    return guild_id
+
+
+async def _protected_roles(bench: Bench, n: int):
+    guild_id = bench.guild()
+    for i in range(n):
+        await bench.db.add_antivirus_protected_role(guild_id, USER_BASE + i)
+    return guild_id
+
+
+async def _giveaways(bench: Bench, n: int):
+    message_ids = [bench.new_id() for _ in range(n)]
+    end_time = datetime.utcnow() + timedelta(days=1)
+    for message_id in message_ids:
+        await bench.db.add_giveaway(message_id, 1, bench.guild(), 'Prize', 1, end_time, USER_BASE)
+    return message_ids
+
+
+async def _log_webhooks(bench: Bench, n: int):
+    channel_ids = [bench.new_id() for _ in range(n)]
+    for channel_id in channel_ids:
+        await bench.db.set_log_webhook(channel_id, bench.guild(), channel_id, 'setup-token')
+    return channel_ids
+
+
+async def _update_user(bench: Bench, users, i: int):
+    user = users[i % len(users)]
+    user.xp += 1
+    await bench.db.update_user(user)
+
+
+async def _update_guild_settings(bench: Bench, state, i: int):
+    settings = await bench.db.get_guild_settings(bench.guild())
+    settings.spam_detection = not settings.spam_detection
+    await bench.db.update_guild_settings(settings)
+
+
+async def _update_antivirus_settings(bench: Bench, state, i: int):
+    settings = await bench.db.get_antivirus_settings(bench.guild())
+    settings.scan_urls = not settings.scan_urls
+    await bench.db.update_antivirus_settings(settings)
+
+
+def _cases() -> List[BenchCase]:
+    now = datetime.utcnow
+    return [
+        BenchCase('get_schema_version', lambda b, s, i: b.db.get_schema_version()),
+        BenchCase('flush', lambda b, s, i: b.db.flush()),
+
+        # Users and economy
+        BenchCase('get_user', lambda b, s, i: b.db.get_user(*b.user())),
+        BenchCase('create_user', lambda b, s, i: b.db.create_user(b.new_id(), b.guild())),
+        BenchCase('update_user', _update_user, _users),
+        BenchCase('get_or_create_user', lambda b, s, i: b.db.get_or_create_user(*b.user())),
+        BenchCase('add_xp', lambda b, s, i: b.db.add_xp(*b.user(), 15)),
+        BenchCase('set_level', lambda b, s, i: b.db.set_level(*b.user(), 10, 100)),
+        BenchCase('add_balance', lambda b, s, i: b.db.add_balance(*b.user(), 25)),
+        BenchCase('claim_daily', lambda b, s, i: b.db.claim_daily(*b.user(), 100, timedelta(0))),
+        BenchCase('transfer', lambda b, s, i: b.db.transfer(*b.user_pair(), 1)),
+        BenchCase('get_top_users_by_balance', lambda b, s, i: b.db.get_top_users_by_balance(b.guild())),
+        BenchCase('get_top_users_by_level', lambda b, s, i: b.db.get_top_users_by_level(b.guild())),
+
+        # Moderation
+        BenchCase('add_warning', lambda b, s, i: b.db.add_warning(*b.user(), MODERATOR_ID, 'Bench')),
+        BenchCase('get_warnings', lambda b, s, i: b.db.get_warnings(*b.user())),
+        BenchCase('remove_warning', lambda b, s, i: b.db.remove_warning(s[i]), _warning_ids),
+        BenchCase('clear_warnings', lambda b, s, i: b.db.clear_warnings(*b.user())),
+        BenchCase('add_mod_log', lambda b, s, i: b.db.add_mod_log(b.guild(), 'warn', b.user()[0], MODERATOR_ID)),
+        BenchCase('get_mod_logs', lambda b, s, i: b.db.get_mod_logs(*b.user())),
+        BenchCase('get_mod_log_by_case',
+                  lambda b, s, i: b.db.get_mod_log_by_case(b.rng.randint(1, max(1, b.spec.mod_logs)))),
+        BenchCase('add_mute', lambda b, s, i: b.db.add_mute(*b.user(), now() + timedelta(hours=1), 'Bench')),
+        BenchCase('remove_mute', lambda b, s, i: b.db.remove_mute(*b.user())),
+        BenchCase('get_expired_mutes', lambda b, s, i: b.db.get_expired_mutes()),
+
+        # Custom commands, settings and blacklist
+        BenchCase('add_custom_command',
+                  lambda b, s, i: b.db.add_custom_command(b.guild(), f'bench{i}', 'Bench', MODERATOR_ID)),
+        BenchCase('remove_custom_command', lambda b, s, i: b.db.remove_custom_command(s, f'setup{i}'),
+                  _custom_commands),
+        BenchCase('get_custom_command', lambda b, s, i: b.db.get_custom_command(b.guild(), 'cmd1')),
+        BenchCase('get_all_custom_commands', lambda b, s, i: b.db.get_all_custom_commands(b.guild())),
+        BenchCase('get_guild_settings', lambda b, s, i: b.db.get_guild_settings(b.guild())),
+        BenchCase('update_guild_settings', _update_guild_settings),
+        BenchCase('get_bot_log_channels', lambda b, s, i: b.db.get_bot_log_channels()),
+        BenchCase('add_blacklist_word', lambda b, s, i: b.db.add_blacklist_word(b.guild(), f'benchword{i}')),
+        BenchCase('remove_blacklist_word', lambda b, s, i: b.db.remove_blacklist_word(s, f'setupword{i}'),
+                  _blacklist),
+        BenchCase('get_blacklist', lambda b, s, i: b.db.get_blacklist(b.guild())),
+        BenchCase('add_everyone_ping_whitelist',
+                  lambda b, s, i: b.db.add_everyone_ping_whitelist(b.guild(), b.new_id())),
+        BenchCase('remove_everyone_ping_whitelist',
+                  lambda b, s, i: b.db.remove_everyone_ping_whitelist(s, USER_BASE + i), _whitelist),
+        BenchCase('get_everyone_ping_whitelist', lambda b, s, i: b.db.get_everyone_ping_whitelist(b.guild())),
+        BenchCase('clear_everyone_ping_whitelist', lambda b, s, i: b.db.clear_everyone_ping_whitelist(b.guild())),
+
+        # Antivirus
+        BenchCase('get_antivirus_settings', lambda b, s, i: b.db.get_antivirus_settings(b.guild())),
+        BenchCase('update_antivirus_settings', _update_antivirus_settings),
+        BenchCase('add_antivirus_protected_role',
+                  lambda b, s, i: b.db.add_antivirus_protected_role(b.guild(), b.new_id())),
+        BenchCase('remove_antivirus_protected_role',
+                  lambda b, s, i: b.db.remove_antivirus_protected_role(s, USER_BASE + i), _protected_roles),
+        BenchCase('get_antivirus_protected_roles', lambda b, s, i: b.db.get_antivirus_protected_roles(b.guild())),
+        BenchCase('clear_antivirus_protected_roles',
+                  lambda b, s, i: b.db.clear_antivirus_protected_roles(b.guild())),
+        BenchCase('add_antivirus_scan_log', lambda b, s, i: b.db.add_antivirus_scan_log(
+            b.guild(), b.user()[0], 'https://example.com', 'url', 'safe')),
+        BenchCase('get_antivirus_scan_logs', lambda b, s, i: b.db.get_antivirus_scan_logs(b.guild())),
+
+        # YouTube, media and play queue (dashboard tables)
+        BenchCase('add_youtube_sub', lambda b, s, i: b.db.add_youtube_sub(b.guild(), f'UCbench{i}', 1)),
+        BenchCase('remove_youtube_sub', lambda b, s, i: b.db.remove_youtube_sub(s, f'UCsetup{i}'), _youtube_subs),
+        BenchCase('get_youtube_subs', lambda b, s, i: b.db.get_youtube_subs(b.guild())),
+        BenchCase('get_all_youtube_subs', lambda b, s, i: b.db.get_all_youtube_subs()),
+        BenchCase('update_youtube_last_video',
+                  lambda b, s, i: b.db.update_youtube_last_video(s, f'UCsetup{i}', f'video{i}'), _youtube_subs),
+        BenchCase('add_custom_media', lambda b, s, i: b.db.add_custom_media(f'bench{i}', guild_id=str(b.guild()))),
+        BenchCase('get_custom_media', lambda b, s, i: b.db.get_custom_media('media1', str(b.guild()))),
+        BenchCase('get_all_custom_media', lambda b, s, i: b.db.get_all_custom_media(str(b.guild()))),
+        BenchCase('delete_custom_media', lambda b, s, i: b.db.delete_custom_media(s[i]), _media_ids),
+        BenchCase('add_play_request', lambda b, s, i: b.db.add_play_request(str(b.guild()), 'song')),
+        BenchCase('get_pending_play_requests', lambda b, s, i: b.db.get_pending_play_requests()),
+        BenchCase('update_play_request_status',
+                  lambda b, s, i: b.db.update_play_request_status(s[i], 'played'), _play_requests),
+        BenchCase('cleanup_old_play_requests', lambda b, s, i: b.db.cleanup_old_play_requests(24)),
+
+        # Giveaways
+        BenchCase('add_giveaway', lambda b, s, i: b.db.add_giveaway(
+            b.new_id(), 1, b.guild(), 'Prize', 1, now() + timedelta(days=1), USER_BASE)),
+        BenchCase('end_giveaway', lambda b, s, i: b.db.end_giveaway(s[i]), _giveaways),
+
+        # Log webhooks
+        BenchCase('get_log_webhook', lambda b, s, i: b.db.get_log_webhook(s[i]), _log_webhooks),
+        BenchCase('set_log_webhook',
+                  lambda b, s, i: b.db.set_log_webhook(b.new_id(), b.guild(), b.new_id(), 'bench-token')),
+        BenchCase('remove_log_webhook', lambda b, s, i: b.db.remove_log_webhook(s[i]), _log_webhooks),
+    ]
+
+
+CASES = _cases()
+
+
+def uncovered_methods() -> List[str]:
+    """Public DatabaseManager coroutines without a benchmark case"""
+    covered = {case.method for case in CASES}
+    return sorted(
+        name for name, _ in inspect.getmembers(DatabaseManager, inspect.iscoroutinefunction)
+        if not name.startswith('_') and name not in NOT_BENCHMARKED and name not in covered
+    )
+
+
+async def run_case(bench: Bench, case: BenchCase, iterations: int, max_seconds: float,
+                   warmup: int = 10) -> Dict[str, float]:
+    """Time one method; stops early after max_seconds"""
+    state = await case.setup(bench, iterations + warmup) if case.setup else None
+    for i in range(warmup):
+        await case.run(bench, state, iterations + i)
+
+    latencies = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(iterations):
+        start = time.perf_counter()
+        await case.run(bench, state, i)
+        latencies.append(time.perf_counter() - start)
+        if start > deadline:
+            break
+    await bench.db.flush()
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / total if total else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def prepare_database(path: str, spec: SeedSpec, seed: int = 0, cache: Optional[str] = None):
+    """Create and seed a database at `path`, reusing a seeded copy from `cache` when the spec matches"""
+    spec_file = f'{cache}.json' if cache else None
+    if cache and os.path.exists(cache) and os.path.exists(spec_file):
+        with open(spec_file, encoding='utf-8') as f:
+            if json.load(f) == {'spec': asdict(spec), 'seed': seed}:
+                shutil.copyfile(cache, path)
+                return
+
+    async def create_schema():
+        db = DatabaseManager(path)
+        await db.initialize()
+        await db.close()
+
+    asyncio.run(create_schema())
+    logger.info(f"Seeding benchmark database: {asdict(spec)}")
+    start = time.perf_counter()
+    seed_database(path, spec, seed)
+    logger.info(f"Seeded benchmark database in {time.perf_counter() - start:.1f}s")
+
+    if cache:
+        shutil.copyfile(path, cache)
+        with open(spec_file, 'w', encoding='utf-8') as f:
+            json.dump({'spec': asdict(spec), 'seed': seed}, f)
+
+
+async def run_benchmarks(path: str, spec: SeedSpec, iterations: int = 1000, max_seconds: float = 5.0,
+                         only: Optional[List[str]] = None, seed: int = 0,
+                         db_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run every case (or `only` these methods) against an already seeded database"""
+    db_options = db_options or {}
+    db = DatabaseManager(path, **db_options)
+    await db.initialize()
+    bench = Bench(db, spec, seed)
+    results = {}
+    try:
+        for case in CASES:
+            if only and case.method not in only:
+                continue
+            results[case.method] = await run_case(bench, case, iterations, max_seconds)
+    finally:
+        await db.close()
+
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'sqlite_version': sqlite3.sqlite_version,
+        'spec': asdict(spec),
+        'db_options': db_options,
+        'iterations': iterations,
+        'results': results,
+    }
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Per-method change from `base` to `new`; regressions are ops/sec drops beyond `threshold`"""
+    rows = []
+    for method, after in new['results'].items():
+        before = base['results'].get(method)
+        if not before or not before['ops_per_sec']:
+            continue
+        change = after['ops_per_sec'] / before['ops_per_sec'] - 1
+        rows.append({
+            'method': method,
+            'before_ops_per_sec': before['ops_per_sec'],
+            'after_ops_per_sec': after['ops_per_sec'],
+            'change': change,
+            'before_p99_ms': before['p99_ms'],
+            'after_p99_ms': after['p99_ms'],
+            'regression': change < -threshold,
+        })
+    rows.sort(key=lambda row: row['change'])
+    return rows
+
+
+def format_results(report: Dict[str, Any]) -> str:
+    lines = [f"{'method':<34}{'ops':>7}{'ops/sec':>11}{'p50 ms':>9}{'p99 ms':>9}"]
+    for method, stats in sorted(report['results'].items()):
+        lines.append(
+            f"{method:<34}{stats['ops']:>7}{stats['ops_per_sec']:>11.0f}"
+            f"{stats['p50_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'method':<34}{'before/s':>10}{'after/s':>10}{'change':>9}{'p99 before':>12}{'p99 after':>11}"]
+    for row in rows:
+        lines.append(
+            f"{row['method']:<34}{row['before_ops_per_sec']:>10.0f}{row['after_ops_per_sec']:>10.0f}"
+            f"{row['change'] * 100:>8.1f}%{row['before_p99_ms']:>12.3f}{row['after_p99_ms']:>11.3f}"
+            + ('  REGRESSION' if row['regression'] else '')
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Benchmark every DatabaseManager method')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='Seed a temp database and run the benchmarks')
+    run.add_argument('--out', help='Write results to this JSON file')
+    run.add_argument('--iterations', type=int, default=1000, help='Calls per method')
+    run.add_argument('--max-seconds', type=float, default=5.0, help='Time limit per method')
+    run.add_argument('--only', nargs='*', help='Only these methods')
+    run.add_argument('--scale', type=float, default=1.0, help='Multiply the seeded row counts')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--seed-cache', help='Keep the seeded database here and reuse it on later runs')
+    run.add_argument('--group-commit', action='store_true', default=config.DB_GROUP_COMMIT)
+    run.add_argument('--wal', action='store_true', default=config.DB_WAL_MODE)
+    run.add_argument('--read-pool', type=int, default=config.DB_READ_POOL_SIZE)
+
+    diff = subparsers.add_parser('compare', help='Compare two result files')
+    diff.add_argument('base')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=0.10, help='ops/sec drop counted as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare(base, new, args.threshold)
+        print(format_comparison(rows))
+        raise SystemExit(1 if any(row['regression'] for row in rows) else 0)
+
+    defaults = SeedSpec()
+    spec = SeedSpec(**{
+        name: max(1, int(value * args.scale)) if name in ('users', 'mod_logs', 'scan_logs', 'warnings',
+                                                          'mutes', 'custom_media') else value
+        for name, value in asdict(defaults).items()
+    })
+    db_options = {
+        'group_commit': args.group_commit,
+        'wal_mode': args.wal,
+        'read_pool_size': args.read_pool,
+    }
+    with tempfile.TemporaryDirectory(prefix='db-bench-') as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        prepare_database(path, spec, args.seed, args.seed_cache)
+        report = asyncio.run(run_benchmarks(
+            path, spec, args.iterations, args.max_seconds, args.only, args.seed, db_options
+        ))
+
+    print(format_results(report))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+In-process fake of Discord's REST API
+Records every outbound call the cogs make and fabricates the responses
+discord.py needs to keep going (sent messages, DM channels, fetched users)
+"""
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from discord.http import HTTPClient, Route
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from harness import payloads
+
+_MESSAGE_ID = re.compile(r'/messages/(\d+)')
+_USER_ID = re.compile(r'/(?:users|members)/(\d+)')
+
+
+@dataclass
+class OutboundCall:
+    """One REST call a cog made"""
+    method: str
+    path: str  # Route template, e.g. /channels/{channel_id}/messages
+    url: str
+    payload: Optional[Dict[str, Any]]
+    channel_id: Optional[int] = None
+    guild_id: Optional[int] = None
+    time: float = field(default_factory=time.perf_counter)
+
+
+def _payload_from(kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """JSON body of a request, whether sent as json, payload or multipart"""
+    for key in ('json', 'payload'):
+        if kwargs.get(key) is not None:
+            return kwargs[key]
+    for part in kwargs.get('form') or kwargs.get('multipart') or ():
+        if part.get('name') == 'payload_json':
+            return json.loads(part['value'])
+    return None
+
+
+class FakeDiscordAPI:
+    """Shared recorder and response factory for the bot and webhook adapters"""
+
+    def __init__(self, bot_user: Dict[str, Any], latency: float = 0.0):
+        self.bot_user = bot_user
+        self.latency = latency  # Simulated round trip, in seconds
+        self.calls: List[OutboundCall] = []
+        self.interaction_channels: Dict[str, int] = {}  # Interaction token -> channel ID
+        self.handlers: Dict[tuple, Callable[[Route, Optional[Dict[str, Any]]], Any]] = {}
+        self.cdn_content = b'\0' * 1024  # Body of every downloaded attachment
+
+    def on(self, method: str, path: str, handler: Callable[[Route, Optional[Dict[str, Any]]], Any]):
+        """Override the response for a route template"""
+        self.handlers[(method, path)] = handler
+
+    def calls_to(self, method: Optional[str] = None, path: Optional[str] = None) -> List[OutboundCall]:
+        return [
+            call for call in self.calls
+            if (method is None or call.method == method) and (path is None or call.path == path)
+        ]
+
+    def reset(self):
+        self.calls.clear()
+
+    async def download(self, url: str) -> bytes:
+        """Attachment and asset downloads from the CDN"""
+        self.calls.append(OutboundCall('GET', 'cdn', url, None))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.cdn_content
+
+    async def handle(self, route: Route, payload: Optional[Dict[str, Any]]) -> Any:
+        self.calls.append(OutboundCall(
+            route.method, route.path, route.url, payload, route.channel_id, route.guild_id
+        ))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        handler = self.handlers.get((route.method, route.path))
+        if handler:
+            return handler(route, payload)
+        return self.default_response(route, payload)
+
+    def _message(self, channel_id: int, payload: Optional[Dict[str, Any]],
+                 message_id: Optional[int] = None) -> Dict[str, Any]:
+        payload = payload or {}
+        data = payloads.message(
+            channel_id, None, self.bot_user, payload.get('content') or '', message_id=message_id
+        )
+        data['embeds'] = payload.get('embeds') or []
+        return data
+
+    def default_response(self, route: Route, payload: Optional[Dict[str, Any]]) -> Any:
+        method, path = route.method, route.path
+        message_id = _MESSAGE_ID.search(route.url)
+        message_id = int(message_id.group(1)) if message_id else None
+
+        if path.startswith('/channels/{channel_id}/messages') and method in ('POST', 'PATCH', 'GET'):
+            if path.endswith('/bulk-delete'):
+                return None
+            if path.endswith('/messages') and method == 'GET':
+                return []  # History
+            if path.count('/') <= 4 or message_id:
+                return self._message(route.channel_id, payload, message_id)
+
+        if path.startswith('/webhooks/{webhook_id}/{webhook_token}') and method in ('POST', 'PATCH', 'GET'):
+            channel_id = self.interaction_channels.get(route.webhook_token, 0)
+            return self._message(channel_id, payload, message_id)
+
+        if path == '/channels/{channel_id}/webhooks' and method == 'POST':
+            return {
+                'id': str(payloads.snowflake()),
+                'type': 1,
+                'token': f'webhook-token-{payloads.snowflake()}',
+                'channel_id': str(route.channel_id),
+                'guild_id': None,
+                'name': payload.get('name'),
+                'avatar': None,
+                'user': self.bot_user,
+            }
+
+        if path == '/users/@me/channels':
+            return {
+                'id': str(payloads.snowflake()),
+                'type': 1,
+                'last_message_id': None,
+                'recipients': [payloads.user(int(payload['recipient_id']))],
+            }
+
+        user_id = _USER_ID.search(route.url)
+        if method in ('GET', 'PATCH') and user_id:
+            user = payloads.user(int(user_id.group(1)))
+            return payloads.member(user) if path.startswith('/guilds/') else user
+
+        return None
+
+
+class FakeHTTPClient(HTTPClient):
+    """discord.py HTTPClient that answers from a FakeDiscordAPI instead of the network"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, api: FakeDiscordAPI):
+        super().__init__(loop)
+        self.api = api
+        self.token = 'fake-token'
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:
+        return await self.api.handle(route, _payload_from(kwargs))
+
+    async def get_from_cdn(self, url: str) -> bytes:
+        return await self.api.download(url)
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    """Webhook adapter used for interaction responses and followups"""
+
+    def __init__(self, api: FakeDiscordAPI):
+        super().__init__()
+        self.api = api
+
+    async def request(self, route: Route, session, **kwargs: Any) -> Any:
+        return await self.api.handle(route, _payload_from(kwargs))
+
+
+def install_webhook_adapter(api: FakeDiscordAPI):
+    """Route interaction responses in the current context through the fake"""
+    return async_context.set(FakeWebhookAdapter(api))
@@ -0,0 +1,73 @@
+"""
+In-process fake of the VirusTotal API
+Stands in for the antivirus cogs' aiohttp session so file and URL scans run
+their normal code paths without leaving the process
+"""
+import asyncio
+import itertools
+import random
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import config
+
+
+class _Response:
+    def __init__(self, status: int, data: Dict[str, Any]):
+        self.status = status
+        self._data = data
+
+    async def json(self) -> Dict[str, Any]:
+        return self._data
+
+
+class _RequestContext:
+    """What `session.get(...)` / `session.post(...)` return: an async context manager"""
+
+    def __init__(self, session: 'FakeVirusTotalSession', method: str, url: str):
+        self.session = session
+        self.method = method
+        self.url = url
+
+    async def __aenter__(self) -> _Response:
+        return await self.session.respond(self.method, self.url)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeVirusTotalSession:
+    """Answers the VirusTotal v3 endpoints the cogs use, with simulated latency and verdicts"""
+
+    def __init__(self, latency: float = 0.0, malicious_ratio: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.malicious_ratio = malicious_ratio
+        self.requests = Counter()  # (method, endpoint) -> count
+        self.closed = False
+        self._rng = random.Random(seed)
+        self._analysis_ids = itertools.count(1)
+
+    def get(self, url: str, **kwargs) -> _RequestContext:
+        return _RequestContext(self, 'GET', url)
+
+    def post(self, url: str, **kwargs) -> _RequestContext:
+        return _RequestContext(self, 'POST', url)
+
+    async def close(self):
+        self.closed = True
+
+    def _verdict(self) -> Dict[str, Any]:
+        malicious = config.KCLAntivirus.MALICIOUS_THRESHOLD if self._rng.random() < self.malicious_ratio else 0
+        return {'data': {'attributes': {
+            'stats': {'malicious': malicious, 'suspicious': 0, 'harmless': 60, 'undetected': 10}
+        }}}
+
+    async def respond(self, method: str, url: str) -> _Response:
+        endpoint = url.split('/api/v3/', 1)[-1].split('/', 1)[0]
+        self.requests[(method, endpoint)] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == 'POST':
+            return _Response(200, {'data': {'id': f'analysis-{next(self._analysis_ids)}'}})
+        return _Response(200, self._verdict())
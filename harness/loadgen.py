@@ -0,0 +1,266 @@
+"""
+Synthetic load generator
+Simulates many guilds of chatting users at a fixed offered message rate
+(open loop, like real gateway traffic), with join bursts, link-heavy chatter
+and attachment uploads, and reports what the bot sustained
+"""
+import os
+
+os.environ.setdefault('LOG_FILE', '')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # Raid and moderation warnings would flood the console
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.loop_monitor import LoopLagMonitor
+from utils.metrics import LISTENER_SECONDS
+from utils.metrics_server import TRACKED_STRUCTURES
+
+MESSAGE_LISTENER = 'DiscordBot.on_message'
+WORDS = ['hello', 'gg', 'anyone here', 'nice', 'lol', 'what time is it', 'brb', 'wow', 'same', 'ok', 'ty']
+LINK_DOMAINS = ['github.com', 'youtube.com', 'example.com', 'wikipedia.org', 'reddit.com', 'docs.python.org']
+ATTACHMENTS = ['screenshot.png', 'clip.mp4', 'notes.txt', 'build.zip', 'report.docx', 'tool.exe']
+
+
+@dataclass
+class LoadProfile:
+    """What to simulate"""
+    guilds: int = 10
+    users_per_guild: int = 200
+    channels_per_guild: int = 5
+    message_rate: float = 200.0  # Messages/sec across all guilds
+    duration: float = 40.0  # Seconds per step
+    warmup: float = 15.0  # Seconds at the start of a step left out of the sustained rate
+    link_ratio: float = 0.2  # Messages with 1-3 links
+    attachment_ratio: float = 0.02  # Messages with an attachment
+    join_burst_every: float = 10.0  # Seconds between join bursts (0 disables)
+    join_burst_size: int = 50
+    api_latency_ms: float = 50.0  # Simulated Discord REST latency
+    vt_latency_ms: float = 300.0  # Simulated VirusTotal latency
+    vt_malicious_ratio: float = 0.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class StepResult:
+    """What the bot sustained at one offered rate"""
+    offered_rate: float
+    sent: int
+    processed: int  # Messages fully handled after the warmup
+    sustained_rate: float
+    backlog: int  # Listener tasks still running when sending stopped
+    drain_seconds: float
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    rss_start_mb: float
+    rss_end_mb: float
+    db_writes_per_sec: float
+    api_calls_per_sec: float
+    virustotal_requests: int
+    structure_items: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def kept_up(self) -> bool:
+        return self.sustained_rate >= self.offered_rate * 0.9 and self.loop_lag_p99_ms < 500
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak size where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _message_count() -> int:
+    entry = LISTENER_SECONDS.values.get((MESSAGE_LISTENER,))
+    return entry[-1] if entry else 0
+
+
+class LoadGenerator:
+    """Feeds synthetic traffic into a ReplayHarness at a fixed rate"""
+
+    def __init__(self, harness: ReplayHarness, profile: LoadProfile):
+        self.harness = harness
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.fixtures = [
+            harness.add_guild(f'Load Guild {i + 1}', members=profile.users_per_guild,
+                              channels=profile.channels_per_guild)
+            for i in range(profile.guilds)
+        ]
+
+    def _content(self) -> str:
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(1, 12))]
+        if self.rng.random() < self.profile.link_ratio:
+            for _ in range(self.rng.randint(1, 3)):
+                words.insert(
+                    self.rng.randrange(len(words) + 1),
+                    f'https://{self.rng.choice(LINK_DOMAINS)}/{self.rng.randrange(1_000_000)}'
+                )
+        return ' '.join(words)
+
+    def send_message(self):
+        fixture = self.rng.choice(self.fixtures)
+        author = self.rng.choice(fixture.members)
+        attachments = None
+        if self.rng.random() < self.profile.attachment_ratio:
+            attachments = [payloads.attachment(self.rng.choice(ATTACHMENTS), self.rng.randint(1_000, 5_000_000))]
+        self.harness.feed('MESSAGE_CREATE', payloads.message(
+            self.rng.choice(fixture.channel_ids), fixture.id, author['user'], self._content(),
+            author, attachments=attachments
+        ))
+
+    def join_burst(self):
+        fixture = self.rng.choice(self.fixtures)
+        for _ in range(self.profile.join_burst_size):
+            member = payloads.member(payloads.user())
+            fixture.members.append(member)
+            self.harness.feed('GUILD_MEMBER_ADD', payloads.member_add(fixture.id, member))
+
+    def structure_items(self) -> Dict[str, int]:
+        items = {}
+        for cog_name, attribute in TRACKED_STRUCTURES:
+            cog = self.harness.bot.get_cog(cog_name)
+            structure = getattr(cog, attribute, None) if cog else None
+            if structure is not None:
+                items[f'{cog_name}.{attribute}'] = sum(
+                    len(value) if hasattr(value, '__len__') else 1 for value in structure.values()
+                )
+        return items
+
+    async def run_step(self, rate: float, monitor: LoopLagMonitor) -> StepResult:
+        """Offer `rate` messages/sec for the profile's duration, then wait for the backlog"""
+        profile = self.profile
+        db_connection = self.harness.bot.db.connection
+        vt = self.harness.bot.get_cog('KCLAntivirusSimple')
+        vt_session = getattr(vt, 'session', None)
+        vt_before = sum(getattr(vt_session, 'requests', {}).values())
+
+        monitor.samples.clear()
+        calls_before = len(self.harness.api.calls)
+        writes_before = db_connection.total_changes
+        rss_start = rss_mb()
+
+        # Completions are counted after the warmup, once slow handlers have reached
+        # a steady state (a VirusTotal URL scan holds its message for 5s or more)
+        warmup = min(profile.warmup, profile.duration / 2)
+        processed_before = None
+        sent = 0
+        start = time.perf_counter()
+        next_burst = profile.join_burst_every or None
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= profile.duration:
+                break
+            if processed_before is None and elapsed >= warmup:
+                processed_before = _message_count()
+                measured_from = time.perf_counter()
+            # Open loop: catch up on every message that is due, however late the loop woke
+            for _ in range(int(rate * elapsed) - sent):
+                self.send_message()
+                sent += 1
+            if next_burst is not None and elapsed >= next_burst:
+                self.join_burst()
+                next_burst += profile.join_burst_every
+            await asyncio.sleep(0.01)
+
+        end = time.perf_counter()
+        send_seconds = end - start
+        processed = _message_count() - processed_before
+        backlog = self.harness.pending()
+
+        drain_start = time.perf_counter()
+        await self.harness.drain()
+        drain_seconds = time.perf_counter() - drain_start
+
+        lag = monitor.stats()
+        await self.harness.bot.db.flush()
+        return StepResult(
+            offered_rate=rate,
+            sent=sent,
+            processed=processed,
+            sustained_rate=processed / (end - measured_from),
+            backlog=backlog,
+            drain_seconds=drain_seconds,
+            loop_lag_p50_ms=lag['p50'],
+            loop_lag_p99_ms=lag['p99'],
+            loop_lag_max_ms=lag['max'],
+            rss_start_mb=rss_start,
+            rss_end_mb=rss_mb(),
+            db_writes_per_sec=(db_connection.total_changes - writes_before) / send_seconds,
+            api_calls_per_sec=(len(self.harness.api.calls) - calls_before) / send_seconds,
+            virustotal_requests=sum(getattr(vt_session, 'requests', {}).values()) - vt_before,
+            structure_items=self.structure_items(),
+        )
+
+
+async def run_load(profile: LoadProfile, rates: List[float], cogs: Optional[List[str]] = None,
+                   stop_on_failure: bool = True) -> List[StepResult]:
+    """Run one step per rate against a single bot; stops after the first rate it can't keep up with"""
+    results = []
+    async with ReplayHarness(cogs=cogs, latency=profile.api_latency_ms / 1000, drain_timeout=30.0) as harness:
+        await harness.stub_virustotal(profile.vt_latency_ms / 1000, profile.vt_malicious_ratio, profile.seed)
+        generator = LoadGenerator(harness, profile)
+        monitor = LoopLagMonitor(interval_ms=20, threshold_ms=1000, report_seconds=0)
+        monitor.start()
+        try:
+            for rate in rates:
+                result = await generator.run_step(rate, monitor)
+                results.append(result)
+                print(format_step(result), flush=True)
+                if stop_on_failure and not result.kept_up:
+                    break
+        finally:
+            monitor.stop()
+    return results
+
+
+def format_step(result: StepResult) -> str:
+    return (
+        f"offered {result.offered_rate:>7.0f}/s  sustained {result.sustained_rate:>7.0f}/s  "
+        f"backlog {result.backlog:>6}  drain {result.drain_seconds:>5.1f}s  "
+        f"lag p99 {result.loop_lag_p99_ms:>7.1f} ms (max {result.loop_lag_max_ms:.0f})  "
+        f"rss {result.rss_start_mb:.0f}->{result.rss_end_mb:.0f} MB  "
+        f"db {result.db_writes_per_sec:>6.0f} rows/s  api {result.api_calls_per_sec:>6.0f}/s  "
+        f"{'ok' if result.kept_up else 'FELL BEHIND'}"
+    )
+
+
+def main():
+    defaults = LoadProfile()
+    parser = argparse.ArgumentParser(description='Drive the bot with synthetic multi-guild load')
+    parser.add_argument('--rates', default=str(defaults.message_rate),
+                        help='Comma-separated offered message rates to step through, e.g. 100,200,400,800')
+    parser.add_argument('--keep-going', action='store_true', help='Run every rate even after falling behind')
+    parser.add_argument('--cogs', nargs='*', default=None, help='Cogs to load (default: the bot\'s list)')
+    parser.add_argument('--json', help='Write step results to this JSON file')
+    for name, value in asdict(defaults).items():
+        if name != 'message_rate':
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(value) if value is not None else int,
+                                default=value)
+    args = parser.parse_args()
+
+    profile = LoadProfile(**{name: getattr(args, name) for name in asdict(defaults) if name != 'message_rate'})
+    rates = [float(rate) for rate in args.rates.split(',')]
+    results = asyncio.run(run_load(profile, rates, args.cogs, stop_on_failure=not args.keep_going))
+
+    kept_up = [result.offered_rate for result in results if result.kept_up]
+    print(f"Highest rate sustained: {max(kept_up):.0f} messages/sec" if kept_up else "Fell behind at every rate")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'profile': asdict(profile), 'steps': [asdict(result) for result in results]}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Gateway payload builders
+Produce the raw JSON dicts Discord sends, so the real discord.py parsers build
+the Guild, Member, Message and Interaction objects the cogs receive
+"""
+import itertools
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+DISCORD_EPOCH_MS = 1420070400000
+_increment = itertools.count()
+
+# Permission bits used by the builders
+ADMINISTRATOR = 1 << 3
+MANAGE_GUILD = 1 << 5
+MANAGE_MESSAGES = 1 << 13
+DEFAULT_PERMISSIONS = (
+    (1 << 6) | (1 << 10) | (1 << 11) | (1 << 14) | (1 << 15) | (1 << 16) | (1 << 18) | (1 << 31)
+)
+
+
+def snowflake() -> int:
+    """A new, increasing snowflake ID"""
+    timestamp_ms = int(time.time() * 1000) - DISCORD_EPOCH_MS
+    return (timestamp_ms << 22) | (next(_increment) % 4096)
+
+
+def iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def user(user_id: Optional[int] = None, name: Optional[str] = None, bot: bool = False) -> Dict[str, Any]:
+    user_id = user_id or snowflake()
+    return {
+        'id': str(user_id),
+        'username': name or f'user{user_id % 100000}',
+        'discriminator': '0',
+        'global_name': None,
+        'avatar': None,
+        'bot': bot,
+    }
+
+
+def member(user_data: Dict[str, Any], roles: Optional[List[int]] = None,
+           joined_at: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        'user': user_data,
+        'roles': [str(role_id) for role_id in roles or []],
+        'joined_at': joined_at or iso_now(),
+        'nick': None,
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def role(role_id: int, name: str, permissions: int = 0, position: int = 0) -> Dict[str, Any]:
+    return {
+        'id': str(role_id),
+        'name': name,
+        'permissions': str(permissions),
+        'position': position,
+        'color': 0,
+        'hoist': False,
+        'managed': False,
+        'mentionable': False,
+        'flags': 0,
+    }
+
+
+def text_channel(channel_id: int, guild_id: int, name: str, position: int = 0) -> Dict[str, Any]:
+    return {
+        'id': str(channel_id),
+        'guild_id': str(guild_id),
+        'type': 0,
+        'name': name,
+        'position': position,
+        'permission_overwrites': [],
+        'nsfw': False,
+        'parent_id': None,
+        'rate_limit_per_user': 0,
+        'topic': None,
+    }
+
+
+def guild(guild_id: Optional[int] = None, name: str = 'Test Guild', owner_id: Optional[int] = None,
+          channels: Optional[List[Dict[str, Any]]] = None, roles: Optional[List[Dict[str, Any]]] = None,
+          members: Optional[List[Dict[str, Any]]] = None, member_count: Optional[int] = None) -> Dict[str, Any]:
+    """GUILD_CREATE payload; the @everyone role (same ID as the guild) is added automatically"""
+    guild_id = guild_id or snowflake()
+    members = members or []
+    return {
+        'id': str(guild_id),
+        'name': name,
+        'owner_id': str(owner_id or snowflake()),
+        'icon': None,
+        'features': [],
+        'verification_level': 0,
+        'default_message_notifications': 0,
+        'explicit_content_filter': 0,
+        'mfa_level': 0,
+        'premium_tier': 0,
+        'preferred_locale': 'en-US',
+        'nsfw_level': 0,
+        'roles': [role(guild_id, '@everyone', DEFAULT_PERMISSIONS)] + (roles or []),
+        'emojis': [],
+        'stickers': [],
+        'channels': channels or [],
+        'threads': [],
+        'members': members,
+        'voice_states': [],
+        'presences': [],
+        'member_count': member_count or len(members),
+        'large': False,
+        'unavailable': False,
+    }
+
+
+def message(channel_id: int, guild_id: Optional[int], author: Dict[str, Any], content: str,
+            author_member: Optional[Dict[str, Any]] = None, mentions: Optional[List[Dict[str, Any]]] = None,
+            attachments: Optional[List[Dict[str, Any]]] = None, message_id: Optional[int] = None,
+            mention_everyone: bool = False) -> Dict[str, Any]:
+    """MESSAGE_CREATE payload (`author_member` is the member object without `user`)"""
+    data = {
+        'id': str(message_id or snowflake()),
+        'channel_id': str(channel_id),
+        'type': 0,
+        'content': content,
+        'author': author,
+        'attachments': attachments or [],
+        'embeds': [],
+        'mentions': mentions or [],
+        'mention_roles': [],
+        'mention_everyone': mention_everyone,
+        'pinned': False,
+        'tts': False,
+        'timestamp': iso_now(),
+        'edited_timestamp': None,
+        'flags': 0,
+        'components': [],
+    }
+    if guild_id:
+        data['guild_id'] = str(guild_id)
+        if author_member:
+            data['member'] = {key: value for key, value in author_member.items() if key != 'user'}
+    return data
+
+
+def attachment(filename: str, size: int = 1024, url: Optional[str] = None) -> Dict[str, Any]:
+    attachment_id = snowflake()
+    return {
+        'id': str(attachment_id),
+        'filename': filename,
+        'size': size,
+        'url': url or f'https://cdn.discordapp.com/attachments/0/{attachment_id}/{filename}',
+        'proxy_url': url or f'https://media.discordapp.net/attachments/0/{attachment_id}/{filename}',
+    }
+
+
+def member_add(guild_id: int, member_data: Dict[str, Any]) -> Dict[str, Any]:
+    """GUILD_MEMBER_ADD payload"""
+    return dict(member_data, guild_id=str(guild_id))
+
+
+def member_remove(guild_id: int, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """GUILD_MEMBER_REMOVE payload"""
+    return {'guild_id': str(guild_id), 'user': user_data}
+
+
+def reaction_add(guild_id: int, channel_id: int, message_id: int, member_data: Dict[str, Any],
+                 emoji: str = '🎉') -> Dict[str, Any]:
+    """MESSAGE_REACTION_ADD payload"""
+    return {
+        'user_id': member_data['user']['id'],
+        'channel_id': str(channel_id),
+        'message_id': str(message_id),
+        'guild_id': str(guild_id),
+        'member': member_data,
+        'emoji': {'id': None, 'name': emoji},
+        'burst': False,
+        'type': 0,
+    }
+
+
+def slash_command(application_id: int, guild_id: int, channel_id: int, member_data: Dict[str, Any],
+                  name: str, options: Optional[List[Dict[str, Any]]] = None,
+                  resolved: Optional[Dict[str, Any]] = None, permissions: int = DEFAULT_PERMISSIONS) -> Dict[str, Any]:
+    """INTERACTION_CREATE payload for a chat input command"""
+    interaction_id = snowflake()
+    data = {'id': str(snowflake()), 'name': name, 'type': 1, 'options': options or []}
+    if resolved:
+        data['resolved'] = resolved
+    return {
+        'id': str(interaction_id),
+        'application_id': str(application_id),
+        'type': 2,
+        'token': f'token-{interaction_id}',
+        'version': 1,
+        'guild_id': str(guild_id),
+        'channel_id': str(channel_id),
+        'channel': {'id': str(channel_id), 'type': 0, 'guild_id': str(guild_id), 'name': 'general'},
+        'member': dict(member_data, permissions=str(permissions)),
+        'app_permissions': str(DEFAULT_PERMISSIONS | MANAGE_MESSAGES),
+        'locale': 'en-US',
+        'guild_locale': 'en-US',
+        'entitlements': [],
+        'authorizing_integration_owners': {},
+        'data': data,
+    }
@@ -0,0 +1,347 @@
+"""
+Offline gateway replay
+Feeds recorded or synthetic gateway events through the real cogs, message
+pipeline and DatabaseManager (on a temp SQLite file), with Discord's REST
+API replaced by an in-process fake that records every outbound call
+"""
+import os
+
+os.environ.setdefault('LOG_FILE', '')  # Replays shouldn't write bot.log
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import aiohttp
+import discord
+
+import config
+from bot import DiscordBot
+from database.db_manager import DatabaseManager
+from harness import payloads
+from harness.fake_http import FakeDiscordAPI, FakeHTTPClient, install_webhook_adapter
+from harness.fake_virustotal import FakeVirusTotalSession
+from utils.loop_monitor import percentile
+from utils.profiling import install_command_timing
+
+
+def load_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Read a JSONL stream of {"t": event type, "d": payload} (the gateway dispatch shape)"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_events(path: str, events: Iterable[Dict[str, Any]]):
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+class GuildFixture:
+    """IDs and payloads of a synthetic guild, for building events against it"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.id = int(data['id'])
+        self.channel_ids = [int(channel['id']) for channel in data['channels']]
+        self.members = data['members']
+
+
+class ReplayHarness:
+    """
+    Runs a DiscordBot without a gateway connection
+    Events are fed to discord.py's own parsers, so cogs receive real Message,
+    Member and Interaction objects; dispatch() waits for every listener and
+    app command the event triggered before returning
+    """
+
+    def __init__(self, cogs: Optional[List[str]] = None, latency: float = 0.0,
+                 db_path: Optional[str] = None, drain_timeout: float = 10.0):
+        self.cogs = cogs  # None loads the bot's normal cog list
+        self.db_path = db_path
+        self.drain_timeout = drain_timeout
+        self.bot_user = payloads.user(payloads.snowflake(), 'ReplayBot', bot=True)
+        self.application_id = int(self.bot_user['id'])
+        self.api = FakeDiscordAPI(self.bot_user, latency)
+        self.bot: Optional[DiscordBot] = None
+        self.guilds: Dict[int, GuildFixture] = {}
+        self.stragglers = 0  # Tasks still running when a drain timed out
+        self._pending = set()
+        self._tmpdir = None
+        self._webhook_token = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        # Never reach VirusTotal from a replay
+        config.VIRUSTOTAL_API_KEY = None
+
+        self.bot = bot = DiscordBot()
+        await bot._async_setup_hook()
+
+        http = FakeHTTPClient(bot.loop, self.api)
+        state = bot._connection
+        bot.http = state.http = http
+        state.user = discord.ClientUser(state=state, data=self.bot_user)
+        state.application_id = self.application_id
+        state._chunk_guilds = False
+        self._webhook_token = install_webhook_adapter(self.api)
+
+        if self.db_path is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='replay-')
+            self.db_path = os.path.join(self._tmpdir, 'replay.db')
+        bot.db = DatabaseManager(
+            self.db_path,
+            group_commit=config.DB_GROUP_COMMIT,
+            commit_interval_ms=config.DB_COMMIT_INTERVAL_MS,
+            commit_max_statements=config.DB_COMMIT_MAX_STATEMENTS,
+            wal_mode=config.DB_WAL_MODE,
+            read_pool_size=config.DB_READ_POOL_SIZE
+        )
+        await bot.db.initialize()
+        bot.outbound.start()
+        if bot.log_webhooks:
+            bot.log_webhooks.start()
+        bot.log_buffer.start()
+
+        install_command_timing(bot)
+        await bot.load_cogs(self.cogs)
+
+        # Track listener tasks so dispatch() can wait for them
+        schedule_event = bot._schedule_event
+
+        def track(coro, event_name, *args, **kwargs):
+            task = schedule_event(coro, event_name, *args, **kwargs)
+            self._pending.add(task)
+            return task
+
+        bot._schedule_event = track
+        bot._ready.set()
+
+    async def close(self):
+        if self.bot:
+            await self.drain()
+            await self.bot.close()
+            self.bot = None
+        if self._webhook_token:
+            try:
+                self._webhook_token.var.reset(self._webhook_token)
+            except ValueError:
+                pass  # Closed from a different context
+            self._webhook_token = None
+        if self._tmpdir:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    async def stub_virustotal(self, latency: float = 0.0, malicious_ratio: float = 0.0,
+                              seed: Optional[int] = None) -> FakeVirusTotalSession:
+        """Turn VirusTotal scanning on, answered by a fake session in every antivirus cog"""
+        session = FakeVirusTotalSession(latency, malicious_ratio, seed)
+        config.VIRUSTOTAL_API_KEY = 'replay-key'
+        for cog in self.bot.cogs.values():
+            if isinstance(getattr(cog, 'session', None), aiohttp.ClientSession):
+                await cog.session.close()
+                cog.session = session
+        return session
+
+    def pending(self) -> int:
+        """Listener tasks still running (finished ones are forgotten)"""
+        self._pending = {task for task in self._pending if not task.done()}
+        return len(self._pending)
+
+    def add_guild(self, name: str = 'Replay Guild', members: int = 10, channels: int = 3,
+                  guild_id: Optional[int] = None) -> GuildFixture:
+        """Create a guild in the cache without dispatching guild_join"""
+        data = self.guild_payload(name, members, channels, guild_id)
+        self.bot._connection._add_guild_from_data(data)
+        fixture = self.guilds[int(data['id'])] = GuildFixture(data)
+        return fixture
+
+    def add_bot_member(self, fixture: GuildFixture, permissions: int = payloads.ADMINISTRATOR) -> discord.Member:
+        """Put the bot in a cached guild with a role granting `permissions`"""
+        state = self.bot._connection
+        guild = self.bot.get_guild(fixture.id)
+        role = discord.Role(guild=guild, state=state, data=payloads.role(payloads.snowflake(), 'Bot', permissions, 1))
+        guild._add_role(role)
+        member = discord.Member(data=payloads.member(self.bot_user, roles=[role.id]), guild=guild, state=state)
+        guild._add_member(member)
+        return member
+
+    @staticmethod
+    def guild_payload(name: str = 'Replay Guild', members: int = 10, channels: int = 3,
+                      guild_id: Optional[int] = None) -> Dict[str, Any]:
+        guild_id = guild_id or payloads.snowflake()
+        member_list = [payloads.member(payloads.user()) for _ in range(members)]
+        owner_id = int(member_list[0]['user']['id']) if member_list else None
+        channel_list = [
+            payloads.text_channel(payloads.snowflake(), guild_id, 'general' if i == 0 else f'channel-{i}', i)
+            for i in range(channels)
+        ]
+        return payloads.guild(guild_id, name, owner_id, channel_list, members=member_list)
+
+    async def drain(self):
+        """Wait for listener and app command tasks started by dispatched events, queued notices and log embeds"""
+        deadline = time.perf_counter() + self.drain_timeout
+        while True:
+            pending = {task for task in self._pending if not task.done()}
+            pending.update(
+                task for task in asyncio.all_tasks()
+                if task.get_name() == 'CommandTree-invoker' and not task.done()
+            )
+            self._pending.clear()
+            if not pending:
+                await self.bot.outbound.wait_idle(max(0.0, deadline - time.perf_counter()))
+                await self.bot.log_buffer.flush()
+                return
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.stragglers += len(pending)
+                return
+            _, still_running = await asyncio.wait(pending, timeout=remaining)
+            self._pending.update(still_running)
+
+    def feed(self, event_type: str, data: Dict[str, Any]):
+        """Hand one event to discord.py's parser without waiting for listeners"""
+        if event_type == 'INTERACTION_CREATE':
+            self.api.interaction_channels[data['token']] = int(data['channel_id'])
+        elif event_type == 'GUILD_CREATE':
+            self.guilds[int(data['id'])] = GuildFixture(data)
+        self.bot.dispatch('socket_event_type', event_type)
+        self.bot._connection.parsers[event_type](data)
+
+    async def dispatch(self, event_type: str, data: Dict[str, Any]):
+        """Process one event and wait for everything it triggered"""
+        self.feed(event_type, data)
+        await self.drain()
+
+    async def replay(self, events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Dispatch events one after another; returns per-event-type latency stats"""
+        latencies = defaultdict(list)
+        calls_before = len(self.api.calls)
+        started = time.perf_counter()
+        for event in events:
+            start = time.perf_counter()
+            await self.dispatch(event['t'], event['d'])
+            latencies[event['t']].append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+        return summarize(latencies, elapsed, len(self.api.calls) - calls_before, self.stragglers)
+
+    def synthetic_events(self, count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A mixed stream of messages, joins, reactions and slash commands across the fixture guilds"""
+        rng = random.Random(seed)
+        fixtures = list(self.guilds.values())
+        words = ['hello', 'gg', 'anyone here', 'nice', 'lol', 'what time is it', 'brb', 'check this out']
+        events = []
+        sent = []  # (guild, channel, message ID) for reactions
+        for _ in range(count):
+            fixture = rng.choice(fixtures)
+            channel_id = rng.choice(fixture.channel_ids)
+            roll = rng.random()
+            if roll < 0.80 or not sent:
+                author = rng.choice(fixture.members)
+                content = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+                if rng.random() < 0.03:
+                    content = f"{config.PREFIX}{rng.choice(['serverinfo', 'userinfo'])}"
+                elif rng.random() < 0.1:
+                    content += f' https://example{rng.randint(1, 50)}.com/page'
+                data = payloads.message(channel_id, fixture.id, author['user'], content, author)
+                sent.append((fixture, channel_id, int(data['id'])))
+                events.append({'t': 'MESSAGE_CREATE', 'd': data})
+            elif roll < 0.88:
+                member = payloads.member(payloads.user())
+                fixture.members.append(member)
+                events.append({'t': 'GUILD_MEMBER_ADD', 'd': payloads.member_add(fixture.id, member)})
+            elif roll < 0.95:
+                guild, reacted_channel, message_id = rng.choice(sent)
+                events.append({'t': 'MESSAGE_REACTION_ADD', 'd': payloads.reaction_add(
+                    guild.id, reacted_channel, message_id, rng.choice(guild.members)
+                )})
+            else:
+                events.append({'t': 'INTERACTION_CREATE', 'd': payloads.slash_command(
+                    self.application_id, fixture.id, channel_id, rng.choice(fixture.members),
+                    rng.choice(['balance', 'level', 'daily', 'serverinfo'])
+                )})
+        return events
+
+
+def summarize(latencies: Dict[str, List[float]], elapsed: float, outbound_calls: int,
+              stragglers: int = 0) -> Dict[str, Any]:
+    """Latency percentiles (ms) per event type plus overall throughput"""
+    report = {'events': {}, 'total_events': 0}
+    for event_type, values in sorted(latencies.items()):
+        values = sorted(values)
+        report['events'][event_type] = {
+            'count': len(values),
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': values[-1] * 1000,
+        }
+        report['total_events'] += len(values)
+    report['elapsed_seconds'] = elapsed
+    report['events_per_second'] = report['total_events'] / elapsed if elapsed else 0.0
+    report['outbound_calls'] = outbound_calls
+    report['stragglers'] = stragglers
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'event':<24}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for event_type, stats in report['events'].items():
+        lines.append(
+            f"{event_type:<24}{stats['count']:>8}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+    lines.append(
+        f"{report['total_events']} events in {report['elapsed_seconds']:.2f}s "
+        f"({report['events_per_second']:.0f}/s), {report['outbound_calls']} outbound calls, "
+        f"{report['stragglers']} stragglers"
+    )
+    return '\n'.join(lines)
+
+
+async def main(args):
+    async with ReplayHarness(cogs=args.cogs, latency=args.latency / 1000) as harness:
+        for i in range(args.guilds):
+            harness.add_guild(f'Replay Guild {i + 1}', members=args.members, channels=args.channels)
+
+        if args.input:
+            events = list(load_events(args.input))
+        else:
+            events = harness.synthetic_events(args.events, seed=args.seed)
+        if args.save:
+            save_events(args.save, events)
+
+        report = await harness.replay(events)
+        print(format_report(report))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay gateway events through the bot offline')
+    parser.add_argument('--input', help='JSONL event stream to replay (default: synthetic)')
+    parser.add_argument('--save', help='Write the replayed stream to this JSONL file')
+    parser.add_argument('--json', help='Write the report to this JSON file')
+    parser.add_argument('--events', type=int, default=1000, help='Synthetic events to generate')
+    parser.add_argument('--guilds', type=int, default=3)
+    parser.add_argument('--members', type=int, default=50, help='Members per guild')
+    parser.add_argument('--channels', type=int, default=3, help='Text channels per guild')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated Discord API latency (ms)')
+    parser.add_argument('--cogs', nargs='*', default=None, help='Cogs to load (default: the bot\'s list)')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+Text normalization and content analysis throughput benchmark
+Times normalize_text, compact_text and the single-pass ContentAnalysis over
+generated chat messages: plain ASCII, ordinary non-English text and
+deliberately obfuscated spam
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from utils.content_analysis import ContentAnalysis
+from utils.normalize import CONFUSABLES, compact_text, normalize_text
+
+WORDS = ['hello', 'anyone', 'playing', 'tonight', 'server', 'thanks', 'nice', 'free', 'nitro',
+         'discord', 'gift', 'link', 'check', 'this', 'out', 'lol', 'what', 'time', 'is', 'it']
+UNICODE_WORDS = ['café', 'naïve', 'größe', 'привет', 'спасибо', 'こんにちは', 'ありがとう', '😀', '🎉', 'señor']
+OBFUSCATORS = [
+    lambda word: ''.join(chr(0xFF00 + ord(char) - 0x20) if '!' <= char <= '~' else char for char in word),
+    lambda word: '​'.join(word),
+    lambda word: ' '.join(word),
+    lambda word: ''.join(_LOOKALIKES.get(char, char) for char in word),
+    lambda word: ''.join(char + '̶' for char in word),
+]
+_LOOKALIKES = {latin: char for char, latin in CONFUSABLES.items()}
+
+
+def make_corpus(kind: str, count: int, words_per_message: int = 12, seed: int = 0) -> List[str]:
+    """Generate `count` messages of one kind: 'ascii', 'unicode' or 'obfuscated'"""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(words_per_message)]
+        if kind == 'unicode':
+            words = [rng.choice(UNICODE_WORDS) if rng.random() < 0.5 else word for word in words]
+        elif kind == 'obfuscated':
+            words = [rng.choice(OBFUSCATORS)(word) if rng.random() < 0.5 else word for word in words]
+        messages.append(' '.join(words))
+    return messages
+
+
+def time_function(function: Callable[[str], Any], messages: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Best of `repeat` passes over the corpus"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            function(message)
+        best = min(best, time.perf_counter() - start)
+    chars = sum(len(message) for message in messages)
+    return {
+        'messages_per_sec': len(messages) / best,
+        'mchars_per_sec': chars / best / 1e6,
+        'us_per_message': best / len(messages) * 1e6,
+    }
+
+
+def run_benchmarks(count: int = 20000, seed: int = 0) -> Dict[str, Any]:
+    results = {}
+    for kind in ('ascii', 'unicode', 'obfuscated'):
+        messages = make_corpus(kind, count, seed=seed)
+        for name, function in (('normalize_text', normalize_text), ('compact_text', compact_text),
+                               ('analysis', ContentAnalysis)):
+            results[f'{name}/{kind}'] = time_function(function, messages)
+    return {'messages': count, 'results': results}
+
+
+def format_results(report: Dict[str, Any]) -> str:
+    lines = [f"{'case':<28}{'msgs/sec':>12}{'Mchar/s':>10}{'us/msg':>9}"]
+    for case, stats in report['results'].items():
+        lines.append(
+            f"{case:<28}{stats['messages_per_sec']:>12.0f}{stats['mchars_per_sec']:>10.1f}"
+            f"{stats['us_per_message']:>9.2f}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark text normalization and analysis throughput')
+    parser.add_argument('--messages', type=int, default=20000, help='Messages per corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.messages, args.seed)
+    print(format_results(report))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,97 +1,62 @@
 #!/usr/bin/env python3
 """
 Database migration script
-Adds missing tables for web dashboard integration
+Brings an existing database up to the latest schema version
 """
-import sqlite3
+import asyncio
 import os
-from datetime import datetime
 
-def migrate_database():
-    """Add missing tables to existing database"""
+import config
+from database.db_manager import DatabaseManager
+from database.migrations import MIGRATIONS
+
+async def migrate_database():
+    """Apply all pending schema migrations to the existing database"""
     
     # Database path
-    db_path = './data/bot.db'
+    db_path = config.DATABASE_PATH
     
     if not os.path.exists(db_path):
-        print("❌ Database not found at ./data/bot.db")
+        print(f"❌ Database not found at {db_path}")
         print("The database will be created when you start the bot.")
         return
     
     print("🔄 Migrating database...")
     
-    # Connect to database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    db = DatabaseManager(db_path)
     
     try:
-        # Check if tables already exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='custom_media'")
-        custom_media_exists = cursor.fetchone() is not None
-        
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='play_queue'")
-        play_queue_exists = cursor.fetchone() is not None
-        
-        # Create custom_media table if it doesn't exist
-        if not custom_media_exists:
-            print("📁 Creating custom_media table...")
-            cursor.execute("""
-                CREATE TABLE custom_media (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    filename TEXT,
-                    filepath TEXT,
-                    url TEXT,
-                    guild_id TEXT,
-                    uploaded_by TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("✅ custom_media table created")
-        else:
-            print("✅ custom_media table already exists")
-        
-        # Create play_queue table if it doesn't exist
-        if not play_queue_exists:
-            print("🎵 Creating play_queue table...")
-            cursor.execute("""
-                CREATE TABLE play_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id TEXT NOT NULL,
-                    media_id INTEGER,
-                    media_name TEXT NOT NULL,
-                    media_path TEXT,
-                    media_url TEXT,
-                    requested_by TEXT,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("✅ play_queue table created")
-        else:
-            print("✅ play_queue table already exists")
-        
-        # Commit changes
-        conn.commit()
+        # initialize() creates missing tables and runs pending migrations
+        await db.initialize()
+        version = await db.get_schema_version()
+        print(f"✅ Schema is at version {version} (latest: {MIGRATIONS[-1][0]})")
+        
+        # Show applied migrations
+        async with db.connection.execute(
+            "SELECT version, description, applied_at FROM schema_version ORDER BY version"
+        ) as cursor:
+            for row in await cursor.fetchall():
+                print(f"  - v{row[0]}: {row[1]} ({row[2]})")
         
         # Show table info
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
+        async with db.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+        ) as cursor:
+            tables = await cursor.fetchall()
         
         print(f"\n📊 Database now has {len(tables)} tables:")
         for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table[0]}")
-            count = cursor.fetchone()[0]
+            async with db.connection.execute(f"SELECT COUNT(*) FROM {table[0]}") as cursor:
+                count = (await cursor.fetchone())[0]
             print(f"  - {table[0]}: {count} records")
         
         print("\n🎉 Database migration completed successfully!")
         
     except Exception as e:
         print(f"❌ Migration failed: {e}")
-        conn.rollback()
     
     finally:
-        conn.close()
+        await db.close()
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    asyncio.run(migrate_database())
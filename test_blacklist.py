@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled blacklist matcher
+This script verifies substring, whole-word and wildcard matching, and that
+automod only reloads a guild's blacklist after it changes
+"""
+
+import asyncio
+import time
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.blacklist import BlacklistMatcher
+
+
+def test_substring_mode():
+    """Test that plain entries match anywhere, like the old `word in content` check"""
+    print("🧪 Testing substring matching...")
+
+    matcher = BlacklistMatcher(['bad', 'badword', 'Ass'])
+    assert matcher.find("this is a BADWORD") == 'badword'
+    assert matcher.find("first class") == 'ass'
+    assert matcher.find("all good here") is None
+    assert BlacklistMatcher([]).find("anything") is None
+    print("✅ Substring entries match, longest first")
+
+
+def test_whole_word_mode():
+    """Test that whole-word mode ignores entries embedded in longer words"""
+    print("🧪 Testing whole-word matching...")
+
+    matcher = BlacklistMatcher(['ass', 'bad', 'no-no'], whole_words=True)
+    assert matcher.find("first class") is None
+    assert matcher.find("badly done") is None
+    assert matcher.find("that's bad.") == 'bad'
+    assert matcher.find("a no-no!") == 'no-no'
+    print("✅ Whole words only")
+
+
+def test_wildcards():
+    """Test that '*' entries match whole words and report the entry"""
+    print("🧪 Testing wildcards...")
+
+    matcher = BlacklistMatcher(['spam*', '*scam', 'f*ck'])
+    assert matcher.find("SPAMMING everyone") == 'spam*'
+    assert matcher.find("a crypto-giftscam") == '*scam'
+    assert matcher.find("fuuuck") == 'f*ck'
+    assert matcher.find("antispam bot") is None
+    print("✅ Wildcards match within words")
+
+
+def test_many_words():
+    """Test that thousands of entries compile and scan quickly"""
+    print("🧪 Testing a large blacklist...")
+
+    words = [f"banned{i}term" for i in range(5000)]
+    start = time.perf_counter()
+    matcher = BlacklistMatcher(words)
+    build_ms = (time.perf_counter() - start) * 1000
+    message = "a perfectly ordinary message about nothing in particular " * 10
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        assert matcher.find(message) is None
+    scan_us = (time.perf_counter() - start) * 1000
+    assert matcher.find(message + " banned4321term") == 'banned4321term'
+    print(f"✅ 5000 words built in {build_ms:.1f} ms, {scan_us:.1f} us per 600-char message")
+
+
+async def _test_automod_cache():
+    """Test that automod loads the blacklist once and reloads it after a change"""
+    print("🧪 Testing automod blacklist cache...")
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        guild = harness.add_guild(members=3)
+        author = guild.members[1]
+        db = harness.bot.db
+        await db.add_blacklist_word(guild.id, 'forbidden')
+
+        loads = []
+        get_blacklist = db.get_blacklist
+
+        async def counting_get_blacklist(guild_id):
+            loads.append(guild_id)
+            return await get_blacklist(guild_id)
+        db.get_blacklist = counting_get_blacklist
+
+        async def send(content):
+            await harness.dispatch('MESSAGE_CREATE', payloads.message(
+                guild.channel_ids[0], guild.id, author['user'], content, author
+            ))
+
+        deletes = lambda: harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        await send("hello")
+        await send("this is forbidden")
+        assert len(loads) == 1 and len(deletes()) == 1
+
+        await db.add_blacklist_word(guild.id, 'newword')
+        await send("a newword appears")
+        assert len(loads) == 2 and len(deletes()) == 2
+        print("✅ One load per blacklist change")
+
+
+def test_automod_cache():
+    asyncio.run(_test_automod_cache())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Blacklist Tests...\n")
+    test_substring_mode()
+    test_whole_word_mode()
+    test_wildcards()
+    test_many_words()
+    test_automod_cache()
+    print("\n✅ All blacklist tests passed!")
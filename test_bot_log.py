@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for bot log broadcasts
+This script verifies broadcasts reach every configured bot log channel from a
+single settings query, and that reconnects don't repeat the startup message
+"""
+
+import asyncio
+
+from harness.runner import ReplayHarness
+
+
+async def _configure(harness, guild_count, configured):
+    guilds = [harness.add_guild(members=2) for _ in range(guild_count)]
+    for guild in guilds[:configured]:
+        settings = await harness.bot.db.get_guild_settings(guild.id)
+        settings.bot_log_channel = guild.channel_ids[0]
+        await harness.bot.db.update_guild_settings(settings)
+    return guilds
+
+
+async def _test_broadcast():
+    """Test that a broadcast sends once to each configured channel"""
+    print("🧪 Testing bot log broadcast...")
+
+    async with ReplayHarness(cogs=[]) as harness:
+        guilds = await _configure(harness, 6, 4)
+        channels = await harness.bot.db.get_bot_log_channels()
+        assert channels == {guild.id: guild.channel_ids[0] for guild in guilds[:4]}, channels
+
+        await harness.bot.send_bot_log_to_all_guilds("Test", "Broadcast", 0x00ff00, [("Field", "Value", True)])
+        sends = harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        assert len(sends) == 4, sends
+        assert all(send.payload['embeds'][0]['title'] == "Test" for send in sends)
+        print("✅ 4 of 6 guilds configured, 4 messages sent")
+
+
+async def _test_reconnect_dedup():
+    """Test that on_ready after a reconnect doesn't announce the start again"""
+    print("🧪 Testing startup announcement across reconnects...")
+
+    async with ReplayHarness(cogs=[]) as harness:
+        broadcasts = []
+
+        async def change_presence(**kwargs):
+            pass
+
+        async def send_bot_log_to_all_guilds(title, description, color, fields=None):
+            broadcasts.append(title)
+        harness.bot.change_presence = change_presence
+        harness.bot.send_bot_log_to_all_guilds = send_bot_log_to_all_guilds
+        # No shard has heartbeated in a replay, so give the bot a latency to report
+        harness.bot.__class__ = type('ConnectedBot', (type(harness.bot),), {'latency': 0.05})
+
+        await harness.bot.on_ready()
+        await harness.bot.on_ready()
+        assert len(broadcasts) == 1, broadcasts
+        assert harness.bot.startup_announced
+        print("✅ Second on_ready sent nothing")
+
+
+def test_broadcast():
+    asyncio.run(_test_broadcast())
+
+
+def test_reconnect_dedup():
+    asyncio.run(_test_reconnect_dedup())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Bot Log Tests...\n")
+    test_broadcast()
+    test_reconnect_dedup()
+    print("\n✅ All bot log tests passed!")
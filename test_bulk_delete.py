@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk message removal
+This script verifies spam is removed with one bulk delete per channel, that
+old messages fall back to single deletes, and that automod catches a flood
+spread across channels
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.bulk_delete import MessageRef, delete_message_refs, group_by_channel
+
+
+def _old_snowflake(days):
+    created = datetime.now(timezone.utc) - timedelta(days=days)
+    return discord.utils.time_snowflake(created) + 1
+
+
+def test_group_by_channel():
+    """Test that refs are grouped per channel without duplicates"""
+    print("🧪 Testing grouping...")
+
+    refs = [MessageRef(1, 10, 0), MessageRef(2, 20, 0), MessageRef(3, 10, 0), MessageRef(1, 10, 0)]
+    assert group_by_channel(refs) == {10: [1, 3], 20: [2]}
+    print("✅ 4 refs -> 2 channels")
+
+
+async def _test_chunks_and_old_messages():
+    """Test 100-message chunks and the single-delete fallback for old messages"""
+    print("🧪 Testing chunking and old messages...")
+
+    async with ReplayHarness(cogs=[]) as harness:
+        fixture = harness.add_guild(members=1)
+        guild = harness.bot.get_guild(fixture.id)
+        channel_id = fixture.channel_ids[0]
+
+        refs = [MessageRef(payloads.snowflake(), channel_id, 0) for _ in range(150)]
+        refs += [MessageRef(_old_snowflake(20 + i), channel_id, 0) for i in range(2)]
+        deleted = await delete_message_refs(guild, refs, reason="test")
+
+        bulk = harness.api.calls_to('POST', '/channels/{channel_id}/messages/bulk-delete')
+        single = harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        assert [len(call.payload['messages']) for call in bulk] == [100, 50], bulk
+        assert len(single) == 2, single
+        assert deleted == 152
+        print("✅ 150 recent -> 2 bulk deletes, 2 old -> single deletes")
+
+
+async def _test_cross_channel_flood():
+    """Test that automod trips on a flood spread across channels and bulk deletes each channel"""
+    print("🧪 Testing cross-channel spam...")
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        guild = harness.add_guild(members=3, channels=3)
+        author = guild.members[1]
+        for i in range(5):
+            channel_id = guild.channel_ids[i % 3]
+            await harness.dispatch('MESSAGE_CREATE', payloads.message(
+                channel_id, guild.id, author['user'], f'spam {i}', author
+            ))
+
+        bulk = harness.api.calls_to('POST', '/channels/{channel_id}/messages/bulk-delete')
+        assert sorted(call.channel_id for call in bulk) == sorted(guild.channel_ids[:2]), bulk
+        assert not harness.api.calls_to('GET', '/channels/{channel_id}/messages/{message_id}')
+        single = harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        assert [call.channel_id for call in single] == [guild.channel_ids[2]], single
+        assert harness.api.calls_to('PATCH', '/guilds/{guild_id}/members/{user_id}')
+        print(f"✅ Flood over 3 channels removed with {len(bulk)} bulk + {len(single)} single deletes")
+
+
+def test_chunks_and_old_messages():
+    asyncio.run(_test_chunks_and_old_messages())
+
+
+def test_cross_channel_flood():
+    asyncio.run(_test_cross_channel_flood())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Bulk Delete Tests...\n")
+    test_group_by_channel()
+    test_chunks_and_old_messages()
+    test_cross_channel_flood()
+    print("\n✅ All bulk delete tests passed!")
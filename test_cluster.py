@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the cluster supervisor
+This script verifies shards are split evenly over the workers, that several
+workers always share the database in WAL mode, that the supervisor
+migrates the database before any worker starts, and that only a sharded
+configuration runs the auto-sharded bot
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import discord
+from discord.ext import commands
+
+import config
+from bot import DiscordBot, ShardedDiscordBot, create_bot
+from cluster import ClusterSupervisor, split_shards
+from database.db_manager import BUSY_TIMEOUT_MS, DatabaseManager
+from database.migrations import MIGRATIONS
+
+
+def test_split_shards():
+    """Test that shard ranges are contiguous and differ in size by at most one"""
+    print("🧪 Testing shard split...")
+
+    assert split_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_shards(2, 4) == [[0], [1]]
+    assert split_shards(5, 1) == [[0, 1, 2, 3, 4]]
+    print("✅ 10 shards over 3 workers: 4/3/3")
+
+
+def test_workers_use_wal():
+    """Test that WAL mode is forced on once there is more than one worker"""
+    print("🧪 Testing worker WAL mode...")
+
+    wal_mode = config.DB_WAL_MODE
+    try:
+        config.DB_WAL_MODE = False
+        single = ClusterSupervisor(shard_count=4, workers=1)
+        assert not single.wal_mode and not single.workers[0].wal_mode
+
+        cluster = ClusterSupervisor(shard_count=4, workers=2)
+        assert cluster.wal_mode
+        assert all(worker.environment()['DB_WAL_MODE'] == 'true' for worker in cluster.workers)
+    finally:
+        config.DB_WAL_MODE = wal_mode
+    print("✅ 1 worker keeps the setting, 2 workers run in WAL mode")
+
+
+async def _test_prepare_database():
+    """Test that the supervisor creates and migrates the database in WAL mode"""
+    print("🧪 Testing supervisor migrations...")
+
+    database_path = config.DATABASE_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            config.DATABASE_PATH = os.path.join(tmp, 'cluster.db')
+            await ClusterSupervisor(shard_count=4, workers=2).prepare_database()
+        finally:
+            config.DATABASE_PATH = database_path
+
+        connection = sqlite3.connect(os.path.join(tmp, 'cluster.db'))
+        try:
+            version = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+            journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        finally:
+            connection.close()
+        assert version == MIGRATIONS[-1][0], version
+        assert journal_mode == 'wal', journal_mode
+
+        # Workers wait on each other's write locks, WAL mode or not
+        db = DatabaseManager(os.path.join(tmp, 'worker.db'))
+        await db.initialize()
+        try:
+            async with db.connection.execute("PRAGMA busy_timeout") as cursor:
+                assert (await cursor.fetchone())[0] == BUSY_TIMEOUT_MS
+        finally:
+            await db.close()
+    print(f"✅ Migrated to version {version} in WAL mode before the workers start")
+
+
+async def _test_bot_class():
+    """Test that the bot is auto-sharded only when shards are configured"""
+    print("🧪 Testing bot class...")
+
+    shard_count, shard_ids = config.SHARD_COUNT, config.SHARD_IDS
+    try:
+        config.SHARD_COUNT, config.SHARD_IDS = None, None
+        bot = create_bot()
+        assert type(bot) is DiscordBot and not isinstance(bot, commands.AutoShardedBot)
+        assert bot.owns_guild(123 << 22)
+        assert list(bot.gateway_shards()) == [0]
+        assert list(bot.health()['shards']) == [0]
+
+        config.SHARD_COUNT, config.SHARD_IDS = 4, [2, 3]
+        bot = create_bot()
+        assert isinstance(bot, ShardedDiscordBot) and isinstance(bot, commands.AutoShardedBot)
+        assert bot.shard_count == 4 and bot.shard_ids == [2, 3]
+        assert bot.owns_guild(6 << 22) and not bot.owns_guild(5 << 22)
+        # AutoShardedClient's connection handling wins over Client's
+        mro = type(bot).__mro__
+        assert mro.index(discord.AutoShardedClient) < mro.index(discord.Client)
+    finally:
+        config.SHARD_COUNT, config.SHARD_IDS = shard_count, shard_ids
+    print("✅ One connection by default, shards 2-3 of 4 when configured")
+
+
+def test_prepare_database():
+    asyncio.run(_test_prepare_database())
+
+
+def test_bot_class():
+    asyncio.run(_test_bot_class())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Cluster Tests...\n")
+    test_split_shards()
+    test_workers_use_wal()
+    test_prepare_database()
+    test_bot_class()
+    print("\n✅ All cluster tests passed!")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for single-pass content analysis
+This script verifies the analysis fields, memoization per message, that
+auto-mod and the antivirus read one shared analysis, and that threat scores
+match the per-keyword substring scoring they replaced
+"""
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils import content_analysis
+from utils.content_analysis import ContentAnalysis, ContentAnalyzer
+
+
+def test_analysis_fields():
+    """Test caps, letters, URLs, hostnames, invites and keywords"""
+    print("🧪 Testing analysis fields...")
+
+    analysis = ContentAnalysis("FREE nitro at https://Example.com/Path and discord.gg/AbC12", mentions=2, role_mentions=1)
+    assert analysis.letters == 45 and analysis.uppercase == 8, (analysis.letters, analysis.uppercase)
+    assert analysis.urls == ['https://Example.com/Path']
+    assert analysis.hostnames == ['example.com']
+    assert analysis.invite_codes == ['AbC12']
+    assert analysis.keyword_hits == {'free': 1, 'nitro': 1, 'discord.gg': 1}
+    assert analysis.mention_count == 3
+
+    assert ContentAnalysis("https://discord.gg/xyz").invite_codes == ['xyz']
+    # Only the short invite form counts as the 'discord.gg' keyword
+    for text in ("https://discord.com/invite/xyz", "join discord.com/invite/xyz"):
+        long_form = ContentAnalysis(text)
+        assert long_form.invite_codes == ['xyz'] and long_form.keyword_hits == {}, long_form.keyword_hits
+    assert ContentAnalysis("d i s c o r d . g g / abc").invite_codes == ['abc']
+    # Keywords inside an invite code count like keywords anywhere else
+    assert ContentAnalysis("discord.gg/freenitro").keyword_hits == {'discord.gg': 1, 'free': 1, 'nitro': 1}
+    assert ContentAnalysis("thefreedom").keyword_hits == {'free': 1}
+    assert ContentAnalysis("12345 !!!").caps_ratio == 0.0
+    assert ContentAnalysis("ÉCOLE ÉTÉ").caps_ratio == 1.0
+    print("✅ Every field from one analysis")
+
+
+def test_memoized_per_message():
+    """Test that a message is analyzed once, and again after an edit"""
+    print("🧪 Testing memoization...")
+
+    analyzer = ContentAnalyzer(max_entries=2)
+    message = SimpleNamespace(id=1, content="hello", mentions=[], role_mentions=[], mention_everyone=False)
+    first = analyzer.analyze(message)
+    assert analyzer.analyze(message) is first
+    message.content = "edited"
+    assert analyzer.analyze(message) is not first
+    assert (analyzer.hits, analyzer.misses) == (1, 2)
+
+    for message_id in (2, 3):
+        analyzer.analyze(SimpleNamespace(id=message_id, content="x", mentions=[], role_mentions=[],
+                                         mention_everyone=False))
+    assert len(analyzer) == 2
+    print("✅ Cached per message ID, bounded")
+
+
+async def _test_shared_analysis():
+    """Test that auto-mod and the antivirus stage share one analysis per message"""
+    print("🧪 Testing shared analysis...")
+
+    async with ReplayHarness(cogs=['automod', 'kcl_antivirus_simple']) as harness:
+        guild = harness.add_guild(members=3)
+        author = guild.members[1]
+        misses = content_analysis.analyzer.misses
+        for i in range(3):
+            await harness.dispatch('MESSAGE_CREATE', payloads.message(
+                guild.channel_ids[i], guild.id, author['user'], f"see https://example.com/{i}", author
+            ))
+        assert content_analysis.analyzer.misses - misses == 3
+        print("✅ 3 messages through both stages, 3 analyses")
+
+
+def test_shared_analysis():
+    asyncio.run(_test_shared_analysis())
+
+
+async def _test_threat_score():
+    """Test the advanced antivirus threat score reads the analysis"""
+    print("🧪 Testing threat score...")
+
+    from cogs.kcl_antivirus_advanced import KCLAntivirusAdvanced
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        cog = KCLAntivirusAdvanced(harness.bot)
+        try:
+            old_author = SimpleNamespace(created_at=datetime.utcnow() - timedelta(days=365))
+            calm = SimpleNamespace(id=1, content="see you tomorrow", author=old_author, mentions=[],
+                                   role_mentions=[], mention_everyone=False)
+            scam = SimpleNamespace(id=2, content="FREE NITRO GIFT https://nitro-gift.example/claim",
+                                   author=old_author, mentions=[], role_mentions=[], mention_everyone=False)
+            assert await cog._calculate_threat_score(calm) == 0.0
+            # Three keywords and one link
+            score = await cog._calculate_threat_score(scam)
+            assert round(score, 2) == 0.5, score
+            # Caps are measured on the same (normalized) text they were counted in
+            shout = SimpleNamespace(id=3, content="STOP SPAMMING" + "\u200b" * 20, author=old_author,
+                                    mentions=[], role_mentions=[], mention_everyone=False)
+            assert round(await cog._calculate_threat_score(shout), 2) == 0.2
+        finally:
+            cog.cleanup_tracking.cancel()
+            cog.periodic_security_check.cancel()
+        print(f"✅ Calm message 0.0, scam {score:.1f}")
+
+
+def test_threat_score():
+    asyncio.run(_test_threat_score())
+
+
+# Threat-score corpus: lower case, so the old caps check (always 0) can't differ
+_LEGACY_CORPUS = [
+    "see you tomorrow",
+    "thefreedom hack",
+    "free nitro at https://example.com/generator",
+    "join discord.gg/freenitro now",
+    "discord.gg/hackgen and discordapp.com/invite/giftcheat",
+    "https://discord.gg/nitrogift",
+    "https://discord.com/invite/hack",
+    "discord.com/invite/cheats",
+    "d i s c o r d . g g / freegift",
+    "discord.gg/abc free",
+]
+_LEGACY_URL_PATTERN = re.compile(
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+)
+
+
+def _legacy_threat_score(content):
+    """The keyword and URL part of the threat score before the shared analysis"""
+    score = 0.0
+    for word in ['free', 'nitro', 'gift', 'hack', 'cheat', 'generator', 'discord.gg']:
+        if word in content.lower():
+            score += 0.1
+    score += len(_LEGACY_URL_PATTERN.findall(content)) * 0.2
+    return min(score, 1.0)
+
+
+async def _test_scores_match_legacy():
+    """Test the threat score against the old substring scoring, invite codes included"""
+    print("🧪 Testing threat scores against the old scoring...")
+
+    from cogs.kcl_antivirus_advanced import KCLAntivirusAdvanced
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        cog = KCLAntivirusAdvanced(harness.bot)
+        try:
+            old_author = SimpleNamespace(created_at=datetime.utcnow() - timedelta(days=365))
+            for message_id, content in enumerate(_LEGACY_CORPUS, start=100):
+                message = SimpleNamespace(id=message_id, content=content, author=old_author, mentions=[],
+                                          role_mentions=[], mention_everyone=False)
+                score = await cog._calculate_threat_score(message)
+                assert round(score, 2) == round(_legacy_threat_score(content), 2), (content, score)
+        finally:
+            cog.cleanup_tracking.cancel()
+            cog.periodic_security_check.cancel()
+        print(f"✅ {len(_LEGACY_CORPUS)} messages score the same as before")
+
+
+def test_scores_match_legacy():
+    asyncio.run(_test_scores_match_legacy())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Content Analysis Tests...\n")
+    test_analysis_fields()
+    test_memoized_per_message()
+    test_shared_analysis()
+    test_threat_score()
+    test_scores_match_legacy()
+    print("\n✅ All content analysis tests passed!")
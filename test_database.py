@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Test script for DatabaseManager performance features
+This script verifies group commit and the other database fast paths
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from database.db_manager import DatabaseManager
+from database.migrations import MIGRATIONS
+
+
+def _temp_db_path():
+    """Create a throwaway database path"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+async def _test_group_commit():
+    """Test that group commit batches writes and flushes on close"""
+    print("🧪 Testing group commit mode...")
+
+    db_path = _temp_db_path()
+    db = DatabaseManager(db_path, group_commit=True, commit_interval_ms=60000, commit_max_statements=3)
+    await db.initialize()
+
+    test_guild_id = 123456789
+
+    # Two writes stay queued (interval is far away, batch size is 3)
+    await db.add_warning(1, test_guild_id, 2, "first")
+    await db.add_warning(1, test_guild_id, 2, "second")
+    assert db._pending_writes == 2, db._pending_writes
+    print(f"✅ Queued writes: {db._pending_writes}")
+
+    # Same connection still sees its own uncommitted writes
+    warnings = await db.get_warnings(1, test_guild_id)
+    assert len(warnings) == 2
+    print(f"✅ Uncommitted writes are readable: {len(warnings)} warnings")
+
+    # Third write hits the batch size and flushes
+    await db.add_warning(1, test_guild_id, 2, "third")
+    assert db._pending_writes == 0
+    print("✅ Batch size triggered a flush")
+
+    # A queued write must survive close()
+    await db.add_mod_log(test_guild_id, "warn", 1, 2, "queued")
+    await db.close()
+
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    logs = await db.get_mod_logs(1, test_guild_id)
+    assert len(logs) == 1
+    print("✅ Queued write was flushed on close")
+    await db.close()
+
+    # A failed group commit keeps its writes queued for the next flush
+    db = DatabaseManager(db_path, group_commit=True, commit_interval_ms=60000)
+    await db.initialize()
+    commit = db.connection.commit
+
+    async def busy():
+        raise sqlite3.OperationalError("database is locked")
+    db.connection.commit = busy
+    await db.add_mod_log(test_guild_id, "warn", 1, 2, "retried")
+    await db.flush()
+    assert db._pending_writes == 1, db._pending_writes
+    db.connection.commit = commit
+    await db.flush()
+    assert db._pending_writes == 0
+    print("✅ Failed group commit was retried")
+
+    # close() reports writes it could not commit
+    db.connection.commit = busy
+    await db.add_mod_log(test_guild_id, "warn", 1, 2, "lost")
+    try:
+        await db.close()
+        assert False, "close() hid a failed commit"
+    except sqlite3.OperationalError:
+        pass
+    print("✅ close() raised on a failed final commit")
+
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    assert len(await db.get_mod_logs(1, test_guild_id)) == 2
+    await db.close()
+
+    os.remove(db_path)
+    print("🎉 Group commit test completed successfully!")
+
+
+async def _test_settings_cache():
+    """Test that settings reads are cached and invalidated on update"""
+    print("\n🧪 Testing settings cache...")
+
+    db_path = _temp_db_path()
+    db = DatabaseManager(db_path)
+    await db.initialize()
+
+    test_guild_id = 123456789
+
+    settings = await db.get_guild_settings(test_guild_id)
+    await db.get_guild_settings(test_guild_id)
+    await db.get_antivirus_settings(test_guild_id)
+    await db.get_antivirus_settings(test_guild_id)
+    stats = db.get_settings_cache_stats()
+    assert stats['misses'] == 2 and stats['hits'] == 2, stats
+    print(f"✅ Cache stats after repeated reads: {stats}")
+
+    # Mutating a returned object must not leak into the cache
+    settings.automod_enabled = False
+    assert (await db.get_guild_settings(test_guild_id)).automod_enabled
+    print("✅ Returned settings are copies")
+
+    # Updates invalidate the cached entry
+    await db.update_guild_settings(settings)
+    assert not (await db.get_guild_settings(test_guild_id)).automod_enabled
+    av_settings = await db.get_antivirus_settings(test_guild_id)
+    av_settings.auto_lockdown = True
+    await db.update_antivirus_settings(av_settings)
+    assert (await db.get_antivirus_settings(test_guild_id)).auto_lockdown
+    print("✅ Updates invalidate the cache")
+
+    await db.close()
+    os.remove(db_path)
+    print("🎉 Settings cache test completed successfully!")
+
+
+async def _test_shared_settings_cache():
+    """Test that settings changed by another process reach this process's caches"""
+    print("\n🧪 Testing cross-process cache sync...")
+
+    db_path = _temp_db_path()
+    writer = DatabaseManager(db_path, wal_mode=True)
+    synced = DatabaseManager(db_path, wal_mode=True, cache_sync_interval_ms=20)
+    unsynced = DatabaseManager(db_path, wal_mode=True)
+    for db in (writer, synced, unsynced):
+        await db.initialize()
+
+    test_guild_id = 123456789
+    for db in (synced, unsynced):
+        assert (await db.get_guild_settings(test_guild_id)).automod_enabled
+        assert await db.get_antivirus_protected_roles(test_guild_id) == []
+    settings_version = synced.settings_version
+    blacklist_version = synced.blacklist_versions.get(test_guild_id, 0)
+
+    settings = await writer.get_guild_settings(test_guild_id)
+    settings.automod_enabled = False
+    await writer.update_guild_settings(settings)
+    await writer.add_blacklist_word(test_guild_id, 'spam')
+    await writer.add_antivirus_protected_role(test_guild_id, 42)
+    await asyncio.sleep(0.1)
+
+    assert not (await synced.get_guild_settings(test_guild_id)).automod_enabled
+    assert await synced.get_antivirus_protected_roles(test_guild_id) == [42]
+    assert synced.settings_version > settings_version
+    assert synced.blacklist_versions[test_guild_id] > blacklist_version
+    print("✅ Settings, protected roles and blacklist picked up within the sync interval")
+
+    # Without polling, the cached copies stay as they were
+    assert (await unsynced.get_guild_settings(test_guild_id)).automod_enabled
+    assert await unsynced.get_antivirus_protected_roles(test_guild_id) == []
+    print("✅ A process that doesn't poll keeps its cached settings")
+
+    for db in (writer, synced, unsynced):
+        await db.close()
+    os.remove(db_path)
+    print("🎉 Cross-process cache sync test completed successfully!")
+
+
+async def _test_migrations():
+    """Test that migrations upgrade a legacy database exactly once"""
+    print("\n🧪 Testing schema migrations...")
+
+    # Simulate a database created before the later guild_settings columns existed
+    db_path = _temp_db_path()
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE guild_settings (guild_id INTEGER PRIMARY KEY, welcome_channel INTEGER)")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    version = await db.get_schema_version()
+    assert version == MIGRATIONS[-1][0], version
+    print(f"✅ Schema upgraded to version {version}")
+
+    async with db.connection.execute("PRAGMA table_info(guild_settings)") as cursor:
+        columns = [row[1] for row in await cursor.fetchall()]
+    assert 'everyone_ping_protection' in columns and 'bot_log_channel' in columns
+    print("✅ Legacy columns added")
+
+    async with db.connection.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
+    ) as cursor:
+        indexes = [row[0] for row in await cursor.fetchall()]
+    assert 'idx_warnings_guild_user' in indexes and 'idx_giveaways_active_end' in indexes
+    print(f"✅ Created {len(indexes)} indexes")
+    await db.close()
+
+    # Re-opening must not re-apply anything
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    async with db.connection.execute("SELECT COUNT(*) FROM schema_version") as cursor:
+        assert (await cursor.fetchone())[0] == len(MIGRATIONS)
+    print("✅ Migrations are applied only once")
+    await db.close()
+
+    os.remove(db_path)
+    print("🎉 Migration test completed successfully!")
+
+
+async def _test_wal_read_pool():
+    """Test that WAL mode serves reads from the read-only pool"""
+    print("\n🧪 Testing WAL mode and read pool...")
+
+    db_path = _temp_db_path()
+    db = DatabaseManager(db_path, wal_mode=True, read_pool_size=2)
+    await db.initialize()
+
+    async with db.connection.execute("PRAGMA journal_mode") as cursor:
+        journal_mode = (await cursor.fetchone())[0]
+    assert journal_mode == 'wal', journal_mode
+    print(f"✅ Journal mode: {journal_mode}")
+
+    test_guild_id = 123456789
+    await db.add_mod_log(test_guild_id, "ban", 1, 2, "test")
+    await db.add_antivirus_scan_log(test_guild_id, 1, "virus.exe", "file", "MALICIOUS", 1, 0, "deleted")
+
+    # Committed writes are visible to the read connections, concurrently
+    logs, scan_logs = await asyncio.gather(
+        db.get_mod_logs(1, test_guild_id),
+        db.get_antivirus_scan_logs(test_guild_id)
+    )
+    assert len(logs) == 1 and len(scan_logs) == 1
+    assert db._read_pool.qsize() == 2
+    print("✅ Reads served from the pool")
+
+    # Read connections are read-only
+    async with db._read_connection() as connection:
+        try:
+            await connection.execute("DELETE FROM mod_logs")
+            assert False, "read connection accepted a write"
+        except Exception:
+            pass
+    print("✅ Read connections reject writes")
+
+    await db.close()
+    os.remove(db_path)
+
+    # With group commit the pool lags queued writes; fresh lookups don't
+    db = DatabaseManager(db_path, group_commit=True, commit_interval_ms=60000,
+                         wal_mode=True, read_pool_size=2)
+    await db.initialize()
+    case_id = await db.add_mod_log(test_guild_id, "warn", 1, 2, "queued")
+    assert db._pending_writes == 1
+    assert await db.get_mod_logs(1, test_guild_id) == []
+    case = await db.get_mod_log_by_case(case_id)
+    assert case is not None and case.reason == "queued"
+    print("✅ Case lookup sees a queued write")
+
+    await db.add_mute(1, test_guild_id, datetime(2000, 1, 1))
+    await db.flush()
+    await db.remove_mute(1, test_guild_id)
+    assert await db.get_expired_mutes() == []
+    print("✅ Removed mute is not listed before the group commit")
+
+    await db.close()
+    os.remove(db_path)
+    print("🎉 WAL read pool test completed successfully!")
+
+
+async def _test_atomic_economy():
+    """Test UPSERT get-or-create, XP increments and atomic transfers"""
+    print("\n🧪 Testing atomic economy operations...")
+
+    db_path = _temp_db_path()
+    db = DatabaseManager(db_path)
+    await db.initialize()
+
+    test_guild_id = 123456789
+
+    user = await db.get_or_create_user(1, test_guild_id)
+    assert user.balance == 0 and await db.get_or_create_user(1, test_guild_id) == user
+    print("✅ get_or_create_user is idempotent")
+
+    assert (await db.add_xp(1, test_guild_id, 20, cooldown_seconds=60)).xp == 20
+    assert await db.add_xp(1, test_guild_id, 20, cooldown_seconds=60) is None
+    print("✅ XP increments respect the cooldown")
+
+    assert await db.add_balance(1, test_guild_id, 300) == 300
+    assert await db.transfer(test_guild_id, 1, 2, 1000) is None
+    print("✅ Transfer refused without funds")
+
+    # Concurrent transfers can never overdraw the sender
+    results = await asyncio.gather(*[db.transfer(test_guild_id, 1, 2, 100) for _ in range(5)])
+    succeeded = [r for r in results if r]
+    assert len(succeeded) == 3, results
+    print(f"✅ {len(succeeded)} of 5 concurrent transfers succeeded")
+
+    # RETURNING writes interleaved with plain writes never hit a commit mid-statement
+    await asyncio.gather(*[
+        op for i in range(20)
+        for op in (db.add_xp(100 + i, test_guild_id, 5), db.add_warning(100 + i, test_guild_id, 1, "Test"))
+    ])
+    print("✅ Concurrent add_xp and add_warning commit cleanly")
+    await db.close()
+
+    # Balances are committed
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    assert (await db.get_user(1, test_guild_id)).balance == 0
+    assert (await db.get_user(2, test_guild_id)).balance == 300
+    print("✅ Balances persisted: sender 0, receiver 300")
+    await db.close()
+
+    os.remove(db_path)
+    print("🎉 Atomic economy test completed successfully!")
+
+
+def test_group_commit():
+    asyncio.run(_test_group_commit())
+
+
+def test_settings_cache():
+    asyncio.run(_test_settings_cache())
+
+
+def test_shared_settings_cache():
+    asyncio.run(_test_shared_settings_cache())
+
+
+def test_migrations():
+    asyncio.run(_test_migrations())
+
+
+def test_wal_read_pool():
+    asyncio.run(_test_wal_read_pool())
+
+
+def test_atomic_economy():
+    asyncio.run(_test_atomic_economy())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Database Tests...\n")
+    test_group_commit()
+    test_settings_cache()
+    test_shared_settings_cache()
+    test_migrations()
+    test_wal_read_pool()
+    test_atomic_economy()
+    print("\n✨ All database tests completed!")
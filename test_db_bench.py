@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the DatabaseManager benchmark suite
+This script runs every benchmark case against a small seeded database
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from harness.db_bench import SeedSpec, compare, prepare_database, run_benchmarks, uncovered_methods
+
+SMALL = SeedSpec(guilds=5, users=200, mod_logs=1000, scan_logs=1000, warnings=100,
+                 custom_commands=3, blacklist_words=5, mutes=20, custom_media=10)
+
+
+def test_every_method_covered():
+    """Test that every public DatabaseManager method has a benchmark case"""
+    missing = uncovered_methods()
+    assert not missing, f"No benchmark for: {missing}"
+    print("✅ Every DatabaseManager method is benchmarked")
+
+
+def test_seed_and_run():
+    """Test seeding, running every case and comparing two runs"""
+    print("🧪 Testing benchmark run...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        cache = os.path.join(tmp, 'seed-cache.db')
+        prepare_database(path, SMALL, cache=cache)
+
+        connection = sqlite3.connect(path)
+        counts = {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('users', 'mod_logs', 'antivirus_scan_logs')
+        }
+        connection.close()
+        assert counts == {'users': 200, 'mod_logs': 1000, 'antivirus_scan_logs': 1000}, counts
+        print(f"✅ Seeded {counts}")
+
+        # A second prepare with the same spec reuses the cached copy
+        os.remove(path)
+        prepare_database(path, SMALL, cache=cache)
+        assert os.path.exists(path)
+
+        report = asyncio.run(run_benchmarks(path, SMALL, iterations=5, max_seconds=1.0))
+
+    results = report['results']
+    assert not uncovered_methods() and len(results) > 50, results.keys()
+    assert all(stats['ops'] == 5 and stats['ops_per_sec'] > 0 for stats in results.values()), results
+    print(f"✅ Ran {len(results)} methods")
+
+    slower = {**report, 'results': {
+        method: {**stats, 'ops_per_sec': stats['ops_per_sec'] / 2} for method, stats in results.items()
+    }}
+    rows = compare(report, slower)
+    assert len(rows) == len(results) and all(row['regression'] for row in rows)
+    assert not any(row['regression'] for row in compare(report, report))
+    print("✅ Comparison flags a 50% slowdown as a regression")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Database Benchmark Tests...\n")
+    test_every_method_covered()
+    test_seed_and_run()
+    print("\n✅ All database benchmark tests passed!")
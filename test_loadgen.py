@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic load generator
+This script runs a short load step with Discord and VirusTotal stubbed
+"""
+
+import asyncio
+
+from harness.loadgen import LoadProfile, run_load
+
+
+def test_load_step():
+    """Test that a light load is sustained and reaches every subsystem"""
+    print("🧪 Testing load step...")
+
+    profile = LoadProfile(
+        guilds=20, users_per_guild=20, channels_per_guild=2, duration=3.0, warmup=1.0,
+        link_ratio=0.0, attachment_ratio=0.5, join_burst_every=1.0, join_burst_size=5,
+        api_latency_ms=1.0, vt_latency_ms=1.0, seed=3
+    )
+    result, = asyncio.run(run_load(profile, [20.0]))
+
+    assert 55 <= result.sent <= 60, result
+    assert result.processed > 0 and result.backlog < result.sent, result
+    assert result.virustotal_requests > 0, result
+    assert result.db_writes_per_sec > 0, result
+    assert result.structure_items['KCLAntivirusSimple.user_joins'] >= 10, result.structure_items
+    print(f"✅ Sustained {result.sustained_rate:.0f}/s, lag p99 {result.loop_lag_p99_ms:.1f} ms, "
+          f"{result.virustotal_requests} VirusTotal requests")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Load Generator Tests...\n")
+    test_load_step()
+    print("\n✅ All load generator tests passed!")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched log channel buffer
+This script verifies embeds are packed per channel, bounded, flushed and
+posted through log channel webhooks
+"""
+
+import asyncio
+
+import discord
+
+import config
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.log_buffer import LogBuffer, pack_embeds
+
+
+class _Response:
+    def __init__(self, status=403, reason='Forbidden'):
+        self.status = status
+        self.reason = reason
+
+
+class FakeChannel:
+    """Records what would have been sent to a text channel"""
+
+    def __init__(self, channel_id, forbidden=False):
+        self.id = channel_id
+        self.forbidden = forbidden
+        self.sent = []
+
+    async def send(self, embeds=None):
+        if self.forbidden:
+            raise discord.Forbidden(_Response(), 'Missing Access')
+        self.sent.append(embeds)
+
+
+def test_pack_embeds():
+    """Test that batches respect the 10 embed and 6000 character limits"""
+    print("🧪 Testing embed packing...")
+
+    batches = pack_embeds([discord.Embed(title=f"Event {i}") for i in range(25)])
+    assert [len(batch) for batch in batches] == [10, 10, 5], batches
+
+    big = [discord.Embed(description='x' * 2500) for _ in range(5)]
+    assert [len(batch) for batch in pack_embeds(big)] == [2, 2, 1]
+    print("✅ 25 small embeds -> 3 messages, 5 large embeds -> 3 messages")
+
+
+async def _test_bounded_queue():
+    """Test that a flooded channel keeps the newest embeds and counts the rest"""
+    print("🧪 Testing bounded queues...")
+
+    buffer = LogBuffer(flush_interval=60, max_pending=5)
+    channel = FakeChannel(1)
+    results = [buffer.add(channel, discord.Embed(title=str(i))) for i in range(8)]
+    assert results == [True] * 5 + [False] * 3, results
+    assert buffer.dropped == 3 and buffer.pending() == 5
+
+    await buffer.flush()
+    assert len(channel.sent) == 1
+    assert [embed.title for embed in channel.sent[0]] == ['3', '4', '5', '6', '7']
+    assert buffer.pending() == 0 and not buffer.queues
+    print(f"✅ Kept the newest 5, dropped {buffer.dropped}")
+
+
+async def _test_flush_when_full():
+    """Test that a full message's worth is sent without waiting for the interval"""
+    print("🧪 Testing early flush...")
+
+    buffer = LogBuffer(flush_interval=60)
+    buffer.start()
+    channel = FakeChannel(1)
+    quiet = FakeChannel(2)
+    buffer.add(quiet, discord.Embed(title='quiet'))
+    for i in range(10):
+        buffer.add(channel, discord.Embed(title=str(i)))
+
+    for _ in range(50):
+        if channel.sent:
+            break
+        await asyncio.sleep(0.01)
+    assert len(channel.sent) == 1 and len(channel.sent[0]) == 10, channel.sent
+
+    await buffer.stop()
+    assert len(quiet.sent) == 1, "stop() should send what is still queued"
+    assert buffer.stats()['sent_messages'] == 2
+    print("✅ Full channel flushed early, the rest on stop")
+
+
+async def _test_forbidden_channel():
+    """Test that a channel we can't post in drops its queue instead of retrying"""
+    print("🧪 Testing forbidden channel...")
+
+    buffer = LogBuffer(flush_interval=60)
+    channel = FakeChannel(1, forbidden=True)
+    for i in range(15):
+        buffer.add(channel, discord.Embed(title=str(i)))
+    await buffer.flush()
+    assert buffer.failed == 15 and buffer.pending() == 0, buffer.stats()
+    print("✅ Forbidden channel dropped 15 embeds")
+
+
+async def _test_logging_cog_batches():
+    """Test that member joins logged by the logging cog arrive as one message (no webhook permission)"""
+    print("🧪 Testing logging cog through the buffer...")
+
+    async with ReplayHarness(cogs=['logging']) as harness:
+        guild = harness.add_guild(members=1)
+        settings = await harness.bot.db.get_guild_settings(guild.id)
+        settings.bot_log_channel = guild.channel_ids[0]
+        await harness.bot.db.update_guild_settings(settings)
+
+        for _ in range(7):
+            harness.feed('GUILD_MEMBER_ADD', payloads.member_add(guild.id, payloads.member(payloads.user())))
+        await harness.drain()
+
+        sends = harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        assert len(sends) == 1, sends
+        assert len(sends[0].payload['embeds']) == 7
+        print("✅ 7 join logs sent as 1 message")
+
+
+async def _test_webhook_sink():
+    """Test that log batches go through one stored webhook per channel, recreated if deleted"""
+    print("🧪 Testing webhook log sink...")
+
+    config.LOG_WEBHOOKS_ENABLED = True
+    try:
+        await _run_webhook_sink()
+    finally:
+        config.LOG_WEBHOOKS_ENABLED = False
+
+
+async def _run_webhook_sink():
+    async with ReplayHarness(cogs=['logging']) as harness:
+        guild = harness.add_guild(members=1)
+        harness.add_bot_member(guild)
+        channel_id = guild.channel_ids[0]
+        settings = await harness.bot.db.get_guild_settings(guild.id)
+        settings.bot_log_channel = channel_id
+        await harness.bot.db.update_guild_settings(settings)
+
+        async def joins(count):
+            for _ in range(count):
+                harness.feed('GUILD_MEMBER_ADD', payloads.member_add(guild.id, payloads.member(payloads.user())))
+            await harness.drain()
+
+        creates = lambda: harness.api.calls_to('POST', '/channels/{channel_id}/webhooks')
+        executes = lambda: harness.api.calls_to('POST', '/webhooks/{webhook_id}/{webhook_token}')
+
+        await joins(3)
+        assert len(creates()) == 1 and len(executes()) == 1, harness.api.calls
+        assert len(executes()[0].payload['embeds']) == 3
+        assert not harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        stored = await harness.bot.db.get_log_webhook(channel_id)
+        assert stored is not None and stored.guild_id == guild.id
+        print("✅ Created one webhook and posted 3 embeds through it")
+
+        # A restart finds the stored webhook instead of creating another
+        harness.bot.log_webhooks.webhooks.clear()
+        await joins(2)
+        assert len(creates()) == 1 and len(executes()) == 2
+        print("✅ Reused the stored webhook after the cache was cleared")
+
+        # The webhook was deleted in Discord: recreate it and resend
+        def deleted(route, payload):
+            harness.api.handlers.clear()
+            raise discord.NotFound(_Response(404, 'Not Found'), 'Unknown Webhook')
+        harness.api.on('POST', '/webhooks/{webhook_id}/{webhook_token}', deleted)
+        await joins(1)
+        assert len(creates()) == 2 and len(executes()) == 4, harness.api.calls
+        replaced = await harness.bot.db.get_log_webhook(channel_id)
+        assert replaced.webhook_id != stored.webhook_id
+        assert harness.bot.log_buffer.failed == 0
+        print("✅ Recreated the deleted webhook and delivered the batch")
+
+        # The recreated webhook fails as well: fall back to a normal send
+        def always_deleted(route, payload):
+            raise discord.NotFound(_Response(404, 'Not Found'), 'Unknown Webhook')
+        harness.api.on('POST', '/webhooks/{webhook_id}/{webhook_token}', always_deleted)
+        await joins(2)
+        sends = harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        assert len(sends) == 1 and len(sends[0].payload['embeds']) == 2, sends
+        assert harness.bot.log_buffer.failed == 0
+        assert channel_id not in harness.bot.log_webhooks.webhooks
+        assert await harness.bot.db.get_log_webhook(channel_id) is None
+        print("✅ Sent as the bot when the recreated webhook failed too")
+
+        # The webhook is forbidden but the bot can still post: nothing is dropped
+        def forbidden(route, payload):
+            raise discord.Forbidden(_Response(), 'Missing Permissions')
+        harness.api.on('POST', '/webhooks/{webhook_id}/{webhook_token}', forbidden)
+        harness.bot.log_webhooks.unavailable.clear()
+        await joins(12)
+        sends = harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        assert [len(call.payload['embeds']) for call in sends[1:]] == [10, 2], sends
+        assert harness.bot.log_buffer.failed == 0
+        print("✅ Forbidden webhook fell back to the bot for every batch")
+
+
+def test_bounded_queue():
+    asyncio.run(_test_bounded_queue())
+
+
+def test_flush_when_full():
+    asyncio.run(_test_flush_when_full())
+
+
+def test_forbidden_channel():
+    asyncio.run(_test_forbidden_channel())
+
+
+def test_logging_cog_batches():
+    asyncio.run(_test_logging_cog_batches())
+
+
+def test_webhook_sink():
+    asyncio.run(_test_webhook_sink())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Log Buffer Tests...\n")
+    test_pack_embeds()
+    test_bounded_queue()
+    test_flush_when_full()
+    test_forbidden_channel()
+    test_logging_cog_batches()
+    test_webhook_sink()
+    print("\n✅ All log buffer tests passed!")
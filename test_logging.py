@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the logging setup
+This script verifies JSON output, sampling and rate limiting, and that
+importing the entry points leaves logging to their main()
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from utils.logging_setup import JsonFormatter, SamplingFilter, parse_logger_values, setup_logging
+
+
+def _record(name, level=logging.INFO, msg="hello", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter():
+    """Test that records become one JSON object with extra fields"""
+    print("🧪 Testing JSON formatter...")
+
+    line = JsonFormatter().format(_record('discord_bot.pipeline', guild_id=42))
+    entry = json.loads(line)
+    assert entry['logger'] == 'discord_bot.pipeline' and entry['message'] == "hello"
+    assert entry['guild_id'] == 42
+    print(f"✅ Formatted: {line}")
+
+
+def test_sampling_filter():
+    """Test per-logger sampling and rate limits"""
+    print("\n🧪 Testing sampling filter...")
+
+    assert parse_logger_values("a=0.5, b.c=10") == {'a': 0.5, 'b.c': 10.0}
+
+    sampler = SamplingFilter(sample_rates={'discord_bot.pipeline': 0.0}, rate_limits={'discord_bot.events': 5})
+
+    # Sampled out entirely, including child loggers, but warnings always pass
+    assert not sampler.filter(_record('discord_bot.pipeline.stage'))
+    assert sampler.filter(_record('discord_bot.pipeline', logging.WARNING))
+    print("✅ Sampling drops INFO records but keeps warnings")
+
+    # Burst of 20 records: only the bucket size gets through
+    passed = sum(sampler.filter(_record('discord_bot.events')) for _ in range(20))
+    assert passed == 5, passed
+    print(f"✅ Rate limit let {passed} of 20 records through")
+
+    # Unconfigured loggers are untouched
+    assert all(sampler.filter(_record('discord_bot.database')) for _ in range(20))
+    print("✅ Other loggers are not limited")
+
+
+def test_queue_listener():
+    """Test that records reach the rotating JSON file through the queue"""
+    print("\n🧪 Testing queued file logging...")
+
+    log_dir = tempfile.mkdtemp()
+    log_file = os.path.join(log_dir, 'bot.log')
+    listener = setup_logging(log_file=log_file, max_bytes=1024, backup_count=2, console=False)
+
+    logger = logging.getLogger('discord_bot.test')
+    for i in range(50):
+        logger.info("Message %d", i, extra={'index': i})
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        logger.error("Failed", exc_info=e)
+    listener.stop()  # Drains the queue
+    listener.stop()  # At exit it is stopped again
+    assert not listener.running
+
+    with open(log_file, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[-1]['message'] == "Failed" and 'ValueError' in entries[-1]['exception']
+    assert os.path.exists(log_file + '.1')
+    print(f"✅ {len(entries)} records in the current file, older records rotated")
+
+    logging.getLogger().handlers.clear()
+
+
+def test_import_leaves_logging_alone():
+    """Test that importing bot.py and cluster.py installs no handlers and writes no log file"""
+    print("🧪 Testing entry point imports...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, 'import.log')
+        env = {key: value for key, value in os.environ.items() if key != 'LOG_JSON'}
+        env['LOG_FILE'] = log_file
+        env['PYTHONPATH'] = os.path.dirname(os.path.abspath(__file__))
+        # Run from the temporary directory so a local .env can't set LOG_JSON
+        output = subprocess.run(
+            [sys.executable, '-c',
+             'import logging, bot, cluster, config; '
+             'print(len(logging.getLogger().handlers), config.LOG_JSON)'],
+            env=env, cwd=tmp, capture_output=True, text=True, check=True
+        ).stdout.split()
+        assert output == ['0', 'False'], output
+        assert not os.path.exists(log_file)
+    print("✅ No handlers or log file until main(), plain text by default")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Logging Tests...\n")
+    test_json_formatter()
+    test_sampling_filter()
+    test_queue_listener()
+    test_import_leaves_logging_alone()
+    print("\n✨ All logging tests completed!")
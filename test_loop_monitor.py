@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the event loop lag monitor
+This script blocks the loop on purpose and checks the stall is captured
+"""
+
+import asyncio
+import time
+from utils.loop_monitor import LoopLagMonitor, percentile
+
+
+def _blocking_call():
+    """Stand-in for synchronous work on the event loop"""
+    time.sleep(0.4)
+
+
+async def _test_stall_capture():
+    """Test that a blocking call is measured and its stack captured"""
+    print("🧪 Testing loop lag monitor...")
+
+    monitor = LoopLagMonitor(interval_ms=20, threshold_ms=100, report_seconds=0)
+    monitor.start()
+    await asyncio.sleep(0.2)
+
+    _blocking_call()
+    await asyncio.sleep(0.1)
+    monitor.stop()
+
+    stats = monitor.stats()
+    assert stats['max'] >= 300, stats
+    print(f"✅ Lag stats: {stats}")
+
+    assert monitor.stalls and '_blocking_call' in monitor.stalls[-1]['stack']
+    print(f"✅ Stall captured ({monitor.stalls[-1]['stalled_ms']} ms) with the blocking function on the stack")
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50 and percentile(values, 0.99) == 99 and percentile(values, 1.0) == 100
+    print("✅ Percentiles")
+
+
+def test_stall_capture():
+    asyncio.run(_test_stall_capture())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Loop Monitor Tests...\n")
+    test_percentile()
+    test_stall_capture()
+    print("\n✨ All loop monitor tests completed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for on-demand member requests
+This script verifies chunking on demand respects MEMBER_CACHE_POLICY and
+that missing members are requested in full batches
+"""
+
+import asyncio
+
+import config
+from utils.helpers import get_all_members, get_members_by_id
+
+
+class FakeGuild:
+    """Records chunk and query_members calls"""
+
+    def __init__(self, cached=(), chunked=False):
+        self.cached = {member_id: f'member{member_id}' for member_id in cached}
+        self.chunked = chunked
+        self.chunks = []
+        self.queries = []
+
+    @property
+    def members(self):
+        return list(self.cached.values())
+
+    def get_member(self, user_id):
+        return self.cached.get(user_id)
+
+    async def chunk(self, cache=True):
+        self.chunks.append(cache)
+        return ['everyone']
+
+    async def query_members(self, user_ids=None, limit=5, cache=True):
+        self.queries.append((len(user_ids), limit, cache))
+        return [f'member{user_id}' for user_id in user_ids[:limit]]
+
+
+async def _test_chunk_follows_policy():
+    """Test that on-demand chunks are only cached under the 'all' policy"""
+    print("🧪 Testing on-demand chunking...")
+
+    policy = config.MEMBER_CACHE_POLICY
+    try:
+        guild = FakeGuild()
+        config.MEMBER_CACHE_POLICY = 'joined'
+        assert await get_all_members(guild) == ['everyone']
+        config.MEMBER_CACHE_POLICY = 'all'
+        await get_all_members(guild)
+        await get_all_members(guild, cache=False)
+        assert guild.chunks == [False, True, False], guild.chunks
+    finally:
+        config.MEMBER_CACHE_POLICY = policy
+
+    chunked = FakeGuild(cached=[1, 2], chunked=True)
+    assert await get_all_members(chunked) == ['member1', 'member2']
+    assert not chunked.chunks
+    print("✅ Chunk cached only when the policy caches every member")
+
+
+async def _test_members_by_id_batches():
+    """Test that missing members are requested 100 at a time without the default limit of 5"""
+    print("🧪 Testing member batches...")
+
+    guild = FakeGuild(cached=[1, 2])
+    members = await get_members_by_id(guild, range(1, 153))
+    assert len(members) == 152, len(members)
+    assert guild.queries == [(100, 100, False), (50, 50, False)], guild.queries
+    print(f"✅ 2 cached + 150 requested in {len(guild.queries)} batches")
+
+
+def test_chunk_follows_policy():
+    asyncio.run(_test_chunk_follows_policy())
+
+
+def test_members_by_id_batches():
+    asyncio.run(_test_members_by_id_batches())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Member Cache Tests...\n")
+    test_chunk_follows_policy()
+    test_members_by_id_batches()
+    print("\n✅ All member cache tests passed!")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics endpoint
+This script verifies the Prometheus output and the HTTP routes
+"""
+
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+import aiohttp
+import discord
+from aiohttp.test_utils import TestClient, TestServer
+from discord.http import Route
+from database.db_manager import DatabaseManager
+from utils.metrics import (
+    Counter, Histogram, MetricsRegistry, DB_SECONDS, DISCORD_REQUEST_SECONDS,
+    instrument_async_methods, instrument_discord_http
+)
+from utils.log_buffer import LogBuffer
+from utils.metrics_server import MetricsServer
+from utils.outbound import OutboundQueue
+from utils.spam_tracker import SpamTracker
+
+
+class _Cog:
+    def __init__(self):
+        self.spam_tracker = SpamTracker(window_seconds=3, threshold=5)
+        self.spam_tracker.record(10, 1, 100, 50, now=0)
+        self.spam_tracker.record(10, 1, 101, 50, now=1)
+        self.spam_tracker.record(10, 2, 102, 50, now=1)
+
+
+class _Bot:
+    """Just enough of DiscordBot for the metrics server"""
+
+    def __init__(self, db):
+        self.db = db
+        self.guilds = [object(), object()]
+        self.shards = {0: SimpleNamespace(latency=0.05), 1: SimpleNamespace(latency=float('inf'))}
+        self.cogs = {'AutoMod': _Cog()}
+        self.log_buffer = LogBuffer()
+        self.outbound = OutboundQueue()
+
+    def gateway_shards(self):
+        return self.shards
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def is_ready(self):
+        return True
+
+
+def test_render():
+    """Test the exposition format"""
+    print("🧪 Testing Prometheus rendering...")
+
+    registry = MetricsRegistry()
+    counter = registry.register(Counter('events_total', 'Events', ('event',)))
+    histogram = registry.register(Histogram('latency_seconds', 'Latency', ('method',), buckets=(0.1, 1.0)))
+    counter.inc(event='MESSAGE_CREATE')
+    counter.inc(event='MESSAGE_CREATE')
+    histogram.observe(0.5, method='get_user')
+
+    text = registry.render()
+    assert 'events_total{event="MESSAGE_CREATE"} 2' in text
+    assert 'latency_seconds_bucket{method="get_user",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{method="get_user",le="1.0"} 1' in text
+    assert 'latency_seconds_count{method="get_user"} 1' in text
+    print("✅ Counters and histogram buckets rendered")
+
+
+class _HTTP:
+    """Answers Discord REST calls by channel: 1 succeeds, 2 is unknown, 3 can't connect"""
+
+    async def request(self, route, **kwargs):
+        if route.channel_id == 2:
+            raise discord.NotFound(SimpleNamespace(status=404, reason='Not Found'), 'Unknown Channel')
+        if route.channel_id == 3:
+            raise aiohttp.ClientConnectionError('connection reset')
+        return {'id': str(route.channel_id)}
+
+
+async def _test_discord_http_labels():
+    """Test that REST calls are labelled ok/error with the status code or error type"""
+    print("🧪 Testing Discord REST labels...")
+
+    http = _HTTP()
+    instrument_discord_http(http)
+    for channel_id in (1, 2, 3):
+        try:
+            await http.request(Route('GET', '/channels/{channel_id}', channel_id=channel_id))
+        except (discord.HTTPException, aiohttp.ClientError):
+            pass
+
+    text = '\n'.join(DISCORD_REQUEST_SECONDS.render())
+    labels = 'method="GET",route="/channels/{channel_id}"'
+    for outcome, code in (('ok', '2xx'), ('error', '404'), ('error', 'ClientConnectionError')):
+        assert f'discord_api_request_seconds_count{{{labels},outcome="{outcome}",code="{code}"}}' in text, text
+    print("✅ ok/2xx, error/404 and error/ClientConnectionError recorded")
+
+
+def test_discord_http_labels():
+    asyncio.run(_test_discord_http_labels())
+
+
+async def _test_server():
+    """Test DB instrumentation and the HTTP routes"""
+    print("\n🧪 Testing metrics server...")
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    instrument_async_methods(db, DB_SECONDS, exclude=('initialize', 'close'))
+    await db.get_guild_settings(1)
+
+    server = MetricsServer(_Bot(db), '127.0.0.1', 0)
+    app_server = TestServer(server.build_app())
+    async with TestClient(app_server) as client:
+        response = await client.get('/metrics')
+        text = await response.text()
+        assert 'bot_db_method_seconds_count{method="get_guild_settings"} 1' in text
+        assert 'bot_structure_entries{cog="AutoMod",structure="spam_tracker"} 2' in text
+        assert 'bot_structure_items{cog="AutoMod",structure="spam_tracker"} 3' in text
+        assert 'bot_spam_tracker_bytes ' in text
+        assert 'discord_shard_latency_seconds{shard="1"}' not in text
+        assert 'bot_log_buffer_pending 0' in text
+        assert 'bot_outbound_pending 0' in text
+        print("✅ /metrics exposes DB latency and structure sizes")
+
+        response = await client.get('/ready')
+        assert response.status == 200 and (await response.json())['guilds'] == 2
+        print("✅ /ready reports ready")
+
+        response = await client.get('/health')
+        assert response.status == 200
+        print("✅ /health responds")
+
+    await db.close()
+    os.remove(db_path)
+
+
+def test_server():
+    asyncio.run(_test_server())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Metrics Tests...\n")
+    test_render()
+    test_discord_http_labels()
+    test_server()
+    print("\n✨ All metrics tests completed!")
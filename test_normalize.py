@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for text normalization
+This script verifies look-alike, styled and invisible characters are folded,
+that automod and the antivirus catch evasive content, and that the
+throughput benchmark runs
+"""
+
+import asyncio
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from harness.text_bench import format_results, run_benchmarks
+from utils.blacklist import BlacklistMatcher
+from utils.normalize import compact_text, normalize_text
+
+
+def test_normalize_text():
+    """Test folding of fullwidth, styled, accented, look-alike and invisible characters"""
+    print("🧪 Testing normalization...")
+
+    assert normalize_text("plain ascii stays") == "plain ascii stays"
+    assert normalize_text("ｆｒｅｅ ｎｉｔｒｏ") == "free nitro"
+    assert normalize_text("𝐟𝐫𝐞𝐞 𝓷𝓲𝓽𝓻𝓸") == "free nitro"
+    assert normalize_text("frее nіtrо") == "free nitro"  # Cyrillic е, і, о
+    assert normalize_text("n​i‍t﻿r­o") == "nitro"
+    assert normalize_text("ñïtrõ̶") == "nitro"
+    assert normalize_text("ᴅɪꜱᴄᴏʀᴅ") == "discord"
+    assert normalize_text("こんにちは 😀") == "こんにちは 😀"
+    print("✅ Evasive spellings fold to plain text")
+
+
+def test_compact_text():
+    """Test that spaced-out text collapses"""
+    print("🧪 Testing compact text...")
+
+    assert compact_text("d i s c o r d . g g / a b c") == "discord.gg/abc"
+    assert compact_text("ＤＩＳＣＯＲＤ．ＧＧ/abc") == "discord.gg/abc"
+    print("✅ Spacing and case removed")
+
+
+def test_blacklist_entries_normalized():
+    """Test that non-Latin blacklist entries still match normalized content"""
+    print("🧪 Testing normalized blacklist entries...")
+
+    matcher = BlacklistMatcher(['сука', 'badword'])
+    assert matcher.find(normalize_text("ты сука")) == 'сука'
+    assert matcher.find(normalize_text("ｂａｄｗｏｒｄ")) == 'badword'
+    print("✅ Entries folded like content, reported as added")
+
+
+async def _send(harness, guild, content):
+    author = guild.members[1]
+    await harness.dispatch('MESSAGE_CREATE', payloads.message(
+        guild.channel_ids[0], guild.id, author['user'], content, author
+    ))
+
+
+async def _test_automod_evasion():
+    """Test that automod catches obfuscated invites and blacklisted words"""
+    print("🧪 Testing automod evasion...")
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        guild = harness.add_guild(members=3)
+        await harness.bot.db.add_blacklist_word(guild.id, 'badword')
+        deletes = lambda: harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+
+        await _send(harness, guild, "join d i s c o r d . g g / abcdef")
+        assert len(deletes()) == 1
+        await _send(harness, guild, "you are a b​adwоrd")  # Zero-width space, Cyrillic о
+        assert len(deletes()) == 2
+        await _send(harness, guild, "a perfectly normal message")
+        assert len(deletes()) == 2
+        print("✅ Spaced invite and look-alike word removed")
+
+
+async def _test_antivirus_evasion():
+    """Test that the antivirus catches a phishing domain written with look-alike letters"""
+    print("🧪 Testing antivirus evasion...")
+
+    async with ReplayHarness(cogs=['kcl_antivirus_simple']) as harness:
+        guild = harness.add_guild(members=3)
+        deletes = lambda: harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        await _send(harness, guild, "claim it at discоrdnitro.gift")  # Cyrillic о
+        assert len(deletes()) == 1, harness.api.calls
+        await _send(harness, guild, "claim it at d i s c o r d n i t r o . g i f t now")
+        assert len(deletes()) == 2
+        # A phishing link is removed once, by the URL scan
+        await _send(harness, guild, "https://discordnitro.gift/claim")
+        assert len(deletes()) == 3
+        print("✅ Look-alike and spaced-out phishing domains removed")
+
+        # Words that only make up a phishing domain once the spaces are gone
+        for text in ("my discord app.run failed", "I like steam powered.rugs",
+                     "send it to discordsteam.community", "docs at mydiscordapp.ru",
+                     "discordapp.ru.example.com"):
+            await _send(harness, guild, text)
+        assert len(deletes()) == 3, harness.api.calls
+        print("✅ Domains across word boundaries or inside longer names left alone")
+
+
+def test_automod_evasion():
+    asyncio.run(_test_automod_evasion())
+
+
+def test_antivirus_evasion():
+    asyncio.run(_test_antivirus_evasion())
+
+
+def test_benchmark():
+    """Test that the throughput benchmark runs"""
+    report = run_benchmarks(count=200)
+    assert len(report['results']) == 9
+    print(format_results(report))
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Normalization Tests...\n")
+    test_normalize_text()
+    test_compact_text()
+    test_blacklist_entries_normalized()
+    test_automod_evasion()
+    test_antivirus_evasion()
+    test_benchmark()
+    print("\n✅ All normalization tests passed!")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the outbound action scheduler
+This script verifies enforcement runs ahead of queued notices, that the
+queue sheds stale and low-priority items, and that a 429 holds back the rest
+of its route
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.outbound import OutboundQueue, Priority
+
+
+async def _record(order, name):
+    order.append(name)
+
+
+async def _test_priority_order():
+    """Test that notices wait for enforcement and go out by priority"""
+    print("🧪 Testing priority order...")
+
+    queue = OutboundQueue(workers=1)
+    queue.start()
+    order = []
+
+    release = asyncio.Event()
+    enforcement = asyncio.create_task(queue.enforce(release.wait()))
+    await asyncio.sleep(0)
+    queue.submit(Priority.DM, _record(order, 'dm'))
+    queue.submit(Priority.NOTICE, _record(order, 'notice'))
+    await asyncio.sleep(0.05)
+    assert order == [], "notices must wait while enforcement is in flight"
+
+    release.set()
+    await enforcement
+    assert await queue.wait_idle(1.0)
+    assert order == ['notice', 'dm'], order
+    assert queue.stats['enforced'] == 1 and queue.stats['sent'] == 2
+    await queue.stop()
+    print("✅ Enforcement first, then NOTICE before DM")
+
+
+async def _test_backpressure():
+    """Test that a full queue drops the oldest lowest-priority item"""
+    print("🧪 Testing backpressure...")
+
+    queue = OutboundQueue(workers=1, max_pending=3)
+    order = []
+    for i in range(3):
+        assert queue.submit(Priority.DM, _record(order, f'dm{i}'))
+    assert queue.submit(Priority.NOTICE, _record(order, 'notice'))
+    assert queue.pending() == 3 and queue.stats['dropped_full'] == 1
+
+    # New items replace the oldest DM; once only notices are queued a DM is refused
+    assert queue.submit(Priority.DM, _record(order, 'dm3'))
+    queue.submit(Priority.NOTICE, _record(order, 'notice2'))
+    queue.submit(Priority.NOTICE, _record(order, 'notice3'))
+    assert not queue.submit(Priority.DM, _record(order, 'dm4'))
+
+    queue.start()
+    assert await queue.wait_idle(1.0)
+    assert order == ['notice', 'notice2', 'notice3'], order
+    assert queue.stats['dropped_full'] == 5, queue.stats
+    await queue.stop()
+    print(f"✅ Dropped {queue.stats['dropped_full']} items, kept every notice")
+
+
+async def _test_stale_items():
+    """Test that items queued past their max age are dropped, not sent"""
+    print("🧪 Testing stale items...")
+
+    queue = OutboundQueue(workers=2, max_age={Priority.NOTICE: 0.01})
+    order = []
+    queue.submit(Priority.NOTICE, _record(order, 'late warning'))
+    queue.submit(Priority.DM, _record(order, 'dm'))
+    await asyncio.sleep(0.05)
+
+    queue.start()
+    assert await queue.wait_idle(1.0)
+    assert order == ['dm'], order
+    assert queue.stats['dropped_stale'] == 1
+    await queue.stop()
+    print("✅ Stale warning dropped, DM still sent")
+
+
+async def _rate_limited(retry_after):
+    response = SimpleNamespace(status=429, reason='Too Many Requests', headers={'Retry-After': retry_after})
+    raise discord.HTTPException(response, 'You are being rate limited.')
+
+
+async def _test_rate_limited_route():
+    """Test that a 429 defers the route's queued items and leaves other routes alone"""
+    print("🧪 Testing rate-limited routes...")
+
+    queue = OutboundQueue(workers=1, max_age={Priority.DM: 0.1})
+    queue.start()
+    order = []
+    queue.submit(Priority.NOTICE, _rate_limited('0.2'), route=('send', 1))
+    await asyncio.sleep(0.02)
+
+    queue.submit(Priority.NOTICE, _record(order, 'channel 1'), route=('send', 1))
+    queue.submit(Priority.NOTICE, _record(order, 'channel 2'), route=('send', 2))
+    queue.submit(Priority.DM, _record(order, 'dm'), route=('send', 1))
+    await asyncio.sleep(0.05)
+    assert order == ['channel 2'], order
+    assert queue.pending() == 1
+
+    assert await queue.wait_idle(1.0)
+    assert order == ['channel 2', 'channel 1'], order
+    stats = queue.stats
+    assert stats['rate_limited'] == 1 and stats['deferred'] == 1 and stats['dropped_rate_limited'] == 1, stats
+    await queue.stop()
+    print("✅ Limited channel waited out its retry-after, the other channel went first")
+
+
+async def _test_automod_deletes_first():
+    """Test that automod deletes an invite before its warning is sent"""
+    print("🧪 Testing automod ordering...")
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        guild = harness.add_guild(members=3)
+        author = guild.members[1]
+        invite = payloads.message(guild.channel_ids[0], guild.id, author['user'], 'discord.gg/abcdef', author)
+        await harness.dispatch('MESSAGE_CREATE', invite)
+
+        calls = [(call.method, call.path) for call in harness.api.calls]
+        delete = calls.index(('DELETE', '/channels/{channel_id}/messages/{message_id}'))
+        warning = calls.index(('POST', '/channels/{channel_id}/messages'))
+        assert delete < warning, calls
+        assert harness.bot.outbound.stats['enforced'] == 1
+        print("✅ Invite deleted before the warning went out")
+
+
+def test_priority_order():
+    asyncio.run(_test_priority_order())
+
+
+def test_backpressure():
+    asyncio.run(_test_backpressure())
+
+
+def test_stale_items():
+    asyncio.run(_test_stale_items())
+
+
+def test_rate_limited_route():
+    asyncio.run(_test_rate_limited_route())
+
+
+def test_automod_deletes_first():
+    asyncio.run(_test_automod_deletes_first())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Outbound Queue Tests...\n")
+    test_priority_order()
+    test_backpressure()
+    test_stale_items()
+    test_rate_limited_route()
+    test_automod_deletes_first()
+    print("\n✅ All outbound queue tests passed!")
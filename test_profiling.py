@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the profiling helpers
+This script verifies the sampling profiler and timing summaries
+"""
+
+import asyncio
+import threading
+import time
+from utils.metrics import Histogram
+from utils.profiling import SamplingProfiler, top_timings
+
+
+def _busy_work(seconds):
+    """CPU-bound work the profiler should find"""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+async def _test_sampling_profiler():
+    """Test that the profiler attributes samples to the busy function"""
+    print("🧪 Testing sampling profiler...")
+
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.002)
+
+    async def workload():
+        await asyncio.sleep(0.05)
+        _busy_work(0.3)
+
+    await asyncio.gather(profiler.run(0.5), workload())
+
+    report = profiler.report()
+    top_function = profiler.own.most_common(1)[0][0]
+    assert profiler.samples > 10 and profiler.idle > 0, report
+    assert '_busy_work' in top_function, report
+    print(f"✅ {profiler.samples} busy and {profiler.idle} idle samples, hottest: {top_function}")
+
+
+def test_top_timings():
+    """Test ranking listeners by total time"""
+    histogram = Histogram('test_seconds', 'Test', ('listener',))
+    histogram.observe(0.5, listener='Slow.on_message')
+    histogram.observe(0.01, listener='Fast.on_message')
+    histogram.observe(0.01, listener='Fast.on_message')
+
+    rows = top_timings(histogram)
+    assert rows[0][0] == 'Slow.on_message' and rows[1][1] == 2
+    print(f"✅ Top timings: {rows}")
+
+
+def test_sampling_profiler():
+    asyncio.run(_test_sampling_profiler())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Profiling Tests...\n")
+    test_top_timings()
+    test_sampling_profiler()
+    print("\n✨ All profiling tests completed!")
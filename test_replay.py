@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline replay harness
+This script drives the real cogs with fake gateway events and checks what
+they sent to the fake Discord API and wrote to the database
+"""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+from harness import payloads
+from harness.runner import ReplayHarness, load_events, save_events
+
+
+async def _test_message_pipeline():
+    """Test that automod deletes an invite link and leveling records the author"""
+    print("🧪 Testing message replay...")
+
+    async with ReplayHarness(cogs=['automod', 'economy', 'utility']) as harness:
+        guild = harness.add_guild(members=5)
+        settings = await harness.bot.db.get_guild_settings(guild.id)
+        settings.automod_enabled = True
+        await harness.bot.db.update_guild_settings(settings)
+
+        author = guild.members[1]
+        channel_id = guild.channel_ids[0]
+
+        await harness.dispatch('MESSAGE_CREATE', payloads.message(
+            channel_id, guild.id, author['user'], 'hello there', author
+        ))
+        user = await harness.bot.db.get_user(int(author['user']['id']), guild.id)
+        assert user is not None and user.xp > 0, user
+        print(f"✅ Leveling stored {user.xp} XP")
+
+        invite = payloads.message(channel_id, guild.id, author['user'], 'join discord.gg/abcdef', author)
+        await harness.dispatch('MESSAGE_CREATE', invite)
+        deletes = harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        assert any(invite['id'] in call.url for call in deletes), harness.api.calls
+        print(f"✅ Automod deleted the invite ({len(harness.api.calls)} outbound calls)")
+
+
+async def _test_antivirus_stops_pipeline():
+    """Test that a message removed by the antivirus never reaches a later stage"""
+    print("🧪 Testing antivirus removal...")
+
+    async with ReplayHarness(cogs=['kcl_antivirus_simple', 'custom_commands', 'economy', 'utility']) as harness:
+        guild = harness.add_guild(members=3)
+        author = guild.members[1]
+        author_id = int(author['user']['id'])
+        await harness.bot.db.add_custom_command(guild.id, 'hello', 'Hi there', author_id)
+        harness.bot.get_cog('Utility').afk_users[author_id] = {'reason': 'lunch', 'time': datetime.utcnow()}
+        commands_processed = []
+
+        async def process_commands(message):
+            commands_processed.append(message.id)
+        harness.bot.process_commands = process_commands
+
+        await harness.dispatch('MESSAGE_CREATE', payloads.message(
+            guild.channel_ids[0], guild.id, author['user'], '-hello', author,
+            attachments=[payloads.attachment('setup.exe'), payloads.attachment('patch.scr')]
+        ))
+        await harness.drain()
+
+        deletes = harness.api.calls_to('DELETE', '/channels/{channel_id}/messages/{message_id}')
+        assert len(deletes) == 1, harness.api.calls
+        assert await harness.bot.db.get_user(author_id, guild.id) is None
+        sent = harness.api.calls_to('POST', '/channels/{channel_id}/messages')
+        assert not any(call.payload.get('content') == 'Hi there' for call in sent), sent
+        assert author_id in harness.bot.get_cog('Utility').afk_users
+        assert not commands_processed
+        print("✅ Deleted once; leveling, custom commands, AFK and commands skipped")
+
+
+async def _test_interaction():
+    """Test that a slash command is answered through the fake webhook adapter"""
+    print("🧪 Testing interaction replay...")
+
+    async with ReplayHarness(cogs=['economy']) as harness:
+        guild = harness.add_guild(members=3)
+        await harness.dispatch('INTERACTION_CREATE', payloads.slash_command(
+            harness.application_id, guild.id, guild.channel_ids[0], guild.members[0], 'balance'
+        ))
+        callbacks = harness.api.calls_to('POST', '/interactions/{webhook_id}/{webhook_token}/callback')
+        assert len(callbacks) == 1, harness.api.calls
+        assert callbacks[0].payload['data']['embeds'], callbacks[0].payload
+        print("✅ /balance responded with an embed")
+
+
+async def _test_synthetic_replay():
+    """Test a mixed synthetic stream round-trips through JSONL and replays cleanly"""
+    print("🧪 Testing synthetic stream replay...")
+
+    async with ReplayHarness() as harness:
+        harness.add_guild('Guild A', members=10)
+        harness.add_guild('Guild B', members=10)
+        events = harness.synthetic_events(200, seed=7)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.jsonl')
+            save_events(path, events)
+            loaded = list(load_events(path))
+        assert len(loaded) == len(events)
+
+        report = await harness.replay(loaded)
+        assert report['total_events'] == 200, report
+        assert report['stragglers'] == 0, report
+        assert {'MESSAGE_CREATE', 'GUILD_MEMBER_ADD'} <= set(report['events']), report
+        print(f"✅ Replayed {report['total_events']} events at {report['events_per_second']:.0f}/s")
+
+
+def test_message_pipeline():
+    asyncio.run(_test_message_pipeline())
+
+
+def test_antivirus_stops_pipeline():
+    asyncio.run(_test_antivirus_stops_pipeline())
+
+
+def test_interaction():
+    asyncio.run(_test_interaction())
+
+
+def test_synthetic_replay():
+    asyncio.run(_test_synthetic_replay())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Replay Harness Tests...\n")
+    test_message_pipeline()
+    test_antivirus_stops_pipeline()
+    test_interaction()
+    test_synthetic_replay()
+    print("\n✅ All replay harness tests passed!")
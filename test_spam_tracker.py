@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for spam tracking
+This script verifies the sliding window trips at the threshold, that guilds
+are tracked separately, that idle and excess pairs are dropped so memory
+stays flat, and that automod keeps one window per (guild, user)
+"""
+
+import asyncio
+import sys
+
+from harness import payloads
+from harness.runner import ReplayHarness
+from utils.spam_tracker import SpamTracker
+
+
+def test_window_trips_at_threshold():
+    """Test that the threshold within the window trips and starts the window over"""
+    print("🧪 Testing sliding window...")
+
+    tracker = SpamTracker(window_seconds=3, threshold=3)
+    assert tracker.record(1, 7, 100, 10, now=0.0) is None
+    assert tracker.record(1, 7, 101, 20, now=1.0) is None
+    # The first message has left the window by now
+    assert tracker.record(1, 7, 102, 10, now=3.5) is None
+    assert tracker.count(1, 7, now=3.5) == 2
+
+    refs = tracker.record(1, 7, 103, 20, now=3.9)
+    assert [ref.message_id for ref in refs] == [101, 102, 103], refs
+    assert [ref.channel_id for ref in refs] == [20, 10, 20]
+    assert (1, 7) not in tracker
+    assert tracker.record(1, 7, 104, 10, now=4.5) is None
+    print("✅ Trips on 3 messages within 3s, then starts over")
+
+
+def test_guilds_tracked_separately():
+    """Test that the same user in two guilds has two windows"""
+    print("🧪 Testing per-guild windows...")
+
+    tracker = SpamTracker(window_seconds=3, threshold=3)
+    for i in range(2):
+        assert tracker.record(1, 7, 100 + i, 10, now=i * 0.1) is None
+        assert tracker.record(2, 7, 200 + i, 20, now=i * 0.1) is None
+    assert len(tracker) == 2
+    assert tracker.count(1, 7, now=0.5) == 2 and tracker.count(2, 7, now=0.5) == 2
+    print("✅ 4 messages over 2 guilds don't trip a threshold of 3")
+
+
+def test_idle_windows_expire():
+    """Test that windows idle longer than the time window are swept"""
+    print("🧪 Testing idle expiry...")
+
+    tracker = SpamTracker(window_seconds=3, threshold=5)
+    for user_id in range(100):
+        tracker.record(1, user_id, user_id, 10, now=0.0)
+    assert len(tracker) == 100
+
+    # Any later message sweeps the idle windows from the front
+    tracker.record(1, 1000, 1000, 10, now=10.0)
+    assert len(tracker) == 1 and tracker.expired == 100
+
+    tracker.record(1, 1001, 1001, 10, now=11.0)
+    assert tracker.sweep(now=20.0) == 2 and len(tracker) == 0
+    print("✅ 100 idle windows dropped on the next message")
+
+
+def test_max_keys_evicts_least_recent():
+    """Test that the least recently active pair is evicted at the cap"""
+    print("🧪 Testing key cap...")
+
+    tracker = SpamTracker(window_seconds=60, threshold=5, max_keys=3)
+    for user_id in range(3):
+        tracker.record(1, user_id, user_id, 10, now=user_id)
+    tracker.record(1, 0, 10, 10, now=3)  # User 0 is the most recent again
+    tracker.record(1, 3, 11, 10, now=4)
+
+    assert len(tracker) == 3 and tracker.evicted == 1
+    assert (1, 1) not in tracker
+    assert all((1, user_id) in tracker for user_id in (0, 2, 3))
+    print("✅ Least recently active pair evicted at 3 keys")
+
+
+def test_memory_stays_flat():
+    """Test that memory is bounded by the key cap over a long run"""
+    print("🧪 Testing memory over a long run...")
+
+    tracker = SpamTracker(window_seconds=3, threshold=5, max_keys=500)
+    now = 0.0
+    samples = []
+    for round_number in range(20):
+        for user_id in range(1000):
+            now += 0.001
+            tracker.record(1, round_number * 1000 + user_id, user_id, 10, now=now)
+        samples.append(tracker.memory_bytes())
+
+    assert len(tracker) <= 500
+    assert max(samples) <= samples[0] * 1.1, samples
+    stats = tracker.stats()
+    assert stats['keys'] == len(tracker) and stats['messages'] == len(tracker)
+    assert stats['bytes'] == tracker.memory_bytes() > 0
+    print(f"✅ 20000 users seen, {stats['keys']} tracked in {stats['bytes']} bytes")
+
+
+def test_counts_without_walking():
+    """Test that the running message count and memory estimate match a full walk"""
+    print("🧪 Testing O(1) counts...")
+
+    tracker = SpamTracker(window_seconds=3, threshold=4, max_keys=50)
+    now = 0.0
+    trips = 0
+    for i in range(2900):
+        # A mix of trips, expiring messages, idle sweeps and evictions
+        now += 5 if i % 500 == 499 else 0.01
+        user_id = (i * 7) % 60 if i % 3 else i % 70
+        trips += tracker.record(i % 2, user_id, i, i % 5, now=now) is not None
+        walked = sum(len(window) for window in tracker.values())
+        assert tracker.item_count() == tracker.messages == walked, (i, tracker.messages, walked)
+    assert trips and tracker.expired and tracker.evicted
+
+    exact = sys.getsizeof(tracker._windows) + sum(
+        sys.getsizeof(key) + sys.getsizeof(window) + sys.getsizeof(window.refs)
+        + sum(sys.getsizeof(ref) for ref in window.refs)
+        for key, window in tracker._windows.items()
+    )
+    assert abs(tracker.memory_bytes() - exact) <= exact * 0.05, (tracker.memory_bytes(), exact)
+    print(f"✅ {tracker.messages} messages counted, {tracker.memory_bytes()} bytes estimated ({exact} walked)")
+
+
+async def _test_automod_windows():
+    """Test that automod records messages per (guild, user) without tripping below the threshold"""
+    print("🧪 Testing automod spam windows...")
+
+    async with ReplayHarness(cogs=['automod']) as harness:
+        guild = harness.add_guild(members=3, channels=2)
+        author = guild.members[1]
+        for i in range(4):
+            await harness.dispatch('MESSAGE_CREATE', payloads.message(
+                guild.channel_ids[i % 2], guild.id, author['user'], f'hello {i}', author
+            ))
+
+        tracker = harness.bot.get_cog('AutoMod').spam_tracker
+        assert tracker.count(guild.id, int(author['user']['id'])) == 4
+        assert not harness.api.calls_to('POST', '/channels/{channel_id}/messages/bulk-delete')
+        assert not harness.api.calls_to('PATCH', '/guilds/{guild_id}/members/{user_id}')
+        print("✅ 4 messages tracked in one window, no action taken")
+
+
+def test_automod_windows():
+    asyncio.run(_test_automod_windows())
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Spam Tracker Tests...\n")
+    test_window_trips_at_threshold()
+    test_guilds_tracked_separately()
+    test_idle_windows_expire()
+    test_max_keys_evicts_least_recent()
+    test_memory_stays_flat()
+    test_counts_without_walking()
+    test_automod_windows()
+    print("\n✅ All spam tracker tests passed!")
@@ -0,0 +1,92 @@
+"""
+Blacklist matching
+A guild's blacklist is compiled into a single regular expression, with plain
+words merged into a character trie, so a message is scanned once no matter
+how many words are banned
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+from utils.normalize import normalize_text
+
+# Edges that count as a word boundary for any entry, including ones that start
+# or end with punctuation (where \b would not match)
+_WORD_START = r'(?<!\w)'
+_WORD_END = r'(?!\w)'
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex source matching any of `words`, longest first, with shared prefixes merged"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a word
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict[str, dict]) -> str:
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if ends_here else group
+
+
+def _wildcard_pattern(entry: str) -> str:
+    """Regex source for an entry with '*' wildcards; each '*' matches the rest of a word"""
+    return _WORD_START + r'\w*'.join(re.escape(part) for part in entry.split('*')) + _WORD_END
+
+
+class BlacklistMatcher:
+    """
+    Compiled blacklist for one guild
+    Plain entries match anywhere in the message, or only as whole words with
+    `whole_words`. Entries containing '*' are wildcard patterns matched
+    against whole words: 'bad*' matches 'badword' but not 'notbad'
+    Entries are normalized like message content, so they keep matching once
+    look-alike characters in a message have been folded
+    """
+
+    def __init__(self, words: Iterable[str], whole_words: bool = False):
+        # Normalized entry -> entry as it was added
+        self.entries: Dict[str, str] = {
+            normalize_text(word).lower(): word.lower() for word in words if word and word.strip('*')
+        }
+        self.literals = sorted(entry for entry in self.entries if '*' not in entry)
+        self.wildcards = sorted(entry for entry in self.entries if '*' in entry)
+        self.whole_words = whole_words
+        self._literal_set = frozenset(self.literals)
+        self._wildcard_regexes = [re.compile(_wildcard_pattern(entry)) for entry in self.wildcards]
+
+        alternatives: List[str] = []
+        if self.literals:
+            trie = _trie_pattern(self.literals)
+            alternatives.append(_WORD_START + trie + _WORD_END if whole_words else trie)
+        alternatives.extend(_wildcard_pattern(entry) for entry in self.wildcards)
+        self.pattern = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def __len__(self) -> int:
+        return len(self.literals) + len(self.wildcards)
+
+    def find(self, content: str) -> Optional[str]:
+        """The first blacklist entry found in `content`, or None"""
+        if self.pattern is None:
+            return None
+        content = content.lower()
+        match = self.pattern.search(content)
+        if match is None:
+            return None
+
+        found = match.group(0)
+        if found in self._literal_set:
+            return self.entries[found]
+        # A wildcard matched; report the entry rather than the word it matched
+        for entry, regex in zip(self.wildcards, self._wildcard_regexes):
+            if regex.fullmatch(found):
+                return self.entries[entry]
+        return found
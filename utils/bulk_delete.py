@@ -0,0 +1,63 @@
+"""
+Bulk message removal
+Messages are tracked as lightweight references (no fetched Message objects)
+and removed with one bulk-delete call per channel and 100 messages, falling
+back to single deletes only for messages too old for bulk delete
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple
+
+import discord
+
+logger = logging.getLogger('discord_bot.bulk_delete')
+
+BULK_DELETE_LIMIT = 100
+# Discord refuses bulk deletes of messages older than two weeks; keep a margin
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=1)
+
+
+class MessageRef(NamedTuple):
+    """Enough of a message to delete it later"""
+    message_id: int
+    channel_id: int
+    timestamp: float
+
+
+def group_by_channel(refs: Iterable[MessageRef]) -> Dict[int, List[int]]:
+    """Channel ID -> message IDs, without duplicates, in the order seen"""
+    grouped: Dict[int, List[int]] = {}
+    for ref in refs:
+        ids = grouped.setdefault(ref.channel_id, [])
+        if ref.message_id not in ids:
+            ids.append(ref.message_id)
+    return grouped
+
+
+async def delete_message_refs(guild: discord.Guild, refs: Iterable[MessageRef], reason: str = None) -> int:
+    """Delete referenced messages in a guild; returns how many were removed"""
+    cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+    deleted = 0
+    for channel_id, message_ids in group_by_channel(refs).items():
+        channel = guild.get_channel_or_thread(channel_id)
+        if channel is None or not hasattr(channel, 'delete_messages'):
+            continue
+
+        recent = [i for i in message_ids if discord.utils.snowflake_time(i) > cutoff]
+        old = [i for i in message_ids if discord.utils.snowflake_time(i) <= cutoff]
+
+        for start in range(0, len(recent), BULK_DELETE_LIMIT):
+            chunk = recent[start:start + BULK_DELETE_LIMIT]
+            try:
+                await channel.delete_messages([discord.Object(i) for i in chunk], reason=reason)
+                deleted += len(chunk)
+            except discord.HTTPException as e:
+                logger.debug(f"Bulk delete of {len(chunk)} messages in channel {channel_id} failed: {e}")
+
+        for message_id in old:
+            try:
+                await channel.get_partial_message(message_id).delete()
+                deleted += 1
+            except discord.HTTPException as e:
+                logger.debug(f"Could not delete message {message_id} in channel {channel_id}: {e}")
+    return deleted
@@ -0,0 +1,175 @@
+"""
+Message content analysis
+One regex pass over a message's (normalized) content finds URLs with their
+hostnames, invite codes and suspicious keywords, and letter and caps counts
+come from C-level string methods. Results are memoized per message ID so
+auto-mod and every antivirus cog share a single analysis
+"""
+import re
+import string
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import discord
+
+import config
+from utils.normalize import normalize_text
+
+URL_PATTERN = re.compile(
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+)
+INVITE_PATTERN = re.compile(r'(?i:discord(?:\.gg|app\.com/invite|\.com/invite))/([a-zA-Z0-9-]+)')
+_KEYWORDS = sorted({keyword.lower() for keyword in config.KCLAntivirus.SUSPICIOUS_KEYWORDS})
+KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in _KEYWORDS), re.IGNORECASE)
+
+# A URL, a bare invite or a keyword, whichever starts first, run over the
+# lower-cased text (case-insensitive matching is several times slower). The
+# lookahead lets the regex engine skip positions that can't start a match
+_FIRST_CHARS = re.escape(''.join(sorted({'h', 'd'} | {keyword[0] for keyword in _KEYWORDS})))
+_TOKEN_PATTERN = re.compile(
+    rf'(?=[{_FIRST_CHARS}])(?:'
+    rf'(?P<url>{URL_PATTERN.pattern})'
+    rf'|(?P<invite>discord(?:\.gg|app\.com/invite|\.com/invite)/(?P<code>[a-z0-9-]+))'
+    rf'|(?P<keyword>{"|".join(re.escape(keyword) for keyword in _KEYWORDS)}))'
+)
+_ASCII_UPPERCASE = string.ascii_uppercase.encode()
+_ASCII_LETTERS = string.ascii_letters.encode()
+_INVITE_HOSTS = {'discord.gg', 'discord.com', 'discordapp.com'}
+
+
+class ContentAnalysis:
+    """What one message's content contains, found in a single regex pass"""
+
+    def __init__(self, content: str, mentions: int = 0, role_mentions: int = 0,
+                 mentions_everyone: bool = False):
+        self.content = content
+        self.normalized = normalize_text(content)
+        self.mentions = mentions
+        self.role_mentions = role_mentions
+        self.mentions_everyone = mentions_everyone
+        self.letters = 0
+        self.uppercase = 0
+        self.urls: List[str] = []
+        self.hostnames: List[str] = []
+        self.invite_codes: List[str] = []
+        self.keyword_hits: Dict[str, int] = {}
+        self._scan()
+
+    def _scan(self):
+        text = self.normalized
+        self._count_letters(text)
+
+        lowered = text.lower()
+        # URLs and invite codes are case-sensitive; cut them from the original
+        # text unless lower-casing moved the offsets (a few non-Latin letters)
+        source = text if len(lowered) == len(text) else lowered
+        for match in _TOKEN_PATTERN.finditer(lowered):
+            kind = match.lastgroup
+            if kind == 'url':
+                self._add_url(source[match.start():match.end()])
+            elif kind == 'invite':
+                self.invite_codes.append(source[match.start('code'):match.end('code')])
+                if match.group().startswith('discord.gg'):
+                    self._hit('discord.gg')
+                # The invite token swallowed its code; keywords in it still count
+                for keyword in KEYWORD_PATTERN.findall(match.group('code')):
+                    self._hit(keyword)
+            else:
+                self._hit(match.group())
+
+        # Invites spelled out with spaces only show up once whitespace is removed
+        if not self.invite_codes and 'discord' in self.compact:
+            self.invite_codes.extend(INVITE_PATTERN.findall(self.compact))
+
+    def _count_letters(self, text: str):
+        if text.isascii():
+            data = text.encode('ascii')
+            self.letters = len(data) - len(data.translate(None, _ASCII_LETTERS))
+            self.uppercase = len(data) - len(data.translate(None, _ASCII_UPPERCASE))
+        else:
+            self.letters = sum(map(str.isalpha, text))
+            self.uppercase = sum(map(str.isupper, text))
+
+    def _hit(self, keyword: str):
+        self.keyword_hits[keyword] = self.keyword_hits.get(keyword, 0) + 1
+
+    def _add_url(self, url: str):
+        self.urls.append(url)
+        try:
+            hostname = (urlsplit(url).hostname or '').lower()
+        except ValueError:
+            hostname = ''
+        self.hostnames.append(hostname)
+        if hostname in _INVITE_HOSTS:
+            invite = INVITE_PATTERN.search(url)
+            if invite:
+                self.invite_codes.append(invite.group(1))
+                # Only the short form counts as the 'discord.gg' keyword
+                if hostname == 'discord.gg':
+                    self._hit('discord.gg')
+        for keyword in KEYWORD_PATTERN.findall(url):
+            self._hit(keyword.lower())
+
+    @cached_property
+    def compact(self) -> str:
+        """Normalized, lower-cased content without whitespace"""
+        return ''.join(self.normalized.split()).lower()
+
+    @property
+    def length(self) -> int:
+        return len(self.content)
+
+    @property
+    def caps_ratio(self) -> float:
+        """Share of letters that are upper case (0 without letters)"""
+        return self.uppercase / self.letters if self.letters else 0.0
+
+    @property
+    def mention_count(self) -> int:
+        """User and role mentions"""
+        return self.mentions + self.role_mentions
+
+
+class ContentAnalyzer:
+    """Memoizes ContentAnalysis per message ID, keeping the `max_entries` most recent"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[int, ContentAnalysis]' = OrderedDict()
+
+    def analyze(self, message: discord.Message) -> ContentAnalysis:
+        """Analysis of the message's current content (an edit is analyzed again)"""
+        cached = self._cache.get(message.id)
+        if cached is not None and cached.content == message.content:
+            self.hits += 1
+            self._cache.move_to_end(message.id)
+            return cached
+
+        self.misses += 1
+        analysis = ContentAnalysis(
+            message.content,
+            len(message.mentions),
+            len(message.role_mentions),
+            message.mention_everyone
+        )
+        self._cache[message.id] = analysis
+        self._cache.move_to_end(message.id)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return analysis
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Shared by the message pipeline and the cogs that listen to messages directly
+analyzer = ContentAnalyzer()
+
+
+def analyze_message(message: discord.Message) -> ContentAnalysis:
+    """Shared, memoized analysis of a message"""
+    return analyzer.analyze(message)
@@ -4,7 +4,9 @@ Helper functions for various bot operations
 import discord
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Iterable, List, Optional, Union
+
+import config
 
 def parse_time(time_str: str) -> Optional[timedelta]:
     """
@@ -149,6 +151,37 @@ def extract_urls(text: str) -> list[str]:
     )
     return url_pattern.findall(text)
 
+async def get_all_members(guild: discord.Guild, cache: Optional[bool] = None) -> List[discord.Member]:
+    """
+    Get every member of a guild
+    The member cache may be partial (see MEMBER_CACHE_POLICY), so the list is
+    requested from Discord when the guild hasn't been chunked yet. The result
+    is only kept in the cache when the policy caches every member (or `cache`
+    says so), so one bulk command doesn't undo a restrictive policy
+    """
+    if guild.chunked:
+        return list(guild.members)
+    if cache is None:
+        cache = config.MEMBER_CACHE_POLICY.strip().lower() == 'all'
+    return await guild.chunk(cache=cache)
+
+async def get_members_by_id(guild: discord.Guild, user_ids: Iterable[int]) -> List[discord.Member]:
+    """Get members by ID: cached ones first, the rest requested in batches of 100"""
+    members = []
+    missing = []
+    for user_id in user_ids:
+        member = guild.get_member(user_id)
+        if member:
+            members.append(member)
+        else:
+            missing.append(user_id)
+    
+    for i in range(0, len(missing), 100):
+        batch = missing[i:i + 100]
+        # query_members returns at most 5 members unless told otherwise
+        members.extend(await guild.query_members(user_ids=batch, limit=len(batch), cache=False))
+    return members
+
 def calculate_percentage(part: int, whole: int) -> float:
     """Calculate percentage"""
     if whole == 0:
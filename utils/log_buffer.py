@@ -0,0 +1,175 @@
+"""
+Coalesced log channel sends
+Log embeds are queued per destination channel and flushed on an interval (or
+as soon as a channel has a full message's worth), packing up to 10 embeds
+into each send instead of one message per event
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import discord
+
+from utils.metrics import LOG_EMBEDS
+
+logger = logging.getLogger('discord_bot.log_buffer')
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def pack_embeds(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Split embeds into message-sized batches (at most 10 embeds and 6000 characters each)"""
+    batches = []
+    batch, chars = [], 0
+    for embed in embeds:
+        size = len(embed)
+        if batch and (len(batch) >= MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS_PER_MESSAGE):
+            batches.append(batch)
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class LogBuffer:
+    """
+    Per-channel queues of pending log embeds
+    Each queue holds at most `max_pending` embeds; when it overflows the oldest
+    embed is dropped and counted, so a flood of events can't grow memory or the
+    send backlog without bound. Batches go through `webhooks` (a LogWebhooks)
+    when given, and are sent as the bot where no webhook is available. With an
+    `outbound` queue, each flush first lets queued notices go out (for up to
+    one interval), so logs stay the lowest priority
+    """
+
+    def __init__(self, flush_interval: float = 2.0, max_pending: int = 100, webhooks=None, outbound=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.webhooks = webhooks
+        self.outbound = outbound
+        self.queues: Dict[int, Deque[discord.Embed]] = {}
+        self.channels: Dict[int, discord.abc.Messageable] = {}
+        self.dropped = 0
+        self.failed = 0
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, channel: discord.abc.Messageable, embed: discord.Embed) -> bool:
+        """Queue an embed for a channel; returns False if an older embed was dropped to make room"""
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = deque(maxlen=self.max_pending)
+        self.channels[channel.id] = channel
+
+        overflowed = len(queue) == queue.maxlen
+        if overflowed:
+            self.dropped += 1
+            LOG_EMBEDS.inc(outcome='dropped')
+        queue.append(embed)
+        LOG_EMBEDS.inc(outcome='queued')
+
+        if len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            self._wakeup.set()
+        return not overflowed
+
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'channels': len(self.queues),
+            'pending': self.pending(),
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'sent_messages': self.sent_messages,
+            'sent_embeds': self.sent_embeds,
+        }
+
+    def start(self):
+        """Start the flush loop on the running loop"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and send whatever is still queued"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self.outbound:
+                await self.outbound.wait_idle(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Log buffer flush failed: {e}")
+
+    async def flush(self):
+        """Send every queued embed, channels in parallel and each channel in order"""
+        async with self._flush_lock:
+            channel_ids = [channel_id for channel_id, queue in self.queues.items() if queue]
+            if channel_ids:
+                await asyncio.gather(*(self._flush_channel(channel_id) for channel_id in channel_ids))
+            # Forget channels that went quiet
+            for channel_id in [channel_id for channel_id, queue in self.queues.items() if not queue]:
+                del self.queues[channel_id]
+                self.channels.pop(channel_id, None)
+
+    async def _flush_channel(self, channel_id: int):
+        queue = self.queues[channel_id]
+        channel = self.channels[channel_id]
+        embeds = list(queue)
+        queue.clear()
+
+        batches = pack_embeds(embeds)
+        for i, batch in enumerate(batches):
+            try:
+                if not await self._send_webhook(channel, batch):
+                    await channel.send(embeds=batch)
+            except (discord.Forbidden, discord.NotFound) as e:
+                # The bot can't post in the channel (or it is gone); the rest of the queue would fail too
+                lost = sum(len(remaining) for remaining in batches[i:])
+                self._record_failure(lost)
+                logger.debug(f"Dropping {lost} log embeds for channel {channel_id}: {e}")
+                return
+            except Exception as e:
+                self._record_failure(len(batch))
+                logger.debug(f"Failed to send {len(batch)} log embeds to channel {channel_id}: {e}")
+                continue
+            self.sent_messages += 1
+            self.sent_embeds += len(batch)
+            LOG_EMBEDS.inc(len(batch), outcome='sent')
+
+    async def _send_webhook(self, channel: discord.abc.Messageable, batch: List[discord.Embed]) -> bool:
+        """Post a batch through the channel's webhook; False means send it as the bot"""
+        if not self.webhooks:
+            return False
+        try:
+            return await self.webhooks.send(channel, batch)
+        except Exception as e:
+            # A webhook we can't use says nothing about the bot's own access
+            logger.debug(f"Log webhook for channel {channel.id} failed, sending as the bot: {e}")
+            return False
+
+    def _record_failure(self, count: int):
+        self.failed += count
+        LOG_EMBEDS.inc(count, outcome='failed')
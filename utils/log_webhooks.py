@@ -0,0 +1,128 @@
+"""
+Webhook log sink
+Log embeds are posted through one webhook per log channel instead of as the
+bot, so heavy log channels stop competing with the bot's own per-channel send
+limit; webhooks are created on first use and kept in the database
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+import discord
+
+from utils.metrics import http_trace_config
+
+logger = logging.getLogger('discord_bot.log_webhooks')
+
+
+class LogWebhooks:
+    """
+    Finds, creates and posts through log channel webhooks
+    Channels where the bot can't manage webhooks are remembered for
+    `retry_seconds`, and the caller sends to them as the bot instead
+    """
+
+    def __init__(self, bot, name: str = 'KCL Logs', retry_seconds: float = 600):
+        self.bot = bot
+        self.name = name
+        self.retry_seconds = retry_seconds
+        self.webhooks: Dict[int, discord.Webhook] = {}
+        self.unavailable: Dict[int, float] = {}  # Channel ID -> monotonic time to try again
+        self.created = 0
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def start(self):
+        """Open the shared HTTP session (needs a running loop)"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(trace_configs=[http_trace_config()])
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def send(self, channel: discord.abc.GuildChannel, embeds: List[discord.Embed]) -> bool:
+        """Post embeds through the channel's webhook; False means send them as the bot instead"""
+        if self.session is None:
+            return False
+        webhook = await self.get_webhook(channel)
+        if webhook is None:
+            return False
+        try:
+            await self._post(webhook, embeds)
+        except discord.NotFound:
+            # Someone deleted the webhook; make a new one and try once more
+            logger.info(f"Log webhook for channel {channel.id} is gone, recreating it")
+            await self.forget(channel.id)
+            webhook = await self.get_webhook(channel)
+            if webhook is None:
+                return False
+            try:
+                await self._post(webhook, embeds)
+            except discord.HTTPException as e:
+                # Don't let this look like the channel is gone; send as the bot instead
+                logger.warning(f"Recreated log webhook for channel {channel.id} failed too: {e}")
+                await self.forget(channel.id)
+                self.unavailable[channel.id] = time.monotonic() + self.retry_seconds
+                return False
+        return True
+
+    async def _post(self, webhook: discord.Webhook, embeds: List[discord.Embed]):
+        user = self.bot.user
+        await webhook.send(
+            embeds=embeds,
+            username=user.name if user else self.name,
+            avatar_url=user.display_avatar.url if user else discord.utils.MISSING
+        )
+
+    async def get_webhook(self, channel: discord.abc.GuildChannel) -> Optional[discord.Webhook]:
+        """The channel's webhook, loaded from the database or created; None if unavailable"""
+        webhook = self.webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+        if time.monotonic() < self.unavailable.get(channel.id, 0):
+            return None
+
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            webhook = self.webhooks.get(channel.id)
+            if webhook is not None:
+                return webhook
+
+            stored = await self.bot.db.get_log_webhook(channel.id)
+            if stored:
+                webhook = self._partial(stored.webhook_id, stored.webhook_token)
+            else:
+                webhook = await self._create(channel)
+                if webhook is None:
+                    self.unavailable[channel.id] = time.monotonic() + self.retry_seconds
+                    return None
+            self.webhooks[channel.id] = webhook
+            self.unavailable.pop(channel.id, None)
+            return webhook
+
+    async def _create(self, channel: discord.abc.GuildChannel) -> Optional[discord.Webhook]:
+        me = channel.guild.me
+        if not hasattr(channel, 'create_webhook') or me is None or not channel.permissions_for(me).manage_webhooks:
+            return None
+        try:
+            created = await channel.create_webhook(name=self.name, reason="Log channel webhook")
+        except discord.HTTPException as e:
+            logger.warning(f"Could not create a log webhook in channel {channel.id}: {e}")
+            return None
+
+        await self.bot.db.set_log_webhook(channel.id, channel.guild.id, created.id, created.token)
+        self.created += 1
+        logger.info(f"Created log webhook {created.id} in channel {channel.id}")
+        return self._partial(created.id, created.token)
+
+    def _partial(self, webhook_id: int, token: str) -> discord.Webhook:
+        return discord.Webhook.partial(webhook_id, token, session=self.session)
+
+    async def forget(self, channel_id: int):
+        """Drop a channel's webhook from the cache and the database"""
+        self.webhooks.pop(channel_id, None)
+        await self.bot.db.remove_log_webhook(channel_id)
@@ -0,0 +1,196 @@
+"""
+Logging setup
+Records are handed to a background thread through a queue so the event loop
+never waits on file I/O; the file output is rotated JSON lines
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        # Structured fields passed with extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-logger sampling and rate limiting for high-volume events
+    Rules match a logger and its children; WARNING and above always pass
+    """
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._rules: Dict[str, tuple] = {}  # logger name -> (rate logger, sample rate, limit)
+        self._buckets: Dict[str, list] = {}  # rate logger -> [tokens, last refill, suppressed]
+
+    @staticmethod
+    def _match(name: str, table: Dict[str, float]) -> Optional[str]:
+        """Find the most specific configured logger covering `name`"""
+        while name:
+            if name in table:
+                return name
+            name = name.rpartition('.')[0]
+        return None
+
+    def _rule_for(self, name: str) -> tuple:
+        rule = self._rules.get(name)
+        if rule is None:
+            sample_key = self._match(name, self.sample_rates)
+            limit_key = self._match(name, self.rate_limits)
+            rule = (
+                limit_key,
+                self.sample_rates[sample_key] if sample_key else 1.0,
+                self.rate_limits[limit_key] if limit_key else None
+            )
+            self._rules[name] = rule
+        return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        limit_key, sample_rate, limit = self._rule_for(record.name)
+
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return False
+
+        if limit is None:
+            return True
+
+        # Token bucket holding up to one second of records
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(limit_key, [limit, now, 0])
+        bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps `extra` fields and exception text separate from the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener that tracks whether it runs, so stop() is safe to call more than once"""
+
+    running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        """Flush and stop the writer thread"""
+        if self.running:
+            self.running = False
+            super().stop()
+
+
+def parse_logger_values(value: str) -> Dict[str, float]:
+    """Parse 'logger=value,logger=value' into a dict"""
+    result = {}
+    for item in value.split(','):
+        name, sep, number = item.strip().partition('=')
+        if sep and name.strip():
+            result[name.strip()] = float(number)
+    return result
+
+
+def setup_logging(level: str = 'INFO', log_file: Optional[str] = 'bot.log', json_format: bool = True,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, rotate_when: str = '',
+                  sample_rates: Optional[Dict[str, float]] = None,
+                  rate_limits: Optional[Dict[str, float]] = None,
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer thread
+    Files rotate by size, or by time when `rotate_when` is set (e.g. 'midnight')
+    """
+    handlers = []
+
+    if console:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        handlers.append(stream_handler)
+
+    if log_file:
+        if rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+        file_handler.setFormatter(
+            JsonFormatter() if json_format
+            else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        )
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates, rate_limits))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,120 @@
+"""
+Event loop lag monitor
+Measures how late the loop wakes up and, when it stalls past a threshold,
+captures the stack of whatever is blocking it
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger('discord_bot.loop_monitor')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LoopLagMonitor:
+    """
+    Samples event loop lag from a coroutine and watches for stalls from a thread
+    The coroutine records how late each sleep wakes up; the thread notices when
+    the loop hasn't ticked for `threshold_ms` and grabs the loop thread's stack
+    """
+
+    def __init__(self, interval_ms: int = 100, threshold_ms: int = 250,
+                 report_seconds: int = 300, max_samples: int = 3000, max_stalls: int = 20):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.report_seconds = report_seconds
+        self.samples: Deque[float] = deque(maxlen=max_samples)  # Lag in ms
+        self.stalls: Deque[Dict] = deque(maxlen=max_stalls)
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start sampling on the running loop"""
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample_loop())
+        self._thread = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Loop lag monitor started (interval {self.interval * 1000:.0f} ms, "
+            f"threshold {self.threshold * 1000:.0f} ms)"
+        )
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample_loop(self):
+        last_report = time.monotonic()
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+            self.samples.append(max(0.0, (now - start - self.interval) * 1000))
+
+            if self.report_seconds and now - last_report >= self.report_seconds:
+                last_report = now
+                stats = self.stats()
+                logger.info(
+                    f"Loop lag p50 {stats['p50']:.1f} ms, p90 {stats['p90']:.1f} ms, "
+                    f"p99 {stats['p99']:.1f} ms, max {stats['max']:.1f} ms",
+                    extra={'loop_lag': stats}
+                )
+
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack while it is stalled"""
+        reported_tick = None
+        while not self._stop.wait(self.threshold / 2):
+            last_tick = self._last_tick
+            stalled_for = time.monotonic() - last_tick - self.interval
+            if stalled_for < self.threshold or reported_tick == last_tick:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_tick = last_tick
+            stack = ''.join(traceback.format_stack(frame))
+            self.stalls.append({
+                'time': time.time(),
+                'stalled_ms': round(stalled_for * 1000, 1),
+                'stack': stack,
+            })
+            logger.warning(
+                f"Event loop blocked for {stalled_for * 1000:.0f} ms so far:\n{stack}",
+                extra={'stalled_ms': round(stalled_for * 1000, 1)}
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """Lag percentiles (ms) over the retained samples"""
+        values = sorted(self.samples)
+        return {
+            'samples': len(values),
+            'p50': percentile(values, 0.50),
+            'p90': percentile(values, 0.90),
+            'p99': percentile(values, 0.99),
+            'max': values[-1] if values else 0.0,
+            'stalls': len(self.stalls),
+        }
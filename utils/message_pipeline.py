@@ -0,0 +1,184 @@
+"""
+Central message processing pipeline
+Builds one context per message and runs registered cog stages in priority order
+"""
+import discord
+import logging
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import config
+from database.models import GuildSettings, AntivirusSettings
+from utils.content_analysis import ContentAnalysis, analyze_message
+from utils.metrics import LISTENER_SECONDS
+
+logger = logging.getLogger('discord_bot.pipeline')
+
+
+class MessageContext:
+    """Everything the stages need to know about one message, computed once"""
+
+    def __init__(self, message: discord.Message, guild_settings: Optional[GuildSettings] = None,
+                 antivirus_settings: Optional[AntivirusSettings] = None):
+        self.message = message
+        self.guild_settings = guild_settings
+        self.antivirus_settings = antivirus_settings
+        self.antivirus_protected = False
+        self.deleted = False  # Set by a stage once it removed the message
+
+    @cached_property
+    def is_moderator(self) -> bool:
+        """Author can manage messages (exempt from auto-moderation)"""
+        return self.message.author.guild_permissions.manage_messages
+
+    @cached_property
+    def role_ids(self) -> set:
+        """IDs of the author's roles"""
+        return {role.id for role in getattr(self.message.author, 'roles', [])}
+
+    @cached_property
+    def analysis(self) -> ContentAnalysis:
+        """Single-pass content analysis, shared with cogs outside the pipeline"""
+        return analyze_message(self.message)
+
+    @property
+    def urls(self) -> List[str]:
+        """URLs found in the message content"""
+        return self.analysis.urls
+
+    @property
+    def normalized_content(self) -> str:
+        """Content with look-alike, styled and invisible characters folded to plain text"""
+        return self.analysis.normalized
+
+    @property
+    def compact_content(self) -> str:
+        """Normalized, lower-cased content without whitespace, for spaced-out evasion"""
+        return self.analysis.compact
+
+    @property
+    def mention_count(self) -> int:
+        """Number of user and role mentions"""
+        return self.analysis.mention_count
+
+    @cached_property
+    def command_trigger(self) -> Optional[str]:
+        """Lower-cased first word after the prefix, if the message uses the prefix"""
+        content = self.message.content
+        if not content.startswith(config.PREFIX):
+            return None
+        words = content[len(config.PREFIX):].split()
+        return words[0].lower() if words else None
+
+
+@dataclass
+class Stage:
+    """A registered message handler"""
+    name: str
+    handler: Callable[[MessageContext], Awaitable[bool]]
+    priority: int
+    enabled: Optional[Callable[[GuildSettings, AntivirusSettings], bool]] = None
+    guild_only: bool = True
+
+
+class MessagePipeline:
+    """Runs registered stages for each message, stopping once one deletes it"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.stages: List[Stage] = []
+        # guild_id -> (settings version, enabled stages)
+        self._plans: Dict[int, Tuple[int, List[Stage]]] = {}
+        self._dm_stages: List[Stage] = []
+
+    def register(self, name: str, handler: Callable[[MessageContext], Awaitable[bool]], priority: int,
+                 enabled: Optional[Callable[[GuildSettings, AntivirusSettings], bool]] = None,
+                 guild_only: bool = True):
+        """Register a stage; handlers return True once they removed the message"""
+        self.unregister(name)
+        self.stages.append(Stage(name, handler, priority, enabled, guild_only))
+        self.stages.sort(key=lambda stage: stage.priority)
+        self._rebuild()
+
+    def unregister(self, name: str):
+        """Remove a stage by name"""
+        self.stages = [stage for stage in self.stages if stage.name != name]
+        self._rebuild()
+
+    def _rebuild(self):
+        """Drop cached per-guild plans after the stage list changed"""
+        self._plans.clear()
+        self._dm_stages = [stage for stage in self.stages if not stage.guild_only]
+
+    def _plan_for(self, guild_id: int, guild_settings: GuildSettings,
+                  antivirus_settings: AntivirusSettings) -> List[Stage]:
+        """Get the enabled stages for a guild, recomputed only when settings change"""
+        version = self.bot.db.settings_version
+        cached = self._plans.get(guild_id)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        plan = [
+            stage for stage in self.stages
+            if stage.enabled is None or stage.enabled(guild_settings, antivirus_settings)
+        ]
+        self._plans[guild_id] = (version, plan)
+        return plan
+
+    async def build_context(self, message: discord.Message) -> MessageContext:
+        """Load settings and permission flags for a guild message"""
+        db = self.bot.db
+        guild_id = message.guild.id
+        ctx = MessageContext(
+            message,
+            await db.get_guild_settings(guild_id),
+            await db.get_antivirus_settings(guild_id)
+        )
+
+        if ctx.antivirus_settings.enabled:
+            author = message.author
+            perms = author.guild_permissions
+            if (author.id == self.bot.owner_id or perms.administrator or
+                    perms.manage_guild or perms.manage_messages):
+                ctx.antivirus_protected = True
+            else:
+                protected_roles = await db.get_antivirus_protected_roles(guild_id)
+                ctx.antivirus_protected = not ctx.role_ids.isdisjoint(protected_roles)
+
+        return ctx
+
+    async def process(self, message: discord.Message) -> Optional[MessageContext]:
+        """Run all enabled stages for a message; returns the context (None for bot messages)"""
+        if message.author.bot:
+            return None
+
+        if not message.guild:
+            ctx = MessageContext(message)
+            stages = self._dm_stages
+        else:
+            ctx = await self.build_context(message)
+            stages = self._plan_for(message.guild.id, ctx.guild_settings, ctx.antivirus_settings)
+
+        for stage in stages:
+            start = time.perf_counter()
+            try:
+                if await stage.handler(ctx):
+                    ctx.deleted = True
+                    break
+            except Exception as e:
+                logger.error(f"Message stage {stage.name} failed: {e}", exc_info=e)
+            finally:
+                LISTENER_SECONDS.observe(time.perf_counter() - start, listener=f'pipeline.{stage.name}')
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Message processed", extra={
+                'guild_id': message.guild.id if message.guild else None,
+                'channel_id': message.channel.id,
+                'author_id': message.author.id,
+                'stages': len(stages),
+                'deleted': ctx.deleted,
+            })
+
+        return ctx
@@ -0,0 +1,236 @@
+"""
+Prometheus metrics
+Minimal counters, histograms and callback gauges rendered in the Prometheus
+text format, plus the helpers that instrument the bot
+"""
+import inspect
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labels, key)} {value}'
+            for key, value in self.values.items()
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.values: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[i] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, entry in self.values.items():
+            for bound, count in zip(self.buckets, entry):
+                labels = _format_labels(self.labels + ('le',), key + (bound,))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            lines.append(f'{self.name}_bucket{_format_labels(self.labels + ("le",), key + ("+Inf",))} {entry[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {entry[-2]}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {entry[-1]}')
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose values are read from a callback at scrape time"""
+
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...],
+                 callback: Callable[[], Dict[tuple, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labels, key)} {value}'
+            for key, value in self.callback().items()
+        ]
+
+
+class MetricsRegistry:
+    """Holds every metric and renders the exposition text"""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+GATEWAY_EVENTS = REGISTRY.register(Counter(
+    'discord_gateway_events_total', 'Gateway events received, by type', ('event',)
+))
+LISTENER_SECONDS = REGISTRY.register(Histogram(
+    'discord_listener_seconds', 'Time spent in event listeners and message pipeline stages', ('listener',)
+))
+COMMAND_SECONDS = REGISTRY.register(Histogram(
+    'discord_command_seconds', 'Wall time of app and prefix commands, including DB and HTTP awaits',
+    ('command', 'kind', 'status')
+))
+DB_SECONDS = REGISTRY.register(Histogram(
+    'bot_db_method_seconds', 'DatabaseManager method latency', ('method',)
+))
+DB_ERRORS = REGISTRY.register(Counter(
+    'bot_db_method_errors_total', 'DatabaseManager methods that raised', ('method',)
+))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    'bot_http_request_seconds', 'Outgoing HTTP request latency (VirusTotal etc.)', ('host', 'method', 'status')
+))
+DISCORD_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'discord_api_request_seconds', 'Discord REST request latency including rate-limit waits',
+    ('method', 'route', 'outcome', 'code')
+))
+OUTBOUND_ACTIONS = REGISTRY.register(Counter(
+    'bot_outbound_actions_total', 'Deletes, timeouts, warnings and DMs by priority and outcome',
+    ('priority', 'outcome')
+))
+LOG_EMBEDS = REGISTRY.register(Counter(
+    'bot_log_embeds_total', 'Log channel embeds by outcome (queued, sent, dropped, failed)', ('outcome',)
+))
+
+
+def instrument_async_methods(obj, histogram: Histogram, errors: Optional[Counter] = None,
+                             exclude: Iterable[str] = ()):
+    """Wrap an object's public coroutine methods (on the instance) to time each call"""
+    exclude = set(exclude)
+    for name, method in inspect.getmembers(obj, inspect.iscoroutinefunction):
+        if name.startswith('_') or name in exclude:
+            continue
+
+        def wrap(method, name):
+            @wraps(method)
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                except Exception:
+                    if errors:
+                        errors.inc(method=name)
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start, method=name)
+            return timed
+
+        setattr(obj, name, wrap(method, name))
+
+
+def instrument_discord_http(http):
+    """Time every Discord REST call made through a discord.py HTTPClient"""
+    request = http.request
+
+    @wraps(request)
+    async def timed_request(route, **kwargs):
+        start = time.perf_counter()
+        # request() only returns for a 2xx response and hands back the body,
+        # not the response, so successes are recorded as a status class
+        outcome, code = 'ok', '2xx'
+        try:
+            return await request(route, **kwargs)
+        except Exception as e:
+            status = getattr(e, 'status', None)
+            outcome, code = 'error', str(status) if status is not None else type(e).__name__
+            raise
+        finally:
+            DISCORD_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, method=route.method, route=route.path, outcome=outcome, code=code
+            )
+
+    http.request = timed_request
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp trace config recording request latency and status per host"""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        HTTP_SECONDS.observe(
+            time.perf_counter() - context.start,
+            host=params.url.host, method=params.method, status=params.response.status
+        )
+
+    async def on_request_exception(session, context, params):
+        HTTP_SECONDS.observe(
+            time.perf_counter() - context.start,
+            host=params.url.host, method=params.method, status=type(params.exception).__name__
+        )
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
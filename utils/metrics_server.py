@@ -0,0 +1,131 @@
+"""
+Metrics HTTP server
+Serves /metrics (Prometheus text format), /health (liveness) and /ready
+"""
+import logging
+import math
+from typing import Dict
+
+from aiohttp import web
+
+from utils.metrics import REGISTRY, CallbackGauge
+
+logger = logging.getLogger('discord_bot.metrics')
+
+# (cog name, attribute) of in-memory structures worth watching
+TRACKED_STRUCTURES = [
+    ('AutoMod', 'spam_tracker'),
+    ('KCLAntivirusSimple', 'user_joins'),
+    ('KCLAntivirusSimple', 'message_activity'),
+    ('KCLAntivirusSimple', 'scan_cooldowns'),
+    ('KCLAntivirusAdvanced', 'threat_cache'),
+    ('Utility', 'afk_users'),
+]
+
+
+class MetricsServer:
+    """Small aiohttp server exposing the bot's metrics"""
+
+    def __init__(self, bot, host: str, port: int):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.runner = None
+
+        REGISTRY.register(CallbackGauge(
+            'bot_structure_entries', 'Top-level entries in in-memory structures', ('cog', 'structure'),
+            self._structure_sizes
+        ))
+        REGISTRY.register(CallbackGauge(
+            'bot_structure_items', 'Items held across all keys of in-memory structures', ('cog', 'structure'),
+            self._structure_items
+        ))
+        REGISTRY.register(CallbackGauge(
+            'discord_guilds', 'Guilds this process serves', (), lambda: {(): len(self.bot.guilds)}
+        ))
+        REGISTRY.register(CallbackGauge(
+            'discord_shard_latency_seconds', 'Gateway heartbeat latency per shard', ('shard',),
+            lambda: {
+                (shard_id,): shard.latency for shard_id, shard in self.bot.gateway_shards().items()
+                if math.isfinite(shard.latency)
+            }
+        ))
+        REGISTRY.register(CallbackGauge(
+            'bot_settings_cache_entries', 'Cached settings rows', ('cache',), self._settings_cache_sizes
+        ))
+        REGISTRY.register(CallbackGauge(
+            'bot_outbound_pending', 'Queued warnings and DMs waiting for a worker', (),
+            lambda: {(): self.bot.outbound.pending()}
+        ))
+        REGISTRY.register(CallbackGauge(
+            'bot_log_buffer_pending', 'Log channel embeds waiting to be sent', (),
+            lambda: {(): self.bot.log_buffer.pending()}
+        ))
+        REGISTRY.register(CallbackGauge(
+            'bot_spam_tracker_bytes', 'Approximate memory held by auto-mod spam tracking', (),
+            self._spam_tracker_bytes
+        ))
+
+    def _structures(self):
+        for cog_name, attribute in TRACKED_STRUCTURES:
+            cog = self.bot.get_cog(cog_name)
+            structure = getattr(cog, attribute, None) if cog else None
+            if structure is not None:
+                yield (cog_name, attribute), structure
+
+    def _structure_sizes(self) -> Dict[tuple, float]:
+        return {key: len(structure) for key, structure in self._structures()}
+
+    def _structure_items(self) -> Dict[tuple, float]:
+        return {
+            key: self._item_count(structure) for key, structure in self._structures()
+        }
+
+    @staticmethod
+    def _item_count(structure) -> int:
+        # Structures that keep their own count spare the scrape a walk over every key
+        if hasattr(structure, 'item_count'):
+            return structure.item_count()
+        return sum(len(value) if hasattr(value, '__len__') else 1 for value in structure.values())
+
+    def _spam_tracker_bytes(self) -> Dict[tuple, float]:
+        cog = self.bot.get_cog('AutoMod')
+        tracker = getattr(cog, 'spam_tracker', None) if cog else None
+        return {(): tracker.memory_bytes()} if tracker is not None else {}
+
+    def _settings_cache_sizes(self) -> Dict[tuple, float]:
+        if not self.bot.db:
+            return {}
+        stats = self.bot.db.get_settings_cache_stats()
+        return {('guild',): stats['guild_settings'], ('antivirus',): stats['antivirus_settings']}
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=REGISTRY.render(), content_type='text/plain', charset='utf-8')
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok'})
+
+    async def ready(self, request: web.Request) -> web.Response:
+        ready = self.bot.is_ready() and self.bot.db is not None and self.bot.db.connection is not None
+        return web.json_response(
+            {'ready': ready, 'guilds': len(self.bot.guilds)},
+            status=200 if ready else 503
+        )
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/metrics', self.metrics)
+        app.router.add_get('/health', self.health)
+        app.router.add_get('/ready', self.ready)
+        return app
+
+    async def start(self):
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"Metrics server listening on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,70 @@
+"""
+Text normalization for content checks
+Folds the usual filter-evasion tricks (fullwidth and styled letters, accents,
+Cyrillic and Greek look-alikes, zero-width characters, s p a c e d letters)
+back to plain text with C-level str methods, so checks never loop over
+characters in Python
+"""
+import unicodedata
+from typing import Dict
+
+# Look-alike letters that NFKC leaves alone, mapped to the Latin letter they imitate
+CONFUSABLES = {
+    # Cyrillic
+    'а': 'a', 'в': 'b', 'е': 'e', 'ё': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o',
+    'р': 'p', 'с': 'c', 'т': 't', 'у': 'y', 'х': 'x', 'ѕ': 's', 'і': 'i', 'ї': 'i',
+    'ј': 'j', 'ԁ': 'd', 'ԛ': 'q', 'ԝ': 'w', 'һ': 'h', 'ү': 'y', 'ɡ': 'g',
+    'А': 'A', 'В': 'B', 'Е': 'E', 'К': 'K', 'М': 'M', 'Н': 'H', 'О': 'O', 'Р': 'P',
+    'С': 'C', 'Т': 'T', 'У': 'Y', 'Х': 'X', 'Ѕ': 'S', 'І': 'I', 'Ј': 'J', 'Ү': 'Y',
+    # Greek
+    'α': 'a', 'β': 'b', 'ε': 'e', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o', 'ρ': 'p',
+    'τ': 't', 'υ': 'u', 'χ': 'x', 'ω': 'w',
+    'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I', 'Κ': 'K', 'Μ': 'M',
+    'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T', 'Υ': 'Y', 'Χ': 'X',
+    # Latin variants
+    'ı': 'i', 'ȷ': 'j', 'ɑ': 'a', 'ɩ': 'i', 'ʏ': 'y', 'ᴀ': 'a', 'ᴄ': 'c', 'ᴅ': 'd',
+    'ᴇ': 'e', 'ᴋ': 'k', 'ᴍ': 'm', 'ᴏ': 'o', 'ᴘ': 'p', 'ᴛ': 't', 'ᴜ': 'u', 'ᴠ': 'v',
+    'ᴡ': 'w', 'ᴢ': 'z', 'ʀ': 'r', 'ɢ': 'g', 'ʜ': 'h', 'ɪ': 'i', 'ʟ': 'l', 'ɴ': 'n',
+    'ꜱ': 's', 'ꜰ': 'f',
+}
+
+# Invisible characters used to split words: zero-width spaces and joiners,
+# bidi controls, variation selectors, fillers and soft hyphens
+INVISIBLE_RANGES = [
+    (0x00AD, 0x00AD), (0x034F, 0x034F), (0x061C, 0x061C), (0x115F, 0x1160),
+    (0x17B4, 0x17B5), (0x180B, 0x180E), (0x200B, 0x200F), (0x202A, 0x202E),
+    (0x2060, 0x206F), (0x3164, 0x3164), (0xFE00, 0xFE0F), (0xFEFF, 0xFEFF),
+    (0xFFA0, 0xFFA0),
+]
+
+# Combining marks left over after NFKD (accents, strike-throughs, underlines)
+COMBINING_RANGES = [(0x0300, 0x036F), (0x1AB0, 0x1AFF), (0x1DC0, 0x1DFF), (0x20D0, 0x20FF)]
+
+
+def _build_table() -> Dict[int, object]:
+    table: Dict[int, object] = {ord(char): latin for char, latin in CONFUSABLES.items()}
+    for start, end in INVISIBLE_RANGES + COMBINING_RANGES:
+        for codepoint in range(start, end + 1):
+            table[codepoint] = None
+    return table
+
+
+TRANSLATE_TABLE = _build_table()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Fold look-alike characters to plain text, keeping case and spacing
+    Compatibility forms (fullwidth, bold/script math letters, circled letters)
+    are folded by NFKD, then accents, invisible characters and look-alikes
+    are removed or mapped in one translate call
+    """
+    if text.isascii():
+        return text
+    folded = unicodedata.normalize('NFKD', text).translate(TRANSLATE_TABLE)
+    return unicodedata.normalize('NFC', folded)
+
+
+def compact_text(text: str) -> str:
+    """Normalized, lower-cased text with all whitespace removed ('d i s c o r d . g g' -> 'discord.gg')"""
+    return ''.join(normalize_text(text).split()).lower()
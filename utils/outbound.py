@@ -0,0 +1,229 @@
+"""
+Outbound action scheduler
+Enforcement (deleting a message, timing out a member) runs inline and ahead of
+everything else; notices (channel warnings, DMs) are queued by priority and
+sent by a few workers, with a bounded queue that sheds stale and low-value
+items when Discord slows us down. discord.py already waits out rate limits per
+bucket; a 429 that still reaches us holds back the rest of that route's queue
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Dict, Hashable, List, Optional
+
+import discord
+
+from utils.metrics import OUTBOUND_ACTIONS
+
+logger = logging.getLogger('discord_bot.outbound')
+
+
+class Priority(IntEnum):
+    """Lower runs first; log embeds sit below all of these in the LogBuffer"""
+    ENFORCE = 0  # Deletes, timeouts
+    NOTICE = 1  # Channel warnings, usually with delete_after
+    DM = 2  # Direct messages to the member who was actioned
+
+
+# Seconds a queued item stays worth sending; a "don't spam" warning that
+# shows up a minute late is just noise
+DEFAULT_MAX_AGE = {
+    Priority.NOTICE: 15.0,
+    Priority.DM: 120.0,
+}
+
+# Wait after a 429 that didn't say how long to wait
+DEFAULT_RETRY_AFTER = 5.0
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds Discord asked us to wait, from RateLimited or the Retry-After header"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class OutboundQueue:
+    """
+    Priority queue of outbound Discord actions
+    Workers take the highest-priority item once no enforcement action is in
+    flight. When the queue is full the oldest item of the lowest priority is
+    dropped (or the new item, if it ranks below everything queued); items
+    that waited longer than their max age are dropped instead of sent.
+    Items carry an optional route (such as ('send', channel_id)); after a
+    429 on a route, its other items wait until the retry-after has passed,
+    or are dropped if they would be stale by then
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 500,
+                 max_age: Optional[Dict[Priority, float]] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_age = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        self.stats: Dict[str, int] = {
+            'enforced': 0, 'sent': 0, 'failed': 0, 'rate_limited': 0,
+            'deferred': 0, 'dropped_full': 0, 'dropped_stale': 0, 'dropped_rate_limited': 0,
+        }
+        self._heap: List[list] = []  # [priority, seq, enqueued_at, name, coro, route]
+        self._retry_at: Dict[Hashable, float] = {}  # Route -> monotonic time its rate limit ends
+        self._deferred: Dict[int, tuple] = {}  # Seq -> (timer handle, item) held back by a rate limit
+        self._seq = itertools.count()
+        self._items = asyncio.Semaphore(0)
+        self._enforcing = 0
+        self._no_enforcement = asyncio.Event()
+        self._no_enforcement.set()
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the workers on the running loop"""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 5.0):
+        """Give queued items `timeout` seconds to go out, then stop the workers"""
+        await self.wait_idle(timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for handle, item in self._deferred.values():
+            handle.cancel()
+            item[4].close()
+        self._deferred.clear()
+        for item in self._heap:
+            item[4].close()
+        self._heap.clear()
+
+    def pending(self) -> int:
+        return len(self._heap) + len(self._deferred)
+
+    async def enforce(self, action: Awaitable) -> Any:
+        """Run an enforcement action now; queued notices wait until it finishes"""
+        self._enforcing += 1
+        self._no_enforcement.clear()
+        try:
+            result = await action
+            self.stats['enforced'] += 1
+            OUTBOUND_ACTIONS.inc(priority=Priority.ENFORCE.name, outcome='sent')
+            return result
+        except (discord.HTTPException, discord.RateLimited) as e:
+            OUTBOUND_ACTIONS.inc(priority=Priority.ENFORCE.name, outcome=self._failure(e))
+            raise
+        finally:
+            self._enforcing -= 1
+            if not self._enforcing:
+                self._no_enforcement.set()
+
+    def submit(self, priority: Priority, action: Awaitable, name: str = '',
+               route: Optional[Hashable] = None) -> bool:
+        """Queue a coroutine without waiting for it; False if it was dropped for backpressure"""
+        if len(self._heap) >= self.max_pending:
+            victim = max(self._heap, key=lambda item: (item[0], -item[1]))
+            if priority > victim[0]:
+                self._drop(priority, action, 'dropped_full')
+                return False
+            self._heap.remove(victim)
+            heapq.heapify(self._heap)
+            self._drop(victim[0], victim[4], 'dropped_full')
+        else:
+            self._items.release()
+
+        heapq.heappush(self._heap, [priority, next(self._seq), time.monotonic(), name, action, route])
+        self._idle.clear()
+        return True
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is queued or running; False on timeout"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _drop(self, priority: Priority, action: Awaitable, reason: str):
+        action.close()
+        self.stats[reason] += 1
+        OUTBOUND_ACTIONS.inc(priority=Priority(priority).name, outcome=reason)
+
+    def _failure(self, error: Exception, route: Optional[Hashable] = None) -> str:
+        if isinstance(error, discord.RateLimited) or getattr(error, 'status', None) == 429:
+            self.stats['rate_limited'] += 1
+            if route is not None:
+                now = time.monotonic()
+                for limited, retry_at in list(self._retry_at.items()):
+                    if retry_at <= now:
+                        del self._retry_at[limited]
+                self._retry_at[route] = now + _retry_after(error)
+            return 'rate_limited'
+        self.stats['failed'] += 1
+        return 'failed'
+
+    def _route_wait(self, route: Optional[Hashable]) -> float:
+        """Seconds until the route's rate limit ends (0 if it isn't limited)"""
+        retry_at = self._retry_at.get(route) if route is not None else None
+        if retry_at is None:
+            return 0.0
+        wait = retry_at - time.monotonic()
+        if wait <= 0:
+            del self._retry_at[route]
+            return 0.0
+        return wait
+
+    def _defer(self, item: list, delay: float):
+        """Put an item back on the queue once its route's rate limit ends"""
+        handle = asyncio.get_running_loop().call_later(delay, self._requeue, item)
+        self._deferred[item[1]] = (handle, item)
+        self.stats['deferred'] += 1
+
+    def _requeue(self, item: list):
+        del self._deferred[item[1]]
+        heapq.heappush(self._heap, item)
+        self._items.release()
+
+    async def _worker(self):
+        while True:
+            await self._items.acquire()
+            await self._no_enforcement.wait()
+            item = heapq.heappop(self._heap)
+            priority, _, enqueued_at, name, action, route = item
+            self._active += 1
+            try:
+                max_age = self.max_age.get(priority, float('inf'))
+                if time.monotonic() - enqueued_at > max_age:
+                    self._drop(priority, action, 'dropped_stale')
+                    continue
+                wait = self._route_wait(route)
+                if wait:
+                    if time.monotonic() + wait - enqueued_at > max_age:
+                        self._drop(priority, action, 'dropped_rate_limited')
+                    else:
+                        self._defer(item, wait)
+                    continue
+                try:
+                    await action
+                    self.stats['sent'] += 1
+                    OUTBOUND_ACTIONS.inc(priority=priority.name, outcome='sent')
+                except (discord.HTTPException, discord.RateLimited) as e:
+                    OUTBOUND_ACTIONS.inc(priority=priority.name, outcome=self._failure(e, route))
+                    logger.debug(f"Outbound {name or priority.name} failed: {e}")
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    OUTBOUND_ACTIONS.inc(priority=priority.name, outcome='failed')
+                    logger.error(f"Outbound {name or priority.name} raised: {e}")
+            finally:
+                self._active -= 1
+                if not self._heap and not self._active and not self._deferred:
+                    self._idle.set()
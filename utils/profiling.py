@@ -0,0 +1,140 @@
+"""
+Profiling helpers
+Command timing hooks and a sampling profiler for the event loop thread
+"""
+import asyncio
+import collections
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from discord.ext import commands
+
+from utils.metrics import COMMAND_SECONDS, LISTENER_SECONDS, Histogram
+
+
+def install_command_timing(bot: commands.Bot):
+    """Record wall time of every app and prefix command in COMMAND_SECONDS"""
+
+    async def interaction_check(interaction) -> bool:
+        interaction.extras['started'] = time.perf_counter()
+        return True
+
+    async def on_app_command_completion(interaction, command):
+        _observe_interaction(interaction, command.qualified_name, 'ok')
+
+    default_on_error = bot.tree.on_error
+
+    async def on_error(interaction, error):
+        command = interaction.command
+        _observe_interaction(interaction, command.qualified_name if command else 'unknown', 'error')
+        await default_on_error(interaction, error)
+
+    async def before_invoke(ctx):
+        ctx.started = time.perf_counter()
+
+    async def after_invoke(ctx):
+        started = getattr(ctx, 'started', None)
+        if started is not None:
+            COMMAND_SECONDS.observe(
+                time.perf_counter() - started,
+                command=ctx.command.qualified_name, kind='prefix',
+                status='error' if ctx.command_failed else 'ok'
+            )
+
+    bot.tree.interaction_check = interaction_check
+    bot.tree.on_error = on_error
+    bot.add_listener(on_app_command_completion, 'on_app_command_completion')
+    bot.before_invoke(before_invoke)
+    bot.after_invoke(after_invoke)
+
+
+def _observe_interaction(interaction, name: str, status: str):
+    started = interaction.extras.pop('started', None)
+    if started is not None:
+        COMMAND_SECONDS.observe(time.perf_counter() - started, command=name, kind='app', status=status)
+
+
+def top_timings(histogram: Histogram, limit: int = 10) -> List[Tuple[str, int, float, float]]:
+    """(name, calls, total seconds, mean seconds) sorted by total time"""
+    rows = []
+    for key, entry in histogram.values.items():
+        total, count = entry[-2], entry[-1]
+        if count:
+            rows.append((' / '.join(str(part) for part in key), count, total, total / count))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+def timing_report(limit: int = 10) -> Dict[str, List[Tuple[str, int, float, float]]]:
+    """Top listeners and commands by total wall time"""
+    return {
+        'listeners': top_timings(LISTENER_SECONDS, limit),
+        'commands': top_timings(COMMAND_SECONDS, limit),
+    }
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread (idle select() time is counted separately)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.idle = 0  # Samples where the loop was waiting in select()
+        self.own = collections.Counter()  # Function on top of the stack
+        self.cumulative = collections.Counter()  # Function anywhere on the stack
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if frame.f_code.co_name == 'select' and 'selectors' in frame.f_code.co_filename:
+                self.idle += 1
+                continue
+            self.samples += 1
+            self.own[self._describe(frame)] += 1
+            seen = set()
+            while frame is not None:
+                location = self._describe(frame)
+                if location not in seen:
+                    seen.add(location)
+                    self.cumulative[location] += 1
+                frame = frame.f_back
+
+    @staticmethod
+    def _describe(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+    async def run(self, seconds: float):
+        """Sample for `seconds` without blocking the loop"""
+        thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        thread.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._stop.set()
+            await asyncio.to_thread(thread.join)
+
+    def report(self, limit: int = 40) -> str:
+        """Plain-text report of the hottest functions"""
+        total = self.samples + self.idle
+        lines = [
+            f"{total} samples every {self.interval * 1000:.0f} ms, "
+            f"{self.idle} idle ({self.idle / total * 100 if total else 0:.1f}%)",
+            f"Percentages below are of the {self.samples} busy samples",
+            ""
+        ]
+        for title, counter in (("Own time (top of stack)", self.own),
+                               ("Cumulative time (anywhere on stack)", self.cumulative)):
+            lines.append(title)
+            lines.append("-" * len(title))
+            for location, count in counter.most_common(limit):
+                share = count / self.samples * 100 if self.samples else 0
+                lines.append(f"{share:6.2f}%  {count:6d}  {location}")
+            lines.append("")
+        return "\n".join(lines)
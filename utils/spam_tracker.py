@@ -0,0 +1,150 @@
+"""
+Spam tracking
+Each (guild, user) pair gets a fixed-size window of its most recent message
+references, so recording a message is O(1). Windows are kept in least
+recently used order: idle ones expire from the front as new messages come
+in, and the number of tracked pairs is capped, so memory stays flat no matter
+how long the bot runs
+"""
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.bulk_delete import MessageRef
+
+
+class _Window:
+    """Recent messages of one user in one guild"""
+    __slots__ = ('refs', 'last_seen')
+
+    def __init__(self, size: int):
+        self.refs: 'deque[MessageRef]' = deque(maxlen=size)
+        self.last_seen = 0.0
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+
+class SpamTracker:
+    """
+    Sliding-window message counter per (guild ID, user ID)
+    A user trips the tracker by sending `threshold` messages within
+    `window_seconds`; at most `max_keys` pairs are tracked, evicting the least
+    recently active one first
+    """
+
+    def __init__(self, window_seconds: float, threshold: int, max_keys: int = 50000):
+        self.window_seconds = window_seconds
+        self.threshold = max(1, threshold)
+        self.max_keys = max(1, max_keys)
+        self.expired = 0
+        self.evicted = 0
+        self.messages = 0  # References held across all windows
+        self._windows: 'OrderedDict[Tuple[int, int], _Window]' = OrderedDict()
+
+        # Sizes for memory_bytes(), measured once so a metrics scrape is O(1)
+        sample = _Window(self.threshold)
+        self._window_bytes = sys.getsizeof((0, 0)) + sys.getsizeof(sample) + sys.getsizeof(sample.refs)
+        self._ref_bytes = sys.getsizeof(MessageRef(0, 0, 0.0))
+
+    def record(self, guild_id: int, user_id: int, message_id: int, channel_id: int,
+               now: Optional[float] = None) -> Optional[List[MessageRef]]:
+        """
+        Record a message; returns the messages in the window once the user
+        reaches the threshold (and starts them over), otherwise None
+        """
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window_seconds
+        key = (guild_id, user_id)
+
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(self.threshold)
+        else:
+            self._windows.move_to_end(key)
+        window.last_seen = now
+
+        refs = window.refs
+        while refs and refs[0].timestamp <= cutoff:
+            refs.popleft()
+            self.messages -= 1
+        # Never past maxlen: the window is dropped as soon as it is full
+        refs.append(MessageRef(message_id, channel_id, now))
+        self.messages += 1
+
+        if len(refs) >= self.threshold:
+            del self._windows[key]
+            self.messages -= len(refs)
+            self._sweep(cutoff)
+            return list(refs)
+
+        self._sweep(cutoff)
+        while len(self._windows) > self.max_keys:
+            _, evicted = self._windows.popitem(last=False)
+            self.messages -= len(evicted)
+            self.evicted += 1
+        return None
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop every window idle for longer than the time window; returns how many"""
+        if now is None:
+            now = time.monotonic()
+        return self._sweep(now - self.window_seconds)
+
+    def _sweep(self, cutoff: float) -> int:
+        # Least recently active first, so stop at the first window still in use
+        removed = 0
+        windows = self._windows
+        while windows:
+            key, window = next(iter(windows.items()))
+            if window.last_seen > cutoff:
+                break
+            del windows[key]
+            self.messages -= len(window)
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def count(self, guild_id: int, user_id: int, now: Optional[float] = None) -> int:
+        """Messages from the user still inside the time window"""
+        window = self._windows.get((guild_id, user_id))
+        if window is None:
+            return 0
+        cutoff = (time.monotonic() if now is None else now) - self.window_seconds
+        return sum(1 for ref in window.refs if ref.timestamp > cutoff)
+
+    def clear(self):
+        self._windows.clear()
+        self.messages = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self._windows
+
+    def values(self) -> Iterator[_Window]:
+        return iter(self._windows.values())
+
+    def item_count(self) -> int:
+        """Messages held across all windows, without walking them"""
+        return self.messages
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the tracker, keys and message references included"""
+        return (
+            sys.getsizeof(self._windows)
+            + len(self._windows) * self._window_bytes
+            + self.messages * self._ref_bytes
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'keys': len(self._windows),
+            'messages': self.messages,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'bytes': self.memory_bytes(),
+        }